@@ -0,0 +1,75 @@
+"""
+compare the old character by character comment masking with the lexer
+based one on big synthetic elm modules.
+
+    python benchmarks/bench_mask_comments.py
+"""
+from __future__ import print_function
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from seeker import lexer  # NOQA
+
+
+def legacy_mask_comments(src):
+    """
+    the loop seeker used before seeker.lexer, kept here to compare against
+    """
+    enter_comment_block = "{-"
+    exit_comment_block = "-}"
+    newline = re.compile(r'\n')
+
+    comment_mode = []
+    out = []
+    for i in range(len(src)):
+        this_chunk = src[i:i+2]
+        if this_chunk == enter_comment_block:
+            comment_mode.append(enter_comment_block)
+            out.append(enter_comment_block[0])
+            continue
+        if this_chunk == exit_comment_block:
+            comment_mode.pop()
+        if len(comment_mode) > 0:
+            if newline.match(this_chunk[0]):
+                out.append(this_chunk[0])
+            else:
+                out.append("-")
+        else:
+            out.append(this_chunk[0])
+    return "".join(out)
+
+
+def synthetic_module(definitions):
+    chunks = ["module Generated exposing (..)\n\nimport Html exposing (..)\n"]
+    for i in range(definitions):
+        chunks.append(
+            "\n\n{{-| docs for value{0}\n\n"
+            "    value{0} = {{- nested -}} 1\n-}}\n"
+            "value{0} : Int -> String\n"
+            "value{0} x =\n"
+            "    -- a line comment\n"
+            "    toString (x + {0}) ++ \"!\"\n".format(i)
+        )
+    return "".join(chunks)
+
+
+def main():
+    for definitions in (100, 1000, 10000):
+        src = synthetic_module(definitions)
+        assert legacy_mask_comments(src) == lexer.mask_comments(src)
+        number = max(1, 2000 // definitions)
+        before = timeit.timeit(
+            lambda: legacy_mask_comments(src), number=number) / number
+        after = timeit.timeit(
+            lambda: lexer.mask_comments(src), number=number) / number
+        print("{:>6} defs {:>9} chars  before {:8.2f}ms  after {:8.2f}ms  "
+              "{:6.1f}x".format(definitions, len(src), before * 1000,
+                                after * 1000, before / after))
+
+
+if __name__ == '__main__':
+    main()
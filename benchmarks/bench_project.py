@@ -0,0 +1,201 @@
+"""
+time seeker on a synthetic project (see synthetic.py), cold and warm, and
+save the timings as json to compare between versions.
+
+    python benchmarks/bench_project.py --modules 200 -o after.json
+    python benchmarks/bench_project.py --modules 200 --compare after.json
+
+cold is a fresh process would see it: no file cache, no projects and no
+saved index. warm is a long running one like `seeker serve`: everything
+read once already. every find_location answer is checked against where
+the generator put the definition, and wrong ones are counted.
+"""
+from __future__ import print_function
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import argparse
+import subprocess
+from timeit import default_timer as timer
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, ".."))
+sys.path.insert(0, here)
+
+import seeker  # NOQA
+from seeker import cache  # NOQA
+from seeker import index as symbol_index  # NOQA
+from seeker import project  # NOQA
+import synthetic  # NOQA
+
+
+def cold():
+    cache.disable()
+    project.forget()
+
+
+def best_of(repeat, fn):
+    """
+    fastest of `repeat` runs of fn, in ms. the fastest is the one least
+    disturbed by whatever else the machine was doing.
+    """
+    times = []
+    for _ in range(repeat):
+        start = timer()
+        fn()
+        times.append(timer() - start)
+    return min(times) * 1000
+
+
+def per_query(queries, fn):
+    """
+    mean ms per query of fn(query) over all of them, and how many gave
+    the wrong answer
+    """
+    wrong = 0
+    start = timer()
+    for q in queries:
+        try:
+            if fn(q) != q.expected:
+                wrong += 1
+        except (seeker.CannotFindIdentifier, seeker.SearchError):
+            wrong += 1
+    return (timer() - start) * 1000 / max(len(queries), 1), wrong
+
+
+def run(root, queries, repeat, sample):
+    elm_package = os.path.join(root, "elm-package.json")
+    index_path = symbol_index.cache_path_for(root)
+    queries = queries[::max(1, len(queries) // sample)]
+    biggest = max((q.file for q in queries), key=os.path.getsize)
+    with open(biggest) as f:
+        biggest_source = f.read()
+    results = {}
+
+    results["mask_comments"] = {
+        "warm_ms": best_of(
+            repeat, lambda: seeker._mask_comments(biggest_source)),
+    }
+
+    def searchable_sources():
+        seeker._searchable_sources(elm_package)
+    cold()
+    cold_ms = best_of(repeat, lambda: (cold(), searchable_sources()))
+    cache.enable()
+    searchable_sources()
+    results["searchable_sources"] = {
+        "cold_ms": cold_ms,
+        "warm_ms": best_of(repeat, searchable_sources),
+    }
+
+    def build_index():
+        cold()
+        if os.path.exists(index_path):
+            os.remove(index_path)
+        symbol_index.load(project.get(elm_package), jobs=1)
+
+    def load_index():
+        cold()
+        symbol_index.load(project.get(elm_package), jobs=1)
+    results["index"] = {
+        "cold_ms": best_of(repeat, build_index),
+        "warm_ms": best_of(repeat, load_index),
+    }
+
+    def lookup(index=None):
+        return lambda q: seeker.find_location(
+            root, q.file, q.row, q.col, q.identifier, index=index)
+
+    def one_cold_lookup(q):
+        cold()
+        return lookup()(q)
+    cold_ms, cold_wrong = per_query(queries, one_cold_lookup)
+    cache.enable()
+    per_query(queries, lookup())
+    scan_ms, scan_wrong = per_query(queries, lookup())
+    index = symbol_index.load(project.get(elm_package))
+    indexed_ms, indexed_wrong = per_query(queries, lookup(index))
+    results["find_location"] = {
+        "cold_ms": cold_ms,
+        "warm_ms": scan_ms,
+        "warm_indexed_ms": indexed_ms,
+        "queries": len(queries),
+        "wrong": cold_wrong + scan_wrong + indexed_wrong,
+    }
+    cold()
+    return results
+
+
+def version():
+    try:
+        return subprocess.check_output(
+            ["git", "describe", "--always", "--dirty"], cwd=here,
+            stderr=open(os.devnull, "w")).decode("utf-8").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    for name, timings in sorted(results.items()):
+        before = baseline.get("results", {}).get(name, {})
+        for key, value in sorted(timings.items()):
+            if not key.endswith("_ms"):
+                continue
+            line = "{:<20} {:<16} {:10.3f}ms".format(name, key, value)
+            if before.get(key):
+                line += "  {:6.2f}x of {}".format(
+                    value / before[key], baseline.get("version"))
+            print(line)
+
+
+def arg_parser():
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    synthetic.add_size_arguments(p)
+    p.add_argument("--repeat", type=int, default=5,
+                   help="runs to take the best of")
+    p.add_argument("--queries", type=int, default=200,
+                   help="how many of the generated uses to look up")
+    p.add_argument("-o", "--output", default=None,
+                   help="write the results to this json file")
+    p.add_argument("--compare", default=None,
+                   help="json results of an earlier run to compare against")
+    p.add_argument("--keep", default=None,
+                   help="generate the project here and leave it there")
+    return p
+
+
+def main():
+    args = arg_parser().parse_args()
+    root = args.keep or tempfile.mkdtemp(prefix="seeker-bench-")
+    try:
+        queries = synthetic.generate(root, **synthetic.size_of(args))
+        results = run(root, queries, args.repeat, args.queries)
+    finally:
+        if not args.keep:
+            shutil.rmtree(root)
+    report = {
+        "version": version(),
+        "python": platform.python_version(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "size": synthetic.size_of(args),
+        "results": results,
+    }
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    compare(results, baseline)
+    if results["find_location"]["wrong"]:
+        print("{} lookups gave the wrong answer".format(
+            results["find_location"]["wrong"]))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
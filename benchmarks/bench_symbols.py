@@ -0,0 +1,46 @@
+"""
+time `seeker symbols` style searches over lots of made up names, to keep
+an eye on them staying fast enough to run on every keystroke.
+
+    python benchmarks/bench_symbols.py
+"""
+from __future__ import print_function
+import os
+import sys
+import random
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from seeker import symbols  # NOQA
+
+words = ["view", "update", "model", "msg", "user", "list", "html", "to",
+         "from", "string", "decode", "encode", "http", "request", "field",
+         "map", "and", "then", "with", "default", "page", "route", "init"]
+
+
+def synthetic_names(count, seed=0):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        parts = [rng.choice(words) for _ in range(rng.randint(1, 4))]
+        name = parts[0] + "".join(p.capitalize() for p in parts[1:])
+        if rng.random() < 0.3:
+            name = name[0].upper() + name[1:]
+        names.add(name + str(rng.randint(0, 99)))
+    return list(names)
+
+
+def main():
+    for count in (1000, 10000, 100000):
+        table = symbols.SymbolTable(synthetic_names(count))
+        for query in ("v", "viewUser", "decFi", "zzz", "hreq"):
+            number = 50
+            took = timeit.timeit(
+                lambda: table.search(query), number=number) / number
+            print("{:>7} names  {:>10}  {:8.3f}ms  {} found".format(
+                count, query, took * 1000, len(table.search(query))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+how much memory every definition of a synthetic project (see synthetic.py)
+takes in a DefinitionTable, next to the same definitions as a list of
+namedtuples, and what a whole SymbolIndex (which keeps them in a
+DefinitionTable, along with what every module exposes) takes.
+
+    python benchmarks/bench_table.py --modules 2000 --definitions 100
+"""
+from __future__ import print_function
+import os
+import sys
+import shutil
+import json
+import tempfile
+import argparse
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, ".."))
+sys.path.insert(0, here)
+
+from seeker import index as symbol_index  # NOQA
+from seeker import project  # NOQA
+from seeker.table import Definition, DefinitionTable  # NOQA
+import synthetic  # NOQA
+
+
+def allocated(fn):
+    """
+    fn() and the bytes still allocated for what it gave back, if
+    tracemalloc is there to tell
+    """
+    try:
+        import tracemalloc
+    except ImportError:
+        return fn(), None
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    synthetic.add_size_arguments(p)
+    args = p.parse_args()
+    root = tempfile.mkdtemp(prefix="seeker-bench-")
+    try:
+        synthetic.generate(root, **synthetic.size_of(args))
+        index = symbol_index.SymbolIndex(
+            project.get(os.path.join(root, "elm-package.json")).source_dirs)
+        index.refresh(jobs=None)
+        # copies, so the strings aren't shared with the index
+        definitions = [(d.name, d.kind, d.module, d.path, d.row, d.col)
+                       for d in index.table()]
+        source_dirs = index.source_dirs
+        dumped = json.loads(json.dumps(index.dump()))
+        del index
+    finally:
+        shutil.rmtree(root)
+
+    def as_tuples():
+        # fresh strings, the way a namedtuple per definition read from
+        # files or json would have them
+        return [Definition(*(
+            "".join(list(f)) if isinstance(f, str) else f for f in d))
+            for d in definitions]
+
+    def as_table():
+        table = DefinitionTable()
+        for d in definitions:
+            table.add(*d)
+        return table
+    tuples, tuple_bytes = allocated(as_tuples)
+    table, table_bytes = allocated(as_table)
+    index, index_bytes = allocated(
+        lambda: symbol_index.SymbolIndex.restore(source_dirs, dumped))
+    memory = table.memory()
+    print("{} definitions, {} distinct strings".format(
+        memory["definitions"], memory["strings"]))
+    print("table columns:            {:8.1f} bytes per definition".format(
+        float(memory["column_bytes"]) / max(memory["definitions"], 1)))
+    print("table, by memory():       {:8.1f} bytes per definition".format(
+        memory["bytes_per_definition"]))
+    for name, used in (("table", table_bytes), ("namedtuples", tuple_bytes),
+                       ("index", index_bytes)):
+        if used is not None:
+            print("{:<25} {:8.1f} bytes per definition".format(
+                name + ", allocated:", float(used) / len(definitions)))
+
+
+if __name__ == '__main__':
+    main()
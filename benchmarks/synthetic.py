@@ -0,0 +1,200 @@
+"""
+generate made up elm projects of any size to benchmark seeker against.
+
+a project has `modules` modules nested `depth` levels deep (like
+App.Area1.Area2.Module7), each with `definitions` values, a big block
+comment and every kind of import: wildcard, aliased, exposing and plain.
+elm-stuff/packages gets `packages` fake installed packages with
+`package_modules` modules each, along with their elm-package.json and
+exact-dependencies.json.
+
+every value uses one other value, picked so that between them they need
+every way seeker resolves a name: defined in the same file, qualified
+through an alias, exposed by name, pulled in by a wildcard and qualified
+with the full module name. `generate` gives those uses back as queries
+along with where they're defined, so the benchmark can check its answers.
+
+    python benchmarks/synthetic.py /tmp/project --modules 200
+"""
+from __future__ import print_function
+import io
+import os
+import json
+import argparse
+from collections import namedtuple
+
+# a find_location call and the answer it should give
+Query = namedtuple("Query", "file row col identifier expected")
+
+
+def module_name(i, depth):
+    parts = ["App"] + ["Area{}".format((i // 3 ** level) % 3)
+                       for level in range(depth - 1)]
+    return ".".join(parts + ["Module{}".format(i)])
+
+
+def package_module_name(p, q):
+    return "Pkg{}.Mod{}".format(p, q)
+
+
+def block_comment(lines, title):
+    body = ["{{-| {} is made up for benchmarking".format(title), ""]
+    for n in range(lines):
+        if n % 10 == 5:
+            body.append("    {- a nested comment, with -} \"quotes\" in it")
+        else:
+            body.append("    some words about line {} of the docs".format(n))
+    body.append("-}")
+    return body
+
+
+def _write(root, parts, lines):
+    path = os.path.join(root, *parts)
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with io.open(path, "w", encoding="utf-8") as f:
+        f.write(u"\n".join(lines) + u"\n")
+    return path
+
+
+def _package(root, p, package_modules, definitions, comment_lines):
+    package_root = os.path.join(
+        root, "elm-stuff", "packages", "bench", "pkg{}".format(p), "1.0.0")
+    _write(package_root, ["elm-package.json"], [json.dumps({
+        "version": "1.0.0",
+        "source-directories": ["src"],
+        "exposed-modules": [package_module_name(p, q)
+                            for q in range(package_modules)],
+        "dependencies": {},
+    }, indent=4)])
+    rows = {}
+    for q in range(package_modules):
+        name = package_module_name(p, q)
+        lines = ["module {} exposing (..)".format(name), ""]
+        lines.extend(block_comment(comment_lines, name))
+        own_rows = {}
+        for n in range(definitions):
+            value = "p{}q{}d{}".format(p, q, n)
+            lines.extend(["", "", "{} : Int -> Int".format(value)])
+            own_rows[(name, value)] = len(lines)
+            lines.extend(["{} x =".format(value), "    x + {}".format(n)])
+        path = _write(package_root, ["src"] + _file_parts(name), lines)
+        rows.update((k, (path, row)) for k, row in own_rows.items())
+    return rows
+
+
+def _file_parts(name):
+    parts = name.split(".")
+    return parts[:-1] + [parts[-1] + ".elm"]
+
+
+def generate(root, modules=50, definitions=20, depth=3, packages=3,
+             package_modules=10, comment_lines=40):
+    """
+    write a project to `root`, gives back the Query for every use
+    """
+    dependencies = dict(("bench/pkg{}".format(p), "1.0.0 <= v < 2.0.0")
+                        for p in range(packages))
+    _write(root, ["elm-package.json"], [json.dumps({
+        "version": "1.0.0",
+        "source-directories": ["src"],
+        "exposed-modules": [],
+        "dependencies": dependencies,
+    }, indent=4)])
+    _write(root, ["elm-stuff", "exact-dependencies.json"], [json.dumps(
+        dict((d, "1.0.0") for d in dependencies), indent=4)])
+    # (module, value) -> (path, row)
+    rows = {}
+    for p in range(packages):
+        rows.update(_package(
+            root, p, package_modules, definitions, comment_lines))
+
+    # (path, row, col, identifier, (module, value) it refers to)
+    uses = []
+    for i in range(modules):
+        name = module_name(i, depth)
+        aliased = module_name((i + 1) % modules, depth)
+        exposed = module_name((i + 2) % modules, depth)
+        qualified = module_name((i + 3) % modules, depth)
+        p, q = i % max(packages, 1), i % max(package_modules, 1)
+        wildcard = package_module_name(p, q)
+        lines = [
+            "module {} exposing (..)".format(name),
+            "",
+            "import {} exposing (..)".format(wildcard) if packages else "",
+            "import {} as Other".format(aliased),
+            "import {} exposing (m{}d0)".format(exposed, (i + 2) % modules),
+            "import {}".format(qualified),
+            "",
+        ]
+        lines.extend(block_comment(comment_lines, name))
+        own_rows = {}
+        own_uses = []
+        for n in range(definitions):
+            value = "m{}d{}".format(i, n)
+            kind = n % 5
+            if kind == 0 or (kind == 3 and not packages):
+                target = (name, "m{}d{}".format(i, max(n - 1, 0)))
+                prefix = ""
+            elif kind == 1:
+                target = (aliased, "m{}d{}".format((i + 1) % modules, n))
+                prefix = "Other."
+            elif kind == 2:
+                target = (exposed, "m{}d0".format((i + 2) % modules))
+                prefix = ""
+            elif kind == 3:
+                target = (wildcard, "p{}q{}d{}".format(p, q, n))
+                prefix = ""
+            else:
+                target = (qualified, "m{}d1".format((i + 3) % modules))
+                prefix = qualified + "."
+            lines.extend(["", "", "{} : Int -> Int".format(value)])
+            own_rows[(name, value)] = len(lines)
+            lines.append("{} x =".format(value))
+            own_uses.append((len(lines), 4 + len(prefix), target[1], target))
+            lines.append("    {}{} x".format(prefix, target[1]))
+        path = _write(root, ["src"] + _file_parts(name), lines)
+        rows.update((k, (path, row)) for k, row in own_rows.items())
+        uses.extend((path,) + use for use in own_uses)
+
+    return [Query(path, row, col, identifier,
+                  [rows[target][0], rows[target][1], 0])
+            for path, row, col, identifier, target in uses]
+
+
+def arg_parser():
+    p = argparse.ArgumentParser(
+        description="write a synthetic elm project for benchmarks")
+    p.add_argument("root", help="directory to write the project to")
+    add_size_arguments(p)
+    return p
+
+
+def add_size_arguments(p):
+    p.add_argument("--modules", type=int, default=50)
+    p.add_argument("--definitions", type=int, default=20,
+                   help="values per module")
+    p.add_argument("--depth", type=int, default=3,
+                   help="how deeply module names are nested")
+    p.add_argument("--packages", type=int, default=3)
+    p.add_argument("--package-modules", dest="package_modules", type=int,
+                   default=10)
+    p.add_argument("--comment-lines", dest="comment_lines", type=int,
+                   default=40, help="lines in each module's block comment")
+
+
+def size_of(args):
+    return dict((k, getattr(args, k)) for k in (
+        "modules", "definitions", "depth", "packages", "package_modules",
+        "comment_lines"))
+
+
+def main():
+    args = arg_parser().parse_args()
+    queries = generate(args.root, **size_of(args))
+    print("wrote {} modules with {} uses to {}".format(
+        args.modules, len(queries), args.root))
+
+
+if __name__ == '__main__':
+    main()
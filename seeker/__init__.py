@@ -1,8 +1,20 @@
 from __future__ import print_function
 import os
 import re
+import sys
 import json
 import logging
+import importlib
+
+from seeker import answers
+from seeker import buffers
+from seeker import cache
+from seeker import lexer
+from seeker import packages
+from seeker import parser
+from seeker import stats
+from seeker import watch
+from seeker.imports import ImportTable
 
 log = logging.getLogger(__name__)
 
@@ -26,75 +38,260 @@ def _id_regex_from(identifier):
     return fn
 
 
+# after the first declaration of a name, how many more declarations get
+# looked at for a second one before the first is taken as the answer
+AMBIGUITY_LOOKAHEAD = 20
+
+
 def find_location_in_source(source, line, col, identifier):
     """
     assume source is a string
 
-    maybe should be a file
+    `line` is where the identifier is used, so let bindings around it
+    count too
     """
-    id_regex = _id_regex_from(identifier)
-    defs = []
-    masked = _mask_comments(source)
-    lines = masked.split("\n")
-    for ix, line in enumerate(lines):
-        found = id_regex(line)
-        if found:
-            defs.append((ix, found.start()))
-    if len(defs) == 0:
-        raise CannotFindIdentifier(
-            "could not find {} in here".format(identifier))
-    if len(defs) > 1:
-        raise SearchError(
-            "too many matches: {}".format([lines[r] for r, c in defs]))
-    return defs[0]
+    return _search_declarations(
+        parser.iter_declarations(source), identifier, line)
 
 
-def find_location(path, source_path, line, col, identifier):
+def _find_in_module(module, identifier, line=None):
+    """
+    where `identifier` is declared in a ParsedModule, as (row, col).
+    let bindings only count if you give the `line` it's used on.
+    """
+    defs = module.top_level(identifier)
+    if len(defs) > 1:
+        raise _too_many(defs)
+    if defs:
+        return defs[0].row, defs[0].col
+    if line is not None:
+        lets = module.let_bindings(identifier, line)
+        if lets:
+            return lets[0].row, lets[0].col
+    raise CannotFindIdentifier(
+        "could not find {} in here".format(identifier))
+
+
+def _search_declarations(declarations, identifier, line=None,
+                         lookahead=None):
+    """
+    _find_in_module for an iterable of Declarations that stops taking them
+    `lookahead` declarations after the first match. let bindings need the
+    whole module, but they only get looked at when there's no top level
+    match, and by then it's all been read anyway.
+    """
+    if lookahead is None:
+        lookahead = AMBIGUITY_LOOKAHEAD
+    seen = []
+    defs = []
+    left = None
+    for d in declarations:
+        if parser.is_top_level(d, identifier):
+            defs.append(d)
+            if len(defs) > 1:
+                raise _too_many(defs)
+            left = lookahead
+        elif left is not None:
+            left -= 1
+        else:
+            seen.append(d)
+        if left == 0:
+            break
+    if defs:
+        return defs[0].row, defs[0].col
+    if line is not None:
+        lets = parser.ParsedModule(
+            None, parser.ALL, seen, []).let_bindings(identifier, line)
+        if lets:
+            return lets[0].row, lets[0].col
+    raise CannotFindIdentifier(
+        "could not find {} in here".format(identifier))
+
+
+def _too_many(defs):
+    return SearchError("too many matches: {}".format(
+        ["{} {} on row {}".format(d.kind, d.name, d.row) for d in defs]))
+
+
+def find_location(path, source_path, line, col, identifier, index=None,
+                  source=None):
     """
     source is path to file
+
+    if you've got a SymbolIndex for the project (see seeker.index) pass it
+    as `index` and definitions get looked up in it instead of scanning
+    files. pass what's in the editor as `source` to look in that instead
+    of the file on disk (see seeker.buffers). to see where the time goes,
+    run it inside seeker.stats.collect()
+    """
+    source_path = _resolve(path, source_path)
+    with stats.phase("find_location"):
+        if source is None:
+            return _find_location(
+                path, source_path, line, col, identifier, index)
+        with buffers.unsaved(source_path, source):
+            return _find_location(
+                path, source_path, line, col, identifier, index)
+
+
+def _resolve(cwd, file_path):
+    """
+    FILE on the command line can be relative to CURRENT_DIR
     """
-    log.debug("searching in {}".format(source_path))
-    with open(source_path) as s:
-        source = s.read()
-    this_line = source.split("\n")[line]
+    return os.path.abspath(os.path.join(cwd or "", file_path))
+
+
+def _find_location(path, source_path, line, col, identifier, index):
+    log.debug("searching in %s", source_path)
+    # with seeker.watch on, drop whatever changed since the last lookup
+    watch.sync()
+    source = cache.read(source_path)
+    this_line = _line(source, line)
     assert identifier in this_line, "{} should be in '{}'".format(identifier, this_line)  # NOQA
-    qualified_module = _qualified_namespace(source, line, col, identifier)
-    if qualified_module:
-        paths = _files_of(qualified_module[0], source_path)
-        for p in paths:
-            log.debug("checking {}".format(p))
-            with open(p) as m:
-                try:
-                    row, col = find_location_in_source(
-                        m.read(), line, col, identifier
-                    )
-                    return [p, row, col]
-                except CannotFindIdentifier:
-                    log.debug("could not find in {}".format(p))
+    with stats.phase("imports"):
+        import_table = ImportTable.for_file(source_path)
+    if index is not None:
+        return _find_in_index(index, source, source_path, line, col,
+                              identifier, import_table)
+    qualified_module = _qualified_namespace(
+        source, line, col, identifier, import_table)
+    # the module a qualified name names, then the file itself (its own
+    # declarations and let bindings shadow anything imported), then the
+    # imports
+    tried = qualified_module or []
+    found = _search_files(_files_of_all(tried, source_path), identifier)
+    if found:
+        return found
     try:
         log.debug("looking in the file function is used in")
-        row, col = find_location_in_source(source, line, col, identifier)
+        row, col = _find_in_file(source_path, identifier, line)
         return [source_path, row, col]
     except CannotFindIdentifier:
         # TODO: this might be totally redundant
-        modules = modules_to_search(source, line, col, identifier)
-        for m in modules:
-            log.debug("looking for path to {}".format(m))
-            paths = _files_of(m, source_path)
-            for p in paths:
-                log.debug("checking {}".format(p))
-                with open(p) as m:
-                    try:
-                        row, col = find_location_in_source(
-                            m.read(), line, col, identifier
-                        )
-                        return [p, row, col]
-                    except CannotFindIdentifier:
-                        log.debug("could not find in {}".format(p))
+        candidates = [m for m in modules_to_search(
+            source, line, col, identifier, import_table) if m not in tried]
+        found = _search_files(_files_of_all(candidates, source_path),
+                              identifier, exported=True)
+        if found:
+            return found
         raise CannotFindIdentifier(
             "could not find {} in here".format(identifier))
 
 
+# what AnswerCache.get gives for a search it has no answer to
+_unknown = object()
+
+
+def _search_files(paths, identifier, exported=False):
+    """
+    [path, row, col] of the first file in `paths` that declares
+    `identifier`, or None. with `exported` only files whose module exposes
+    it count. the files are read ahead on other threads while the ones
+    before them are searched. with seeker.answers on, searching the same
+    files for the same name again only stats them.
+    """
+    paths = list(paths)
+    memo = answers.active()
+    if not paths:
+        return None
+    if memo is None or any(cache.overlaid(p) for p in paths):
+        return _search_unseen(paths, identifier, exported)
+    key = (identifier, tuple(paths), exported)
+    found = memo.get(key, _unknown)
+    if found is _unknown:
+        found = _search_unseen(paths, identifier, exported)
+        # files after the one it's in never made a difference
+        looked_at = paths[:paths.index(found[0]) + 1] if found else paths
+        memo.put(key, found, looked_at)
+    return list(found) if found else None
+
+
+def _search_unseen(paths, identifier, exported):
+    if exported:
+        paths = _exporting(paths, identifier)
+    for p in cache.read_ahead(paths):
+        log.debug("checking %s", p)
+        try:
+            row, col = _find_in_file(p, identifier)
+            return [p, row, col]
+        except CannotFindIdentifier:
+            log.debug("could not find in %s", p)
+        except (IOError, OSError) as e:
+            # the module map can be a step behind a file that just went
+            log.debug("could not read %s: %s", p, e)
+
+
+def _exporting(paths, identifier):
+    """
+    the files in `paths` whose module exposes `identifier`, going by their
+    headers. for wildcard imports that is usually just the one file
+    that has it, so the rest never get parsed past their header.
+    """
+    found = []
+    with stats.phase("exports"):
+        for p in cache.read_ahead(paths):
+            try:
+                if identifier in parser.exports_of(p):
+                    found.append(p)
+            except (IOError, OSError) as e:
+                log.debug("could not read %s: %s", p, e)
+    return found
+
+
+def _find_in_file(path, identifier, line=None):
+    """
+    (row, col) of `identifier` in the file at `path`, let bindings
+    included if you give the `line` it's used on. if the whole file was
+    parsed already that gets used, otherwise it's only parsed as far as it
+    takes to find it.
+    """
+    module = cache.derived(path, "parsed")
+    if module is not None:
+        return _find_in_module(module, identifier, line)
+    with stats.phase("parse"):
+        return _search_declarations(
+            parser.stream_file(path), identifier, line)
+
+
+def _find_in_index(index, source, source_path, line, col, identifier,
+                   import_table):
+    """
+    same search order as find_location, but each module is a dict lookup
+    """
+    def first(definitions):
+        if len(definitions) > 1:
+            raise SearchError("too many matches: {}".format(definitions))
+        d = definitions[0]
+        return [d.path, d.row, d.col]
+
+    qualified_module = _qualified_namespace(
+        source, line, col, identifier, import_table)
+    if qualified_module:
+        found = index.lookup(qualified_module[0], identifier)
+        if found:
+            return first(found)
+    # the index has what was saved, not what's in the editor
+    found = [] if cache.overlaid(source_path) else \
+        index.defined_in(source_path, identifier)
+    if found:
+        return first(found)
+    # let bindings aren't indexed, and the file might not be under any
+    # source directory
+    try:
+        row, col = _find_in_file(source_path, identifier, line)
+        return [source_path, row, col]
+    except CannotFindIdentifier:
+        pass
+    for m in modules_to_search(source, line, col, identifier, import_table):
+        if not qualified_module and not index.exposes(m, identifier):
+            continue
+        found = index.lookup(m, identifier)
+        if found:
+            return first(found)
+    raise CannotFindIdentifier(
+        "could not find {} in here".format(identifier))
+
+
 def _imports_function(line, identifier):
     return re.match(
         (
@@ -142,70 +339,75 @@ def _aliased_module_regex(module_name):
     return f
 
 
-def _module_from_alias(source, module_name):
+def _module_from_alias(source, module_name, import_table=None):
     """
     search the source for the original name of a module
     if it was aliased.  if the module is instead simply found,
     return that.
+
+    modules that are used qualified without being imported (like the
+    ones elm imports by default) are taken at their word
+    """
+    if import_table is None:
+        import_table = ImportTable.from_source(source)
+    imported = import_table.module_for(module_name)
+    if imported is None:
+        log.debug("%s is not imported, assuming it's a module", module_name)
+        return module_name
+    return imported
+
+
+# (source, LineIndex) of the last source _line looked in, which is the
+# same one a few times over for every lookup
+_last_lines = (None, None)
+
+
+def _line(source, row):
+    """
+    one line of source, without splitting the whole thing up
     """
-    regular_or_aliased = _aliased_module_regex(module_name)
-    _search = [regular_or_aliased(i) for i in source.split("\n")]
-    matches = [i for i in _search if i is not None]
-    assert len(matches) == 1, ("only mode module name "
-                               "should match '{}', instead "
-                               "found: {}".format(module_name, [i.string for i in matches]))  # NOQA
-    return matches[0]
+    global _last_lines
+    if _last_lines[0] is not source:
+        _last_lines = (source, lexer.LineIndex(source))
+    lines = _last_lines[1]
+    if row >= len(lines):
+        raise ValueError("there is no row {}".format(row))
+    return lines.line(row)
 
 
-def _qualified_namespace(source, line, col, identifier):
+def _qualified_namespace(source, line, col, identifier, import_table=None):
     """
     if a given identifier is qualified, trace it to the module which
     was imported
     """
-    lines = source.split("\n")
-    line_of_id = lines[line]
-    try:
-        just_before_id = line_of_id[col - 1]
-    except IndexError:
-        print({
-            "line_of_id": line_of_id,
-            "line": line,
-            "col": col,
-            "identifier": identifier
-        })
-        raise
-    if just_before_id == ".":
-        until = source.split("\n")[line][:col - 1]
-        module = _module_name_at_end_of(until)
-        imported_name = _module_from_alias(source, module)
-        log.debug("found qualified import {}".format(imported_name))
+    line_of_id = _line(source, line)
+    if col > len(line_of_id):
+        raise IndexError("column {} is not in line {}: '{}'".format(
+            col, line, line_of_id))
+    if col > 0 and line_of_id[col - 1] == ".":
+        module = _module_name_at_end_of(line_of_id[:col - 1])
+        imported_name = _module_from_alias(source, module, import_table)
+        log.debug("found qualified import %s", imported_name)
         return [imported_name]
 
 
-def modules_to_search(source, line, col, identifier):
+def modules_to_search(source, line, col, identifier, import_table=None):
     """
     given the identifier, give list of module names that you should
     search in for the symbol
     """
-
+    if import_table is None:
+        import_table = ImportTable.from_source(source)
     # check if identifier is qualified, if it's
     # like "String.join" instead of just "join"
-    qualified_module = _qualified_namespace(source, line, col, identifier)
+    qualified_module = _qualified_namespace(
+        source, line, col, identifier, import_table)
     if qualified_module:
         return qualified_module
-    # search for explicit import
-    importers = [_imports_function(i, identifier) for i in source.split("\n")]
-    modules = [i.groups()[0] for i in importers if i]
-    if len(modules) > 0:
-        log.debug("searching exposing imports")
-        log.debug(modules)
-        return modules
-    # if nothing obvious is left, do all wildcards
-    wild = [_wildcard_import(i) for i in source.split("\n")]
-    mods = [i.groups()[0] for i in wild if i]
-    log.debug("searching wildcard imports")
-    log.debug(mods)
-    return mods
+    # explicit imports, then if nothing obvious is left, wildcards
+    modules = import_table.candidates(identifier)
+    log.debug("searching imports %s", modules)
+    return modules
 
 
 def dependencies(package_json):
@@ -215,42 +417,33 @@ def dependencies(package_json):
 
 def get_package_json(path):
     """
-    get elm-package.json as a dict
+    get elm.json, or elm-package.json for elm 0.18, as a dict
     """
-    with open(os.path.join(path, "elm-package.json")) as p:
-        return json.loads(p.read())
+    return json.loads(cache.read(packages.project_file_in(path) or
+                                 os.path.join(path, "elm-package.json")))
 
 
 def dependency_roots(dir, is_dependency=False):
-    log.debug("generating dependencies for {}".format(dir))
-    package_json = get_package_json(dir)
-    roots = []
-    for author, package in dependencies(package_json):
-        p_path = os.path.join(
-            "elm-stuff",
-            "packages",
-            author,
-            package,
-        )
-        versions = os.listdir(p_path)
-        path_to_package = os.path.join(
-            p_path, versions[0]
-        )
-        roots.append(path_to_package)
-    return roots
+    """
+    version directories of the installed dependencies of the project in
+    `dir`, the versions exact-dependencies.json pins if it's there
+    """
+    log.debug("generating dependencies for %s", dir)
+    return packages.layout_for(dir).dependency_dirs()
 
 
 def _elm_package_for(file_path):
     """
-    get the path to the elm-package.json for a given file
+    get the path to the elm.json or elm-package.json for a given file
     """
     # just troll up the file tree
-    parts = file_path.split(os.path.sep)
-    for i in list(reversed(range(len(parts))))[:-1]:
-        guess_parts = parts[:i] + ["elm-package.json"]
-        current_guess = "/" + os.path.join(*guess_parts)
-        if os.path.exists(current_guess):
-            return current_guess
+    with stats.phase("find_elm_package"):
+        parts = file_path.split(os.path.sep)
+        for i in list(reversed(range(len(parts))))[:-1]:
+            current_guess = packages.project_file_in(
+                "/" + os.path.join(*parts[:i]) if i else "/")
+            if current_guess is not None:
+                return current_guess
 
 
 def _files_of(module, found_in_file):
@@ -260,9 +453,32 @@ def _files_of(module, found_in_file):
     :return: path to file that defines the module
 
     """
-    elm_package_path = _elm_package_for(found_in_file)
-    sources_to_search = _searchable_sources(elm_package_path)
-    return _find_module_definition(module, sources_to_search)
+    from seeker import project
+    p = project.for_file(found_in_file)
+    if p is None:
+        log.debug("%s is not in a project", found_in_file)
+        return []
+    return p.files_of(module)
+
+
+def _files_of_all(modules, found_in_file):
+    """
+    the files of every module in `modules`, in order. the project is only
+    looked up (and checked for changes) once for all of them.
+    """
+    from seeker import project
+    modules = list(modules)
+    if not modules:
+        return []
+    p = project.for_file(found_in_file)
+    if p is None:
+        log.debug("%s is not in a project", found_in_file)
+        return []
+    paths = []
+    for m in modules:
+        log.debug("looking for path to %s", m)
+        paths.extend(p.files_of(m))
+    return paths
 
 
 def _searchable_sources(path_to_elm_package_json, is_dependency=False):
@@ -270,26 +486,15 @@ def _searchable_sources(path_to_elm_package_json, is_dependency=False):
     returns a list of the given package's sources and the
     sources of its dependencies.
     """
-    # packages_dir = "elm-stuff/packages"
-    # is_top_level = packages_dir not in path_to_elm_package_json
-    package_root = path_to_elm_package_json.rpartition("elm-package.json")[0]
-    with open(path_to_elm_package_json) as p:
-        elm_package_info = json.loads(p.read())
-    sources = [
-        os.path.join(package_root, s)
-        for s in elm_package_info["source-directories"]
-    ]
-    if not is_dependency:
-        for dep_path in dependency_roots(package_root, is_dependency=True):
-            dep_package_json = os.path.join(dep_path, "elm-package.json")
-            dependency_sources = _searchable_sources(
-                dep_package_json, is_dependency=True
-            )
-            log.debug(
-                "adding dependency sources: {}".format(dependency_sources)
-            )
-            sources += dependency_sources
-    return sources
+    if is_dependency:
+        return _package_sources(path_to_elm_package_json)
+    with stats.phase("searchable_sources"):
+        package_root = os.path.dirname(path_to_elm_package_json)
+        return packages.layout_for(package_root).source_dirs()
+
+
+def _package_sources(path_to_elm_package_json):
+    return packages.source_dirs_of(path_to_elm_package_json)
 
 
 def _find_module_definition(module_name, source_dirs):
@@ -302,11 +507,13 @@ def _find_module_definition(module_name, source_dirs):
     pcomponents = [p for p in module_name.split(".")]
     package_file = os.path.join(*pcomponents) + ".elm"
     paths = []
-    for s in source_dirs:
-        definition_file = os.path.join(s, package_file)
-        log.debug("looking for {} in {}".format(module_name, definition_file))
-        if os.path.exists(definition_file):
-            paths.append(definition_file)
+    with stats.phase("find_module_definition"):
+        for s in source_dirs:
+            definition_file = os.path.join(s, package_file)
+            log.debug("looking for %s in %s", module_name, definition_file)
+            stats.count("stat_calls")
+            if os.path.exists(definition_file):
+                paths.append(definition_file)
     return paths
 
 
@@ -316,56 +523,76 @@ def _mask_comments(src):
     erase content of comments so they stop matching in my search
     results
     """
-
-    enter_comment_block = "{-"
-    exit_comment_block = "-}"
-    # enter_comment_line = "--"
-    # exit_comment_line = "\n"
-    newline = re.compile(r'\n')
-
-    comment_mode = []  # push/pop states, only out of comment mode when empty
-    out = []
-    for i in range(len(src)):
-        # using slice + 2 width to get a sliding window
-        this_chunk = src[i:i+2]
-        if this_chunk == enter_comment_block:
-            comment_mode.append(enter_comment_block)
-            out.append(enter_comment_block[0])
-            continue
-        if this_chunk == exit_comment_block:
-            comment_mode.pop()
-        # reproduce source
-        if len(comment_mode) > 0:
-            if newline.match(this_chunk[0]):
-                out.append(this_chunk[0])
-            else:
-                out.append("-")
-        else:
-            out.append(this_chunk[0])
-    return "".join(out)
+    with stats.phase("mask_comments"):
+        return lexer.mask_comments(src)
 
 
-def arg_parser():
+def arg_parser(batch=True):
     import argparse
     p = argparse.ArgumentParser(
         description="Find the definition of an elm function"
     )
-    p.add_argument("cwd", metavar="CURRENT_DIR", type=str,
+    # only optional so --batch can go without them
+    optional = "?" if batch else None
+    p.add_argument("cwd", metavar="CURRENT_DIR", type=str, nargs=optional,
                    help="dir of elm project")
-    p.add_argument("file", metavar="FILE", type=str,
+    p.add_argument("file", metavar="FILE", type=str, nargs=optional,
                    help="path to file function is used in")
-    p.add_argument("row", metavar="ROW", type=int)
-    p.add_argument("col", metavar="COLUMN", type=int)
+    p.add_argument("row", metavar="ROW", type=int, nargs=optional)
+    p.add_argument("col", metavar="COLUMN", type=int, nargs=optional)
     p.add_argument("identifier", metavar="IDENTIFIER", type=str,
+                   nargs=optional,
                    help="name of thing you're looking for")
     p.add_argument("-d", "--debug", dest="debug",
                    const=True, default=False, action="store_const",
                    help="turn on debug logging")
+    p.add_argument("--no-index", dest="use_index",
+                   const=False, default=True, action="store_const",
+                   help="read files instead of using, and writing, the "
+                        "index in elm-stuff/seeker-index.json (or under "
+                        "~/.cache/seeker). building that index the first "
+                        "time starts a process pool")
+    p.add_argument("--stdin", dest="stdin",
+                   const=True, default=False, action="store_const",
+                   help="read what's in FILE from stdin, for editor "
+                        "buffers that haven't been saved")
+    if batch:
+        p.add_argument("--batch", dest="batch",
+                       const=True, default=False, action="store_const",
+                       help="read json queries from stdin, one per line, "
+                            "and write one json result per line")
+        p.add_argument("--timings", dest="timings",
+                       const=True, default=False, action="store_const",
+                       help="print where the time went to stderr")
     return p
 
 
-def main():
-    args = arg_parser().parse_args()
+# subcommands live in their own modules and only get imported when asked
+# for, so a plain lookup starts up as cheaply as it always has
+_subcommands = {
+    "serve": ("seeker.server", "serve_main"),
+    "client": ("seeker.server", "client_main"),
+    "scan": ("seeker.scan", "main"),
+    "refs": ("seeker.refs", "main"),
+    "resolve-file": ("seeker.resolve", "main"),
+    "symbols": ("seeker.symbols", "main"),
+}
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in _subcommands:
+        module_name, fn_name = _subcommands[argv[0]]
+        module = importlib.import_module(module_name)
+        return getattr(module, fn_name)(argv[1:])
+    parser = arg_parser()
+    args = parser.parse_args(argv)
+    if args.batch:
+        return _batch_main(args)
+    if args.identifier is None:
+        parser.error("CURRENT_DIR, FILE, ROW, COLUMN and IDENTIFIER are "
+                     "required unless you use --batch")
     cwd = args.cwd
     path = args.file
     row = args.row
@@ -374,9 +601,45 @@ def main():
     debug = args.debug
     level = logging.DEBUG if debug else logging.ERROR
     logging.basicConfig(level=level)
-    print(" ".join(
-        map(str, ["MATCH"] + find_location(cwd, path, row, col, identifier))
-    ))
+    # every file only needs reading and parsing once per run
+    cache.enable()
+    with stats.collect() as collected:
+        try:
+            source = sys.stdin.read() if args.stdin else None
+            location = _lookup(args.use_index, cwd, path, row, col,
+                               identifier, source)
+        finally:
+            if args.timings:
+                sys.stderr.write(collected.report() + "\n")
+    print(format_match(location))
+
+
+def _lookup(use_index, cwd, path, row, col, identifier, source=None):
+    path = _resolve(cwd, path)
+    index = None
+    if use_index:
+        from seeker import index as symbol_index
+        from seeker import project
+        p = project.for_file(path)
+        if p is not None:
+            index = symbol_index.load(p)
+    return find_location(cwd, path, row, col, identifier, index=index,
+                         source=source)
+
+
+def _batch_main(args):
+    from seeker import batch
+    level = logging.DEBUG if args.debug else logging.ERROR
+    logging.basicConfig(level=level)
+    batch.run(sys.stdin, sys.stdout, cwd=args.cwd or ".",
+              use_index=args.use_index)
+
+
+def format_match(location):
+    """
+    the line editor plugins parse, like "MATCH /path/to/File.elm 12 0"
+    """
+    return " ".join(map(str, ["MATCH"] + list(location)))
 
 
 if __name__ == '__main__':
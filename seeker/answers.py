@@ -0,0 +1,127 @@
+"""
+answers to module searches that were worked out already.
+
+editors ask the same thing over and over: jumping to `Html.div` or
+`Model` from all over a project searches the same files of the same
+modules for the same name every time. with an AnswerCache on, what a
+search of some files for a name found is kept along with the (mtime,
+size) of every file it had to look at, so asking again costs a stat per
+file instead of reading and parsing them.
+
+the files searched are worked out from the project before asking, so
+whatever changes them (elm.json or elm-package.json, exact dependencies,
+a module turning up earlier in the source directories) asks something
+else instead. an answer is only thrown away once a file it looked at
+changes, and the cache holds `size` answers, dropping the ones used
+longest ago first.
+"""
+import os
+from collections import OrderedDict
+
+from seeker import cache
+from seeker import stats
+
+DEFAULT_SIZE = 1024
+
+
+class AnswerCache(object):
+
+    def __init__(self, size=DEFAULT_SIZE):
+        self.size = size
+        # key -> (answer, [(path, stamp)]), the most recently used last
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # answers dropped because a file they looked at changed
+        self.invalidated = 0
+
+    def get(self, key, default=None):
+        """
+        the answer kept for `key`, or `default` if there's none or a file
+        it looked at changed since
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None and not _changed(entry[1]):
+            self._entries[key] = entry
+            self.hits += 1
+            stats.count("answer_hits")
+            return entry[0]
+        if entry is not None:
+            self.invalidated += 1
+        self.misses += 1
+        stats.count("answer_misses")
+        return default
+
+    def put(self, key, answer, paths):
+        """
+        keep `answer` for `key`, for as long as none of the files at
+        `paths` change. a file is stamped with the (mtime, size) the file
+        cache read it at, so a save between the search and now still
+        counts as a change. only files the cache doesn't hold get a stat
+        here.
+        """
+        try:
+            inputs = [(path, cache.stamp(path) or _stamp(path))
+                      for path in paths]
+        except OSError:
+            return
+        self._entries.pop(key, None)
+        self._entries[key] = (answer, inputs)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def as_dict(self):
+        asked = self.hits + self.misses
+        return {
+            "size": self.size,
+            "answers": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidated": self.invalidated,
+            "hit_rate": float(self.hits) / asked if asked else 0.0,
+        }
+
+
+def _stamp(path):
+    stats.count("stat_calls")
+    st = os.stat(path)
+    return (st.st_mtime, st.st_size)
+
+
+def _changed(inputs):
+    for path, stamp in inputs:
+        try:
+            if _stamp(path) != stamp:
+                return True
+        except OSError:
+            return True
+    return False
+
+
+_active = None
+
+
+def enable(size=DEFAULT_SIZE):
+    """
+    turn on the process wide answer cache, returns it so callers can look
+    at the hit rate
+    """
+    global _active
+    if _active is None:
+        _active = AnswerCache(size)
+    return _active
+
+
+def disable():
+    global _active
+    _active = None
+
+
+def active():
+    return _active
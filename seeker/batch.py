@@ -0,0 +1,93 @@
+"""
+resolve lots of lookups in one go.
+
+`seeker --batch` reads one json query per line from stdin and writes one
+json result per line to stdout, in the same order. a query is either a
+list like the command line arguments, [cwd, file, row, col, identifier],
+or an object with those keys (plus an optional "id" that's copied to the
+result, and an optional "source" with what's in the file if the editor
+hasn't saved it). every query in a batch shares the same file cache,
+projects and symbol indexes, so the hundredth lookup in a project costs
+next to nothing.
+"""
+import json
+import logging
+
+import seeker
+from seeker import server
+
+log = logging.getLogger(__name__)
+
+QUERY_KEYS = ["cwd", "file", "row", "col", "identifier"]
+
+
+def _query_args(query, default_cwd):
+    if isinstance(query, dict):
+        missing = [k for k in QUERY_KEYS[1:] if k not in query]
+        if missing:
+            raise ValueError("query is missing {}".format(missing))
+        args = [query.get("cwd", default_cwd)] + \
+            [query[k] for k in QUERY_KEYS[1:]]
+    elif isinstance(query, list) and len(query) == len(QUERY_KEYS):
+        args = list(query)
+    else:
+        raise ValueError("a query is a list of {} or an object with those "
+                         "keys".format(QUERY_KEYS))
+    # find_location resolves the file against it
+    args[0] = args[0] or default_cwd
+    return args
+
+
+def resolve(queries, cwd=".", use_index=True, state=None):
+    """
+    generate one result dict per query, in order. a result has "result"
+    (path, row, col) or "error" (type and message).
+    """
+    state = state or server.Server(use_index=use_index)
+    for query in queries:
+        result = {}
+        if isinstance(query, dict) and "id" in query:
+            result["id"] = query["id"]
+        try:
+            if isinstance(query, ValueError):
+                raise query
+            args = _query_args(query, cwd)
+            source = query.get("source") if isinstance(query, dict) \
+                else None
+            result["result"] = state.find_location(*args, source=source)
+        except (seeker.CannotFindIdentifier, seeker.SearchError,
+                ValueError, AssertionError, EnvironmentError) as e:
+            log.debug("query %s failed: %s", query, e)
+            result["error"] = _error(e)
+        except Exception as e:
+            # a query seeker trips over still gets its line, and the ones
+            # after it still get answered
+            log.exception("query %s failed", query)
+            result["error"] = _error(e)
+        yield result
+
+
+def _error(e):
+    return {"type": type(e).__name__, "message": str(e)}
+
+
+def _read_queries(rfile):
+    for line in rfile:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            # still gets an answer, to keep the output lined up with the
+            # input
+            yield e
+
+
+def run(rfile, wfile, cwd=".", use_index=True):
+    """
+    answer every query in `rfile`, writing results to `wfile` as soon as
+    each one is ready
+    """
+    for result in resolve(_read_queries(rfile), cwd, use_index):
+        wfile.write(json.dumps(result) + "\n")
+        wfile.flush()
@@ -0,0 +1,204 @@
+"""
+lookups in editor buffers that haven't been saved.
+
+an editor can hand seeker what's in the buffer (`seeker --stdin`, or
+`source=` to find_location) instead of saving before every jump. while
+the lookup runs the text stands in for the file on disk (see
+cache.overlay).
+
+a Buffer is kept per file between lookups, with the blanked text of every
+top level chunk. when the buffer comes back changed, the chunks before
+the edit are kept as they are and lexing starts again at the chunk
+before the one the edit is in (an edit can turn the start of its own
+chunk into a comment). it stops as soon as a chunk starts where one
+started before the edit (moved by however much text went in or out),
+since everything from there on lexes the same as it did, and those
+chunks are kept too, their rows moved along. typing in a big file only
+re-lexes the few chunks around the one being typed in.
+
+what each chunk parses to is kept the same way, so only chunks that were
+lexed again get parsed again, and the ones that moved get their rows
+fixed up.
+"""
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from seeker import cache
+from seeker import parser
+from seeker import stats
+from seeker.imports import ImportTable
+
+log = logging.getLogger(__name__)
+
+# how many buffers to keep chunks for
+MAX_BUFFERS = 16
+
+
+class Buffer(object):
+
+    def __init__(self, text):
+        self.text = text
+        # (offset, row, blanked text) of every top level chunk
+        with stats.phase("lex_buffer"):
+            self.chunks = list(parser.lexed_chunks(text))
+        # (row, items) each chunk parsed to, on the row it was on then, or
+        # None if it hasn't been parsed
+        self.items = [None] * len(self.chunks)
+        # derive results for this text, see cache.overlay
+        self.derived = {}
+
+    def update(self, text):
+        """
+        make this the Buffer for `text`, lexing again only what changed
+        """
+        if text == self.text:
+            return
+        with stats.phase("lex_buffer"):
+            self._update(text)
+        self.derived = {}
+
+    def _update(self, text):
+        old, chunks = self.text, self.chunks
+        start = _common_prefix(old, text)
+        suffix = _common_suffix(old, text, start)
+        edit_end = len(text) - suffix
+        moved = len(text) - len(old)
+        moved_rows = text.count("\n") - old.count("\n")
+        # chunks that end before the edit stay. the chunk the edit is in
+        # might not start where it did any more (an edit right after its
+        # first character can turn it into a comment), so lexing starts
+        # again at the one before it, which starts far enough back
+        kept = 0
+        while kept + 2 < len(chunks) and chunks[kept + 2][0] < start:
+            kept += 1
+        new = chunks[:kept]
+        items = self.items[:kept]
+        pos, row = (chunks[kept][0], chunks[kept][1]) if new else (0, 0)
+        after = dict((chunk[0] + moved, i) for i, chunk in enumerate(chunks)
+                     if chunk[0] >= len(old) - suffix)
+        for chunk in parser.lexed_chunks(text, pos, row):
+            i = after.get(chunk[0]) if chunk[0] >= edit_end else None
+            if i is not None:
+                new.extend((offset + moved, r + moved_rows, t)
+                           for offset, r, t in chunks[i:])
+                items.extend(self.items[i:])
+                break
+            new.append(chunk)
+            items.append(None)
+        log.debug("lexed %s of %s chunks again", len(new) - kept, len(new))
+        self.text = text
+        self.chunks = new
+        self.items = items
+
+    def parsed(self):
+        with stats.phase("parse_buffer"):
+            return parser.parse_items(parser.join_items(self._chunk_items()))
+
+    def declarations(self):
+        """
+        a DeclarationStream that parses chunks that weren't parsed yet only
+        as far as it's read
+        """
+        return parser.DeclarationStream(
+            self.text, parser.join_items(self._chunk_items()))
+
+    def imports(self):
+        with stats.phase("parse_buffer"):
+            return [item for items in self._chunk_items()
+                    for kind, item in items if kind == parser.IMPORT]
+
+    def _chunk_items(self):
+        for i, (_, row, text) in enumerate(self.chunks):
+            parsed = self.items[i]
+            if parsed is None:
+                parsed = self.items[i] = (row, parser.chunk_items(row, text))
+            elif parsed[0] != row:
+                parsed = self.items[i] = (row, _moved(parsed[1],
+                                                      row - parsed[0]))
+            yield parsed[1]
+
+
+def _moved(items, rows):
+    """
+    chunk items `rows` further down
+    """
+    moved = []
+    for kind, item in items:
+        if kind == parser.DECLARATION:
+            item = item._replace(row=item.row + rows,
+                                 end_row=item.end_row + rows)
+        elif kind == parser.IMPORT:
+            item = item._replace(row=item.row + rows)
+        moved.append((kind, item))
+    return moved
+
+
+def _common_prefix(a, b):
+    """
+    how many characters `a` and `b` start with in common, comparing
+    halves in C instead of characters in python
+    """
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a, b, prefix):
+    """
+    how many characters `a` and `b` end with in common, not counting the
+    first `prefix` of either
+    """
+    lo, hi = 0, min(len(a), len(b)) - prefix
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:len(a) - lo] == b[len(b) - mid:len(b) - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+# path -> Buffer, the most recently used last
+_buffers = OrderedDict()
+
+
+def buffer_for(path, text):
+    """
+    the Buffer kept for the file at `path`, brought up to `text`
+    """
+    buf = _buffers.pop(path, None)
+    if buf is None:
+        buf = Buffer(text)
+    else:
+        buf.update(text)
+    _buffers[path] = buf
+    while len(_buffers) > MAX_BUFFERS:
+        _buffers.popitem(last=False)
+    return buf
+
+
+@contextmanager
+def unsaved(path, text):
+    """
+    lookups in the block read `text` as the contents of the file at
+    `path`, with its declarations and import table from the Buffer
+    """
+    buf = buffer_for(path, text)
+    if "imports" not in buf.derived:
+        buf.derived["imports"] = ImportTable(buf.imports())
+        buf.derived["declarations"] = buf.declarations()
+    cache.overlay(path, text, buf.derived)
+    try:
+        yield buf
+    finally:
+        cache.remove_overlay(path)
+
+
+def forget():
+    _buffers.clear()
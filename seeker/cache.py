@@ -0,0 +1,244 @@
+"""
+in-process cache of file contents for seeker processes that stick around
+between lookups (like `seeker serve`).
+
+entries are checked against the file's mtime and size before they get
+reused, so edits made between lookups are still picked up. when a watcher
+from seeker.watch says it would have seen a file change, the entry is
+trusted without checking.
+
+an `overlay` stands in for a file on disk, with or without the cache on,
+so an editor buffer that hasn't been saved gets read instead of the file.
+"""
+import io
+import os
+
+try:
+    import concurrent.futures as futures
+except ImportError:  # python 2 without the futures backport
+    futures = None
+
+from seeker import stats
+
+# how many files read_ahead reads at once
+READ_AHEAD_THREADS = 8
+
+
+class FileCache(object):
+
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        # a seeker.watch watcher, if something is keeping entries right
+        self.watcher = None
+
+    def read(self, path):
+        return self._entry(path)[1]
+
+    def derive(self, path, name, fn):
+        """
+        fn(contents of path), remembered under `name` until the file
+        changes
+        """
+        derived = self._entry(path)[2]
+        if name not in derived:
+            derived[name] = fn(self.read(path))
+        return derived[name]
+
+    def derived(self, path, name):
+        """
+        what `derive` remembered under `name` for the file, or None
+        """
+        return self._entry(path)[2].get(name)
+
+    def _entry(self, path):
+        entry = self._entries.get(path)
+        if (entry is not None and self.watcher is not None and
+                self.watcher.trusts(path)):
+            self.hits += 1
+            stats.count("cache_hits")
+            return entry
+        stats.count("stat_calls")
+        st = os.stat(path)
+        key = (st.st_mtime, st.st_size)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            stats.count("cache_hits")
+            return entry
+        self.misses += 1
+        stats.count("cache_misses")
+        entry = (key, _read_file(path), {})
+        self._entries[path] = entry
+        return entry
+
+    def stamp(self, path):
+        """
+        the (mtime, size) the kept contents of the file at `path` were read
+        at, or None if there are none
+        """
+        entry = self._entries.get(path)
+        return entry[0] if entry is not None else None
+
+    def forget(self, path):
+        """
+        drop the file at `path`, or everything under it if it's a directory
+        """
+        self._entries.pop(path, None)
+        under = path.rstrip(os.sep) + os.sep
+        for p in [p for p in self._entries if p.startswith(under)]:
+            del self._entries[p]
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, path):
+        return path in self._entries
+
+
+_active = None
+# path -> (text, derived) read instead of the file, see `overlay`
+_overlays = {}
+
+
+def enable():
+    """
+    turn on the process wide cache, returns it so callers can look at
+    the hit counts
+    """
+    global _active
+    if _active is None:
+        _active = FileCache()
+    return _active
+
+
+def disable():
+    global _active
+    _active = None
+
+
+def active():
+    return _active
+
+
+def forget(path):
+    if _active is not None:
+        _active.forget(path)
+
+
+def read(path, keep=True):
+    """
+    contents of the file at `path`. with keep=False the cache is only used
+    if it already has the file, for callers that hold on to what they got
+    out of it themselves
+    """
+    if path in _overlays:
+        return _overlays[path][0]
+    if _active is None:
+        return _read_file(path)
+    if not keep and path not in _active:
+        return _read_file(path)
+    return _active.read(path)
+
+
+def stamp(path):
+    """
+    the (mtime, size) of the file at `path` when the cache read what it
+    holds for it, or None
+    """
+    if _active is None or path in _overlays:
+        return None
+    return _active.stamp(path)
+
+
+def derive(path, name, fn):
+    """
+    fn applied to the contents of the file at `path`. with the cache on,
+    the result is kept until the file changes.
+    """
+    if path in _overlays:
+        text, done = _overlays[path]
+        if name not in done:
+            done[name] = fn(text)
+        return done[name]
+    if _active is None:
+        return fn(_read_file(path))
+    return _active.derive(path, name, fn)
+
+
+def derived(path, name):
+    """
+    what `derive` already worked out under `name` for the file at `path`
+    and still holds, or None
+    """
+    if path in _overlays:
+        return _overlays[path][1].get(name)
+    if _active is None:
+        return None
+    return _active.derived(path, name)
+
+
+def overlay(path, text, derived=None):
+    """
+    read `text` as the contents of the file at `path` until
+    `remove_overlay`. what `derive` works out for it goes in `derived` (a
+    new dict if not given), so whoever owns the text can hand that over
+    and keep it.
+    """
+    _overlays[path] = (text, derived if derived is not None else {})
+
+
+def remove_overlay(path):
+    _overlays.pop(path, None)
+
+
+def overlaid(path):
+    return path in _overlays
+
+
+def read_ahead(paths):
+    """
+    gives back `paths` one at a time, in order, each once its file is in
+    the cache. up to READ_AHEAD_THREADS of them get read at once, so on a
+    slow disk or a network home directory reading N files costs about as
+    much as reading one. stop early and the reads not started yet are
+    dropped. files the cache already has, and every file if there's no
+    cache to put them in, just go straight through.
+    """
+    paths = list(paths)
+    if _active is None or futures is None or \
+            sum(p not in _active for p in paths) < 2:
+        return iter(paths)
+    return _read_ahead(_active, paths)
+
+
+def _read_ahead(file_cache, paths):
+    def warm(path):
+        try:
+            file_cache.read(path)
+        except (IOError, OSError):
+            # whoever asked for the file gets to see what went wrong
+            pass
+        return path
+    for path in _executor().map(warm, paths):
+        yield path
+
+
+_pool = None
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        _pool = futures.ThreadPoolExecutor(max_workers=READ_AHEAD_THREADS)
+    return _pool
+
+
+def _read_file(path):
+    with io.open(path, encoding="utf-8") as f:
+        stats.count("files_opened")
+        stats.count("bytes_read", os.fstat(f.fileno()).st_size)
+        return f.read()
@@ -0,0 +1,82 @@
+"""
+what a module imports, worked out once per file.
+
+an ImportTable answers the questions find_location keeps asking about the
+file an identifier is used in (what module is this alias for, who exposes
+this name, which imports are wildcards) with dict lookups.
+"""
+from seeker import cache
+from seeker import parser
+
+
+class ImportTable(object):
+
+    def __init__(self, imports):
+        self.imports = list(imports)
+        # alias (or the plain module name) -> module
+        self.aliases = {}
+        # explicitly exposed name -> modules, in import order
+        self.exposed = {}
+        # modules imported with exposing (..), in import order
+        self.wildcards = []
+        # modules that expose a type with all its constructors, Type(..)
+        self.open_types = []
+        for i in self.imports:
+            self.aliases.setdefault(i.module, i.module)
+            if i.alias:
+                self.aliases[i.alias] = i.module
+            if i.exposing == parser.ALL:
+                self.wildcards.append(i.module)
+                continue
+            for name, constructors in i.exposing:
+                self._expose(name, i.module)
+                if constructors == parser.ALL:
+                    self.open_types.append(i.module)
+                elif constructors:
+                    for c in constructors:
+                        self._expose(c, i.module)
+
+    def _expose(self, name, module):
+        modules = self.exposed.setdefault(name, [])
+        if module not in modules:
+            modules.append(module)
+
+    @classmethod
+    def from_source(cls, source):
+        return cls(parser.imports_in(source))
+
+    @classmethod
+    def for_file(cls, path):
+        """
+        the table for the file at `path`, kept with the file cache until the
+        file changes
+        """
+        return cache.derive(
+            path, "imports", lambda source: cls(parser.imports_in(source)))
+
+    def module_for(self, alias):
+        """
+        the real name of the module imported as `alias`, or None
+        """
+        return self.aliases.get(alias)
+
+    def exposing(self, name):
+        """
+        modules that explicitly expose `name`
+        """
+        return list(self.exposed.get(name, []))
+
+    def candidates(self, name):
+        """
+        modules an unqualified `name` could come from, most likely first:
+        explicit exposing, then types exposed with all their constructors
+        (only for capitalized names), then wildcards
+        """
+        explicit = self.exposing(name)
+        if explicit:
+            return explicit
+        modules = []
+        if name[:1].isupper():
+            modules.extend(self.open_types)
+        modules.extend(m for m in self.wildcards if m not in modules)
+        return modules
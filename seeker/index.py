@@ -0,0 +1,456 @@
+"""
+project wide symbol index.
+
+every .elm file under the project's source directories (and the source
+directories of its dependencies) gets scanned once, and every top level
+definition, type, type alias and union constructor is recorded with the
+file, row and column it's defined at, along with the names the module
+exposes. after that, finding a definition is a lookup in a compact
+DefinitionTable (see seeker.table) instead of regex scanning files.
+"""
+import os
+import json
+import hashlib
+import logging
+
+from seeker import cache
+from seeker import packages
+from seeker import project
+from seeker import scan
+from seeker import stats
+from seeker import parser
+from seeker.table import Definition, DefinitionTable  # NOQA
+from seeker.modules import is_immutable, is_within, module_name_for  # NOQA
+from seeker.modules import elm_files_in, package_version_dir  # NOQA
+
+log = logging.getLogger(__name__)
+
+
+def declarations(source):
+    """
+    list every top level declaration in an elm source string as
+    (name, kind, row, col) tuples. kind is one of the kinds in
+    seeker.parser, except let bindings which aren't top level.
+    """
+    return [(d.name, d.kind, d.row, d.col)
+            for d in parser.parse(source).declarations
+            if d.kind != parser.LET]
+
+
+def scan_file(path):
+    """
+    (declarations, exports) of the file at `path`, from one parse. a type
+    and the constructor it has of the same name are one declaration, the
+    type, same as ParsedModule.top_level.
+    """
+    module = parser.parse(cache.read(path, keep=False))
+    return ([(d.name, d.kind, d.row, d.col) for d in module.declarations
+             if parser.is_top_level(d, d.name)], sorted(module.exports()))
+
+
+class SymbolIndex(object):
+
+    def __init__(self, source_dirs):
+        self.source_dirs = list(source_dirs)
+        # module name -> paths, in source directory order
+        self.modules = {}
+        # path -> module name
+        self.module_of = {}
+        # every definition, as rows of a DefinitionTable
+        self._table = DefinitionTable()
+        # path -> names its module exposes, or EVERYTHING if that's every
+        # name defined in it, which most modules do
+        self._exports = {}
+        # path -> (mtime, size) the file had when it was scanned
+        self._scanned = {}
+        # path -> the source directory it was found in
+        self._dir_of = {}
+        # package versions never change, so once one of their source
+        # directories has been walked it never gets looked at again
+        self._frozen_dirs = set()
+        # set whenever something changed since the index was loaded/saved
+        self.dirty = False
+        # goes up whenever a definition is added or dropped
+        self.generation = 0
+
+    @classmethod
+    def for_file(cls, file_path):
+        """
+        index the whole project a file belongs to
+        """
+        return cls.build(project.for_file(file_path).source_dirs)
+
+    @classmethod
+    def build(cls, source_dirs):
+        index = cls(source_dirs)
+        index.refresh()
+        return index
+
+    def refresh(self, jobs=1):
+        """
+        rescan files that were added or changed since the last scan and
+        forget the ones that are gone. lots of changed files get parsed
+        over `jobs` processes (see seeker.scan).
+        """
+        seen = set()
+        changed = []
+        frozen_files = {}
+        if self._frozen_dirs:
+            for path, source_dir in self._dir_of.items():
+                frozen_files.setdefault(source_dir, []).append(path)
+        walked_packages = []
+        for source_dir in self.source_dirs:
+            if source_dir in self._frozen_dirs:
+                seen.update(frozen_files.get(source_dir, []))
+                continue
+            if is_immutable(source_dir):
+                if self._load_shared(source_dir, seen):
+                    self._frozen_dirs.add(source_dir)
+                    continue
+                walked_packages.append(source_dir)
+            for path in elm_files_in(source_dir):
+                if path in seen:
+                    continue
+                seen.add(path)
+                stats.count("stat_calls")
+                st = os.stat(path)
+                stamp = (st.st_mtime, st.st_size)
+                if self._scanned.get(path) == stamp:
+                    continue
+                self._forget(path)
+                changed.append((path, source_dir, stamp))
+            if is_immutable(source_dir):
+                self._frozen_dirs.add(source_dir)
+        for path in list(self._scanned):
+            if path not in seen:
+                self._forget(path)
+        found = scan.map_files(
+            scan_file, [path for path, _, _ in changed], jobs)
+        for (path, source_dir, stamp), (declared, exports) in zip(
+                changed, found):
+            log.debug("indexed %s", path)
+            self._add(path, source_dir, stamp, declared, exports)
+        for source_dir in walked_packages:
+            self._save_shared(source_dir)
+
+    def _load_shared(self, source_dir, seen):
+        """
+        take what's defined in `source_dir`, a source directory of an
+        installed package version, from the cache every project on the
+        machine shares, if one of them indexed it already
+        """
+        cache_path = package_cache_path(source_dir)
+        if cache_path is None:
+            return False
+        try:
+            with open(cache_path) as f:
+                dumped = json.load(f)
+        except (IOError, OSError, ValueError) as e:
+            log.debug("no shared index for %s: %s", source_dir, e)
+            return False
+        if dumped.get("format") != INDEX_FORMAT:
+            return False
+        log.debug("using the shared index of %s", source_dir)
+        for relative, found, exports in dumped["files"]:
+            path = os.path.join(source_dir, relative)
+            if path in seen:
+                continue
+            seen.add(path)
+            self._forget(path)
+            self._add(path, source_dir, None, [tuple(d) for d in found],
+                      exports)
+        return True
+
+    def _save_shared(self, source_dir):
+        cache_path = package_cache_path(source_dir)
+        if cache_path is None:
+            return
+        files = [[os.path.relpath(path, source_dir), _dumped(
+                  self._table.in_file(path)), self.exports_of(path)]
+                 for path, d in sorted(self._dir_of.items())
+                 if d == source_dir]
+        try:
+            _write_json(cache_path, {"format": INDEX_FORMAT, "files": files})
+        except (IOError, OSError) as e:
+            log.debug("could not share the index of %s: %s", source_dir, e)
+
+    def update(self, paths):
+        """
+        re-index just `paths`, the files and directories seeker.watch saw
+        change, instead of walking every source directory like `refresh`
+        """
+        for path in paths:
+            source_dir = next(
+                (d for d in self.source_dirs if is_within(path, d)), None)
+            if source_dir is None:
+                if any(is_within(d, path) for d in self.source_dirs):
+                    # a whole source directory came or went
+                    self.refresh()
+                    return
+                continue
+            under = path.rstrip(os.sep) + os.sep
+            for scanned in list(self._scanned):
+                if ((scanned == path or scanned.startswith(under)) and
+                        not os.path.isfile(scanned)):
+                    self._forget(scanned)
+            if os.path.isdir(path):
+                files = elm_files_in(path)
+            elif path.endswith(".elm") and os.path.isfile(path):
+                files = [path]
+            else:
+                files = []
+            for f in files:
+                st = os.stat(f)
+                stamp = (st.st_mtime, st.st_size)
+                if self._scanned.get(f) != stamp:
+                    self._forget(f)
+                    self.add_file(f, source_dir, stamp)
+
+    def add_file(self, path, source_dir, stamp=None):
+        declared, exports = scan_file(path)
+        self._add(path, source_dir, stamp, declared, exports)
+
+    def _add(self, path, source_dir, stamp, found, exports):
+        module = module_name_for(path, source_dir)
+        self.dirty = True
+        self.generation += 1
+        self._scanned[path] = stamp
+        self._dir_of[path] = source_dir
+        self.module_of[path] = module
+        exports = frozenset(exports)
+        if exports == frozenset(name for name, _, _, _ in found):
+            exports = EVERYTHING
+        self._exports[path] = exports
+        paths = self.modules.setdefault(module, [])
+        paths.append(path)
+        paths.sort(key=self._rank)
+        self._table.add_file(path, module, found)
+
+    def _rank(self, path):
+        try:
+            return self.source_dirs.index(self._dir_of[path])
+        except ValueError:
+            return len(self.source_dirs)
+
+    def _forget(self, path):
+        if path not in self._scanned:
+            return
+        self.dirty = True
+        self.generation += 1
+        del self._scanned[path]
+        del self._dir_of[path]
+        del self._exports[path]
+        module = self.module_of.pop(path)
+        self.modules[module].remove(path)
+        if not self.modules[module]:
+            del self.modules[module]
+        self._table.remove_file(path)
+
+    def lookup(self, module, name):
+        """
+        definitions of `name` in `module`. if more than one file provides
+        the module, only the first one that defines the name counts, same
+        as searching the source directories in order.
+        """
+        found = self._table.lookup(module, name)
+        for path in self.modules.get(module, []):
+            in_file = [d for d in found if d.path == path]
+            if in_file:
+                return in_file
+        return []
+
+    def exposes(self, module, name):
+        """
+        does `module` expose `name` to `import X exposing (..)`, going by
+        its header. nothing else gets looked at for a wildcard import that
+        doesn't.
+        """
+        for path in self.modules.get(module, []):
+            exports = self._exports[path]
+            if exports is EVERYTHING:
+                if self.defined_in(path, name):
+                    return True
+            elif name in exports:
+                return True
+        return False
+
+    def exports_of(self, path):
+        """
+        the names the module in the file at `path` exposes, sorted
+        """
+        exports = self._exports[path]
+        if exports is EVERYTHING:
+            exports = set(d.name for d in self._table.in_file(path))
+        return sorted(exports)
+
+    def defined_in(self, path, name):
+        return self._table.in_file(path, name)
+
+    def definitions(self, name):
+        """
+        every definition of `name` anywhere in the project
+        """
+        return self._table.definitions(name)
+
+    def names(self):
+        """
+        every name defined anywhere in the project
+        """
+        return list(self._table.names())
+
+    def files(self):
+        return list(self._scanned)
+
+    def table(self):
+        """
+        the DefinitionTable every definition is kept in (see seeker.table).
+        it's the index's own, so it changes along with the index.
+        """
+        return self._table
+
+    def stamp(self, path):
+        """
+        (mtime, size) of the file at `path` when it was scanned, or None
+        """
+        return self._scanned.get(path)
+
+    def __len__(self):
+        return len(self._table)
+
+    def dump(self):
+        """
+        everything needed to rebuild the index without reading any elm
+        files, as plain json-able lists
+        """
+        files = []
+        for path, stamp in sorted(self._scanned.items()):
+            # files from the shared package index weren't stat'ed
+            files.append([
+                path,
+                self._dir_of[path],
+                list(stamp) if stamp is not None else None,
+                _dumped(self._table.in_file(path)),
+                self.exports_of(path),
+            ])
+        return {
+            "format": INDEX_FORMAT,
+            "frozen": sorted(self._frozen_dirs),
+            "files": files,
+        }
+
+    @classmethod
+    def restore(cls, source_dirs, dumped):
+        """
+        rebuild an index from `dump`. whatever changed on disk since then
+        gets picked up by the next `refresh`.
+        """
+        index = cls(source_dirs)
+        if dumped.get("format") != INDEX_FORMAT:
+            return index
+        for path, source_dir, stamp, found, exports in dumped["files"]:
+            index._add(path, source_dir,
+                       tuple(stamp) if stamp is not None else None,
+                       [tuple(d) for d in found], exports)
+        index._frozen_dirs = set(dumped["frozen"])
+        index.dirty = False
+        return index
+
+    def save(self, cache_path):
+        _write_json(cache_path, self.dump())
+        self.dirty = False
+
+
+INDEX_FORMAT = 3
+
+# what a module exposes when it's every name defined in it
+EVERYTHING = object()
+
+
+def _dumped(definitions):
+    return [[d.name, d.kind, d.row, d.col] for d in definitions]
+
+
+def _write_json(path, data):
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    # rename so a reader never sees half an index
+    os.rename(tmp_path, path)
+
+
+def cache_path_for(project_root):
+    """
+    indexes live in the project's elm-stuff, or in the user's cache dir for
+    projects that don't have one yet
+    """
+    project_root = os.path.abspath(project_root)
+    elm_stuff = os.path.join(project_root, "elm-stuff")
+    if os.path.isdir(elm_stuff):
+        return os.path.join(elm_stuff, "seeker-index.json")
+    key = hashlib.sha1(project_root.encode("utf-8")).hexdigest()
+    return os.path.join(_cache_home(), "seeker", key + ".json")
+
+
+def _cache_home():
+    return os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache")
+
+
+def package_cache_path(source_dir):
+    """
+    where the definitions in `source_dir`, a source directory of an
+    installed package version, are shared between every project on the
+    machine. the name is a hash of the package's elm.json or
+    elm-package.json (which names it and its version) and where the
+    source directory is in it, so a package version installed twice, in
+    two elm-stuffs or in ~/.elm, still gets indexed once. None if
+    `source_dir` isn't in a package version.
+    """
+    version_dir = package_version_dir(source_dir)
+    if version_dir is None:
+        return None
+    project_file = packages.project_file_in(version_dir)
+    if project_file is None:
+        return None
+    key = hashlib.sha1()
+    try:
+        with open(project_file, "rb") as f:
+            key.update(f.read())
+    except (IOError, OSError):
+        return None
+    key.update(os.path.relpath(source_dir, version_dir).encode("utf-8"))
+    return os.path.join(_cache_home(), "seeker", "packages",
+                        key.hexdigest() + ".json")
+
+
+def load(p, jobs=None):
+    """
+    the index of Project `p` as of the last run, brought up to date. only
+    files that changed since then get parsed again (over `jobs` processes
+    if there are lots of them), and the result is written back for next
+    time.
+    """
+    with stats.phase("load_index"):
+        return _load(p, jobs)
+
+
+def _load(p, jobs):
+    source_dirs = p.source_dirs
+    cache_path = cache_path_for(p.root)
+    index = None
+    try:
+        with open(cache_path) as f:
+            index = SymbolIndex.restore(source_dirs, json.load(f))
+    except (IOError, OSError, ValueError, KeyError, TypeError) as e:
+        log.debug("not using cached index %s: %s", cache_path, e)
+    if index is None:
+        index = SymbolIndex(source_dirs)
+    index.refresh(jobs)
+    if index.dirty:
+        try:
+            index.save(cache_path)
+        except (IOError, OSError) as e:
+            log.debug("could not save index to %s: %s", cache_path, e)
+    return index
@@ -0,0 +1,188 @@
+"""
+just enough of an elm lexer to know which parts of a file are comments,
+strings and char literals.
+
+it jumps from one interesting delimiter to the next with regex searches
+instead of looking at every character, so it stays linear and fast on
+huge generated modules.
+"""
+import re
+import bisect
+
+BLOCK_COMMENT = "block_comment"
+LINE_COMMENT = "line_comment"
+STRING = "string"
+CHAR = "char"
+
+# anything that starts something that isn't code
+_opener = re.compile(r'\{-|--|"""|"|\'')
+# inside a block comment only nesting matters
+_comment_edge = re.compile(r'\{-|-\}')
+_line_rest = re.compile(r'[^\n]*')
+_string_rest = re.compile(r'(?:[^"\\\n]|\\.)*(?:"|$)', re.M)
+_triple_rest = re.compile(r'(?:[^"\\]|\\.|"(?!""))*(?:"""|$)', re.S)
+_char_literal = re.compile(r"'(?:\\[^']*|[^'\\\n])'")
+_word_char = re.compile(r"[\w']")
+# every character of a comment turns into "-" except newlines, so rows and
+# columns stay put, and the "{" of every "{-" so you can still see them
+_kept = re.compile(r'(\n|\{(?=-))')
+
+
+def scan(src, pos=0):
+    """
+    generate (kind, start, end) for every comment, string and char literal
+    in `src`, in order. kind is one of BLOCK_COMMENT, LINE_COMMENT, STRING
+    or CHAR. an unclosed block comment or string runs to the end.
+    """
+    length = len(src)
+    while pos < length:
+        m = _opener.search(src, pos)
+        if m is None:
+            return
+        start = m.start()
+        token = m.group()
+        if token == "{-":
+            end = _block_comment_end(src, m.end())
+            yield BLOCK_COMMENT, start, end
+        elif token == "--":
+            end = _line_rest.match(src, m.end()).end()
+            yield LINE_COMMENT, start, end
+        elif token == '"""':
+            end = _triple_rest.match(src, m.end()).end()
+            yield STRING, start, end
+        elif token == '"':
+            end = _string_rest.match(src, m.end()).end()
+            yield STRING, start, end
+        else:
+            literal = None
+            # a ' right after a name is a prime, like model'
+            if start == 0 or not _word_char.match(src, start - 1):
+                literal = _char_literal.match(src, start)
+            if literal is None:
+                end = start + 1
+            else:
+                end = literal.end()
+                yield CHAR, start, end
+        pos = end
+
+
+def _block_comment_end(src, pos):
+    depth = 1
+    while depth:
+        m = _comment_edge.search(src, pos)
+        if m is None:
+            return len(src)
+        if m.group() == "{-":
+            depth += 1
+        else:
+            depth -= 1
+        pos = m.end()
+    return pos
+
+
+def mask_comments(src):
+    """
+    src with the inside of every block comment replaced by "-", keeping
+    newlines so every row and column still lines up with the original
+    """
+    out = []
+    last = 0
+    for kind, start, end in scan(src):
+        if kind != BLOCK_COMMENT:
+            continue
+        out.append(src[last:start])
+        comment = src[start:end]
+        if _is_closed(comment):
+            out.append(_mask(comment[:-1]))
+            out.append("}")
+        else:
+            out.append(_mask(comment))
+        last = end
+    if not out:
+        return src
+    out.append(src[last:])
+    return "".join(out)
+
+
+def _mask(comment):
+    parts = _kept.split(comment)
+    # split keeps the separators at the odd positions
+    parts[::2] = ["-" * len(p) for p in parts[::2]]
+    return "".join(parts)
+
+
+def _is_closed(comment):
+    edges = _comment_edge.findall(comment)
+    return edges.count("-}") == edges.count("{-")
+
+
+def blank(src):
+    """
+    src with every comment, string and char literal turned into spaces
+    (newlines stay), leaving only code. rows and columns don't move.
+    """
+    return blank_span(src, scan(src), 0, len(src))
+
+
+def blank_span(src, tokens, start, end):
+    """
+    src[start:end] blanked like `blank` does, given the (kind, start, end)
+    tokens from `scan` that are in it
+    """
+    out = []
+    last = start
+    for kind, token_start, token_end in tokens:
+        out.append(src[last:token_start])
+        if kind == LINE_COMMENT or \
+                src.find("\n", token_start, token_end) < 0:
+            out.append(" " * (token_end - token_start))
+        else:
+            out.append(_blank_re.sub(_spaces, src[token_start:token_end]))
+        last = token_end
+    if not out:
+        return src[start:end]
+    out.append(src[last:end])
+    return "".join(out)
+
+
+_blank_re = re.compile(r"[^\n]+")
+
+
+def _spaces(m):
+    return " " * (m.end() - m.start())
+
+
+_newline = re.compile(r"\n")
+
+
+class LineIndex(object):
+    """
+    where every line of `text` starts, so going between an offset and a
+    (row, col) is a bisect instead of splitting the text into lines
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.starts = [0]
+        self.starts.extend(m.end() for m in _newline.finditer(text))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def position(self, offset):
+        row = bisect.bisect_right(self.starts, offset) - 1
+        return row, offset - self.starts[row]
+
+    def offset(self, row, col=0):
+        return self.starts[row] + col
+
+    def line_end(self, row):
+        """
+        offset of the newline that ends `row`, or of the end of the text
+        """
+        if row + 1 < len(self.starts):
+            return self.starts[row + 1] - 1
+        return len(self.text)
+
+    def line(self, row):
+        return self.text[self.starts[row]:self.line_end(row)]
@@ -0,0 +1,174 @@
+"""
+which file defines which module.
+
+a ModuleMap walks every source directory once and remembers where each
+module lives, so finding a module's file is a dict lookup instead of
+checking whether it exists in every source directory in turn.
+
+the mtime of every directory it walked is kept too. adding, removing or
+renaming a file changes the mtime of the directory it's in, so `refresh`
+can tell which source directories need walking again with one stat per
+directory, and never for installed package versions since those don't
+change.
+"""
+import os
+import re
+import logging
+
+from seeker import stats
+
+log = logging.getLogger(__name__)
+
+_package_version_dir = re.compile(
+    r"^(.*?(?:elm-stuff/packages|/\.elm/[^/]+/packages?)/[^/]+/[^/]+/[^/]+)"
+    r"(?:/|$)")
+# $ELM_HOME -> the regex for package versions under it
+_elm_home_dirs = {}
+
+
+def package_version_dir(source_dir):
+    """
+    the installed package version `source_dir` is in, or None. elm 0.18
+    installs them to elm-stuff/packages/AUTHOR/PACKAGE/VERSION, 0.19 to
+    ~/.elm/ELM_VERSION/packages/AUTHOR/PACKAGE/VERSION or the same under
+    $ELM_HOME.
+    """
+    path = source_dir.replace(os.sep, "/")
+    m = _package_version_dir.match(path)
+    if m is None:
+        home = os.environ.get("ELM_HOME")
+        if not home:
+            return None
+        regex = _elm_home_dirs.get(home)
+        if regex is None:
+            regex = _elm_home_dirs[home] = re.compile(
+                "^(" + re.escape(home.replace(os.sep, "/").rstrip("/")) +
+                r"/[^/]+/packages?/[^/]+/[^/]+/[^/]+)(?:/|$)")
+        m = regex.match(path)
+        if m is None:
+            return None
+    return m.group(1).replace("/", os.sep)
+
+
+def is_immutable(source_dir):
+    """
+    installed package versions never change
+    """
+    return package_version_dir(source_dir) is not None
+
+
+def module_name_for(path, source_dir):
+    """
+    "src/Html/Events.elm" in "src" is the module "Html.Events"
+    """
+    relative = os.path.relpath(path, source_dir)
+    return relative[:-len(".elm")].replace(os.path.sep, ".")
+
+
+def is_skipped(name):
+    """
+    directories in a source directory that never hold its modules:
+    elm-stuff, there when the source directory is the project itself
+    ("."), and hidden ones like .git
+    """
+    return name == "elm-stuff" or name.startswith(".")
+
+
+def _prune(dirs):
+    dirs[:] = sorted(d for d in dirs if not is_skipped(d))
+
+
+def elm_files_in(source_dir):
+    for root, dirs, files in os.walk(source_dir):
+        _prune(dirs)
+        for f in sorted(files):
+            if f.endswith(".elm"):
+                yield os.path.join(root, f)
+
+
+class ModuleMap(object):
+
+    def __init__(self, source_dirs):
+        self.source_dirs = list(source_dirs)
+        # source dir -> {module name: path}
+        self._modules = {}
+        # source dir -> {directory: mtime}, for the ones that can change
+        self._dir_mtimes = {}
+        for source_dir in self.source_dirs:
+            self._walk(source_dir)
+
+    def _walk(self, source_dir):
+        with stats.phase("map_modules"):
+            self._walk_dir(source_dir)
+
+    def _walk_dir(self, source_dir):
+        log.debug("mapping modules in %s", source_dir)
+        modules = {}
+        mtimes = {}
+        watch = not is_immutable(source_dir)
+        for root, dirs, files in os.walk(source_dir):
+            _prune(dirs)
+            if watch:
+                mtimes[root] = _mtime(root)
+            for f in files:
+                if f.endswith(".elm"):
+                    path = os.path.join(root, f)
+                    modules[module_name_for(path, source_dir)] = path
+        self._modules[source_dir] = modules
+        self._dir_mtimes[source_dir] = mtimes
+
+    def paths(self, module_name):
+        """
+        every file that defines `module_name`, in source directory order
+        """
+        found = []
+        for source_dir in self.source_dirs:
+            path = self._modules[source_dir].get(module_name)
+            if path is not None:
+                found.append(path)
+        return found
+
+    def modules(self):
+        """
+        every module name, mapped to the first file that defines it
+        """
+        everything = {}
+        for source_dir in reversed(self.source_dirs):
+            everything.update(self._modules[source_dir])
+        return everything
+
+    def refresh(self):
+        """
+        walk source directories again if anything in them was added,
+        removed or renamed. returns True if anything did.
+        """
+        changed = False
+        for source_dir in self.source_dirs:
+            mtimes = self._dir_mtimes[source_dir]
+            if any(_mtime(d) != m for d, m in mtimes.items()):
+                self._walk(source_dir)
+                changed = True
+        return changed
+
+    def update(self, paths):
+        """
+        walk again just the source directories that `paths` (files or
+        directories that were added, removed or renamed) are in
+        """
+        for source_dir in self.source_dirs:
+            if any(is_within(path, source_dir) or is_within(source_dir, path)
+                   for path in paths):
+                self._walk(source_dir)
+
+
+def is_within(path, directory):
+    return path == directory or path.startswith(
+        directory.rstrip(os.sep) + os.sep)
+
+
+def _mtime(path):
+    stats.count("stat_calls")
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
@@ -0,0 +1,277 @@
+"""
+where a project's dependencies are installed.
+
+elm 0.18 projects have an elm-package.json. elm-package installs a package
+to elm-stuff/packages/AUTHOR/PACKAGE/VERSION and writes the version it
+picked for every package to elm-stuff/exact-dependencies.json. if that's
+not there (elm-package install never ran) the newest installed version
+that fits the range in elm-package.json is used.
+
+elm 0.19 projects have an elm.json instead, and packages live in one cache
+for the whole machine, ~/.elm/ELM_VERSION/packages/AUTHOR/PACKAGE/VERSION
+(or under $ELM_HOME). an application's elm.json pins every version itself,
+a package's gives ranges, which get the newest installed version that fits.
+
+a Layout maps each dependency straight to its version directory once, so
+working out a project's source directories doesn't list directories or
+guess which version is the right one. layouts are kept per project until
+its elm.json, elm-package.json or exact-dependencies.json change.
+"""
+import os
+import re
+import json
+import logging
+
+from seeker import cache
+from seeker import stats
+
+log = logging.getLogger(__name__)
+
+ELM_JSON = "elm.json"
+ELM_PACKAGE_JSON = "elm-package.json"
+# what a project is found by, the newer one first
+PROJECT_FILES = [ELM_JSON, ELM_PACKAGE_JSON]
+
+
+def project_file_in(directory):
+    """
+    the elm.json or elm-package.json in `directory`, or None
+    """
+    for name in PROJECT_FILES:
+        path = os.path.join(directory, name)
+        stats.count("stat_calls")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+class Layout(object):
+
+    def __init__(self, root):
+        self.root = root
+        self.stamp = stamp(root)
+        self.project_file = project_file_in(root) or os.path.join(
+            root, ELM_PACKAGE_JSON)
+        self.info = json.loads(cache.read(self.project_file))
+        if os.path.basename(self.project_file) == ELM_JSON:
+            dependencies = _elm_json_dependencies(self.info)
+        else:
+            dependencies = list(self.info["dependencies"].items())
+            exact = _exact_dependencies(root)
+            dependencies = [(name, exact.get(name, constraint))
+                            for name, constraint in dependencies]
+        # [(author/package, version or range)], in the order they're listed
+        self.dependencies = dependencies
+        # author/package -> its version directory, None if not installed
+        self.package_dirs = {}
+        for name, version in dependencies:
+            self.package_dirs[name] = self._package_dir(name, version)
+        self._source_dirs = None
+
+    def _package_dir(self, name, version):
+        for packages_dir in self._packages_dirs():
+            package_dir = os.path.join(packages_dir, *name.split("/"))
+            if _version(version) is None:
+                found = _newest_fitting(package_dir, version)
+            else:
+                found = version
+            if found is not None:
+                path = os.path.join(package_dir, found)
+                stats.count("stat_calls")
+                if os.path.isdir(path):
+                    return path
+        log.debug("%s %s is not installed for %s", name, version, self.root)
+        return None
+
+    def _packages_dirs(self):
+        """
+        where to look for installed packages, most likely first
+        """
+        if os.path.basename(self.project_file) != ELM_JSON:
+            return [os.path.join(self.root, "elm-stuff", "packages")]
+        return elm_home_packages(self.info.get("elm-version", ""))
+
+    def dependency_dirs(self):
+        """
+        version directories of the installed dependencies, in the order
+        the project lists them
+        """
+        return [self.package_dirs[name] for name, _ in self.dependencies
+                if self.package_dirs[name] is not None]
+
+    def source_dirs(self):
+        """
+        the project's own source directories, then its dependencies'
+        """
+        if self._source_dirs is None:
+            dirs = source_dirs_of(self.project_file)
+            for package_dir in self.dependency_dirs():
+                project_file = project_file_in(package_dir)
+                if project_file is None:
+                    log.debug("no elm.json or elm-package.json in %s",
+                              package_dir)
+                    continue
+                try:
+                    dirs.extend(source_dirs_of(project_file))
+                except (IOError, OSError, ValueError, KeyError) as e:
+                    log.debug("skipping %s: %s", package_dir, e)
+            self._source_dirs = dirs
+        return list(self._source_dirs)
+
+    def is_stale(self):
+        return stamp(self.root) != self.stamp
+
+
+def _elm_json_dependencies(info):
+    """
+    what an elm.json depends on directly, tests included. an application
+    pins versions, a package gives ranges.
+    """
+    found = []
+    for key in ("dependencies", "test-dependencies"):
+        dependencies = info.get(key, {})
+        if info.get("type") == "application":
+            dependencies = dependencies.get("direct", {})
+        for name, version in dependencies.items():
+            if name not in dict(found):
+                found.append((name, version))
+    return found
+
+
+def elm_home():
+    return os.environ.get("ELM_HOME") or os.path.join(
+        os.path.expanduser("~"), ".elm")
+
+
+def elm_home_packages(elm_version):
+    """
+    the package directories in the elm 0.19 cache for `elm_version`, a
+    version like "0.19.1" or a range like "0.19.0 <= v < 0.20.0", newest
+    first
+    """
+    home = elm_home()
+    stats.count("stat_calls")
+    try:
+        versions = [v for v in os.listdir(home) if _version(v)]
+    except OSError:
+        return []
+    if elm_version in versions:
+        versions = [elm_version]
+    else:
+        versions = [v for v in versions if fits(v, elm_version)]
+    found = []
+    for v in sorted(versions, key=_version, reverse=True):
+        # 0.19.0 called it "package"
+        for name in ("packages", "package"):
+            found.append(os.path.join(home, v, name))
+    return found
+
+
+def source_dirs_of(project_file):
+    """
+    the source directories an elm-package.json or elm.json lists, as
+    paths. an elm 0.19 package always has its modules in src.
+    """
+    package_root = project_file.rpartition(os.path.basename(project_file))[0]
+    info = json.loads(cache.read(project_file))
+    if info.get("type") == "package":
+        return [os.path.join(package_root, "src")]
+    # normalized, so "." or "../shared" name a directory the same way the
+    # paths of the files in it (and the watcher's events) do
+    return [
+        os.path.normpath(os.path.join(package_root, s))
+        for s in info["source-directories"]
+    ]
+
+
+def _exact_dependencies(root):
+    path = os.path.join(root, "elm-stuff", "exact-dependencies.json")
+    try:
+        return json.loads(cache.read(path))
+    except (IOError, OSError):
+        return {}
+    except ValueError as e:
+        log.debug("could not read %s: %s", path, e)
+        return {}
+
+
+_constraint = re.compile(
+    r"^\s*(\S+)\s*(<=|<)\s*v\s*(<=|<)\s*(\S+)\s*$")
+
+
+def _version(text):
+    try:
+        return tuple(int(part) for part in text.split("."))
+    except ValueError:
+        return None
+
+
+def fits(version, constraint):
+    """
+    does a version like "1.2.0" fit a range like "1.0.0 <= v < 2.0.0"
+    """
+    m = _constraint.match(constraint)
+    v = _version(version)
+    if m is None or v is None:
+        return False
+    low, low_op, high_op, high = m.groups()
+    low, high = _version(low), _version(high)
+    if low is None or high is None:
+        return False
+    return (low <= v if low_op == "<=" else low < v) and \
+        (v <= high if high_op == "<=" else v < high)
+
+
+def _newest_fitting(package_dir, constraint):
+    """
+    the newest version installed in `package_dir` that fits `constraint`,
+    or just the newest one if none of them do
+    """
+    stats.count("stat_calls")
+    try:
+        installed = [v for v in os.listdir(package_dir) if _version(v)]
+    except OSError:
+        return None
+    if not installed:
+        return None
+    fitting = [v for v in installed if fits(v, constraint)] or installed
+    return max(fitting, key=_version)
+
+
+def stamp(root):
+    """
+    what has to stay the same for a Layout to still be right: the project's
+    elm.json or elm-package.json, and the exact versions elm-package
+    installed
+    """
+    stamp = []
+    for path in [os.path.join(root, name) for name in PROJECT_FILES] + [
+            os.path.join(root, "elm-stuff", "exact-dependencies.json")]:
+        stats.count("stat_calls")
+        try:
+            st = os.stat(path)
+            stamp.append((st.st_mtime, st.st_size))
+        except OSError:
+            stamp.append(None)
+    return stamp
+
+
+# project root -> Layout
+_layouts = {}
+
+
+def layout_for(root):
+    """
+    the Layout of the project in `root`, worked out again only once its
+    elm.json, elm-package.json or exact-dependencies.json changed
+    """
+    root = os.path.abspath(root)
+    layout = _layouts.get(root)
+    if layout is None or layout.is_stale():
+        log.debug("working out the package layout of %s", root)
+        layout = _layouts[root] = Layout(root)
+    return layout
+
+
+def forget():
+    _layouts.clear()
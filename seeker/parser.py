@@ -0,0 +1,580 @@
+"""
+a small parser for the parts of an elm module seeker cares about: the
+module header, imports and declarations.
+
+it doesn't understand expressions. a top level declaration is a line that
+starts in the first column plus every indented line after it, and each of
+those chunks is picked apart on its own, so declarations that span lines
+(like union types with one constructor per line) come out whole. chunks
+are found with one regex over the whole source and their rows by counting
+newlines between them, so the source never gets split into lines.
+
+everything runs on `lexer.blank`ed source, so nothing in a comment or a
+string can look like a declaration.
+"""
+import re
+from collections import namedtuple
+
+from seeker import cache
+from seeker import lexer
+from seeker import stats
+
+# an exposing list of everything, like `exposing (..)`
+ALL = ".."
+
+VALUE = "value"
+TYPE = "type"
+ALIAS = "alias"
+CONSTRUCTOR = "constructor"
+PORT = "port"
+LET = "let"
+
+
+class Declaration(namedtuple(
+        "Declaration", "name kind row col end_row signature parent")):
+    """
+    one named thing defined in a module.
+
+    `signature` is the type annotation for values and ports, if there is
+    one. `parent` is the union type of a constructor or the top level
+    declaration a let binding lives in. `end_row` is the last row of the
+    declaration.
+    """
+    __slots__ = ()
+
+
+# `exposing` is ALL or a list of (name, constructors) where constructors is
+# None for plain names, ALL for `Type(..)` or the list of exposed ones
+Import = namedtuple("Import", "module alias exposing row")
+
+
+def is_top_level(declaration, name):
+    """
+    is `declaration` a top level one called `name`. a type and the
+    constructor it has of the same name count as one, the type.
+    """
+    if declaration.name != name or declaration.kind == LET:
+        return False
+    return not (declaration.kind == CONSTRUCTOR and
+                declaration.parent == name)
+
+
+class ParsedModule(object):
+
+    def __init__(self, name, exposing, declarations, imports):
+        self.name = name
+        self.exposing = exposing
+        self.declarations = declarations
+        self.imports = imports
+
+    def top_level(self, name):
+        """
+        top level declarations called `name`. a type and the constructor
+        it has of the same name count as one.
+        """
+        return [d for d in self.declarations if is_top_level(d, name)]
+
+    def exports(self):
+        """
+        the names another module gets from `import X exposing (..)`:
+        every top level one for `module X exposing (..)`, otherwise what the
+        header lists, along with the constructors of any `Type(..)`
+        """
+        if self.exposing == ALL:
+            return frozenset(d.name for d in self.declarations
+                             if d.kind != LET)
+        return _exposed(self.exposing, self.declarations)
+
+    def let_bindings(self, name, row):
+        """
+        let bound `name`s visible from `row`, closest first
+        """
+        found = [d for d in self.declarations
+                 if d.kind == LET and d.name == name and
+                 self._encloses(d.parent, d.row, row)]
+        return sorted(found, key=lambda d: (d.row > row, abs(row - d.row)))
+
+    def _encloses(self, parent, binding_row, row):
+        for d in self.declarations:
+            if d.name == parent and d.kind == VALUE and \
+                    d.row <= binding_row <= d.end_row:
+                return d.row <= row <= d.end_row
+        return False
+
+
+_module_header = re.compile(
+    r"^(?:port |effect )?module\s+([\w.]+)")
+_import = re.compile(r"^import\s+([\w.]+)")
+_import_alias = re.compile(r"\bas\s+([\w.]+)")
+_exposing = re.compile(r"\bexposing\s*\(")
+_old_style_exposing = re.compile(r"^(?:port )?module\s+[\w.]+\s*\(")
+_type_alias = re.compile(r"^type\s+alias\s+([A-Z][\w']*)")
+_union_type = re.compile(r"^type\s+([A-Z][\w']*)")
+_port = re.compile(r"^port\s+([a-z_][\w']*)")
+_annotation = re.compile(r"^([a-z_][\w']*)\s*:(?!:)")
+_value = re.compile(r"^([a-z_][\w']*)\b[^=]*?(?<![=<>/!:|&+*^-])=(?![=>])")
+_binding = re.compile(
+    r"^( +)([a-z_][\w']*)\b[^=:\n]*?(?<![=<>/!|&+*^-])=(?![=>])")
+_let = re.compile(r"\blet\b")
+_constructor_name = re.compile(r"\s*([A-Z][\w']*)")
+_not_values = set(["module", "import", "port", "type", "effect",
+                   "infix", "infixl", "infixr", "where"])
+_keywords = set(["let", "in", "if", "then", "else", "case", "of"])
+
+
+def parse(source):
+    """
+    parse an elm source string into a ParsedModule
+    """
+    with stats.phase("parse"):
+        return _parse(source)
+
+
+def _parse(source):
+    with stats.phase("mask_comments"):
+        blanked = lexer.blank(source)
+    return parse_chunks(_numbered(blanked))
+
+
+def parse_chunks(numbered_chunks):
+    """
+    a ParsedModule from the (row, blanked text) of every top level chunk
+    """
+    return parse_items(_items(numbered_chunks))
+
+
+def parse_items(items):
+    """
+    a ParsedModule from what `join_items` gives, for callers that keep the
+    items of every chunk around themselves (see seeker.buffers)
+    """
+    name = None
+    exposing = ALL
+    declarations = []
+    imports = []
+    for kind, item in items:
+        if kind == MODULE:
+            name, exposing = item
+        elif kind == IMPORT:
+            imports.append(item)
+        else:
+            declarations.append(item)
+    return ParsedModule(name, exposing, declarations, imports)
+
+
+def iter_declarations(source):
+    """
+    the Declarations in `source`, in order, lexed and parsed a chunk at a
+    time as they're asked for, so a search that stops at the first good
+    match never looks at the rest of the file
+    """
+    for kind, item in _items(_lexed(source)):
+        if kind == DECLARATION:
+            yield item
+
+
+def imports_in(source):
+    """
+    the Imports of an elm module. they come before any declaration, so the
+    rest of the file only gets parsed if a quick look finds an import
+    further down.
+    """
+    imports = []
+    for kind, item in _items(_lexed(source)):
+        if kind == DECLARATION:
+            if _later_import.search(source, _offset_of(source, item.row)):
+                return parse(source).imports
+            break
+        if kind == IMPORT:
+            imports.append(item)
+    return imports
+
+
+_later_import = re.compile(r"^import\s", re.M)
+
+
+def _offset_of(source, row):
+    offset = 0
+    for _ in range(row):
+        offset = source.index("\n", offset) + 1
+    return offset
+
+
+class DeclarationStream(object):
+    """
+    iter_declarations that keeps what it has parsed, so searching the same
+    source again starts with that and only reads on if it has to
+    """
+
+    def __init__(self, source, items=None):
+        if items is None:
+            self._rest = iter_declarations(source)
+        else:
+            # what join_items gives for source, see seeker.buffers
+            self._rest = (item for kind, item in items
+                          if kind == DECLARATION)
+        self.parsed = []
+
+    def __iter__(self):
+        i = 0
+        while True:
+            if i == len(self.parsed):
+                d = next(self._rest, None)
+                if d is None:
+                    return
+                self.parsed.append(d)
+            yield self.parsed[i]
+            i += 1
+
+
+def stream_file(path):
+    """
+    the DeclarationStream for the file at `path`, kept with the file cache
+    until the file changes
+    """
+    return cache.derive(path, "declarations", DeclarationStream)
+
+
+def exports_of(path):
+    """
+    ParsedModule.exports for the file at `path`, kept with the file cache
+    until the file changes. a header that names everything it exposes is
+    all that gets lexed and parsed, it takes `exposing (..)` or a
+    `Type(..)` to go through the whole module.
+    """
+    return cache.derive(path, "exports",
+                        lambda source: _exports(source, path))
+
+
+def _exports(source, path):
+    for kind, item in _items(_lexed(source)):
+        if kind == MODULE:
+            exposing = item[1]
+            if exposing != ALL and all(c != ALL for _, c in exposing):
+                return _exposed(exposing, [])
+        break
+    return parse_file(path).exports()
+
+
+def _exposed(exposing, declarations):
+    """
+    the names in an exposing list that isn't ALL, with the constructors of
+    its `Type(..)`s found in `declarations`
+    """
+    names = set()
+    open_types = set()
+    for name, constructors in exposing:
+        names.add(name)
+        if constructors == ALL:
+            open_types.add(name)
+        elif constructors:
+            names.update(constructors)
+    names.update(d.name for d in declarations
+                 if d.kind == CONSTRUCTOR and d.parent in open_types)
+    return frozenset(names)
+
+
+MODULE = "module"
+IMPORT = "import"
+DECLARATION = "declaration"
+# a type annotation, (name, signature), before the value it's for
+ANNOTATION = "annotation"
+
+
+def _items(numbered_chunks):
+    """
+    (MODULE, (name, exposing)), (IMPORT, Import) and (DECLARATION,
+    Declaration) for every (row, text) chunk
+    """
+    return join_items(chunk_items(start, text)
+                      for start, text in numbered_chunks)
+
+
+def join_items(chunk_item_lists):
+    """
+    the items of every chunk one after the other, with each annotation
+    put on the value it's for
+    """
+    signatures = {}
+    for items in chunk_item_lists:
+        for kind, item in items:
+            if kind == ANNOTATION:
+                signatures[item[0]] = item[1]
+                continue
+            if kind == DECLARATION and item.kind == VALUE and signatures:
+                signature = signatures.pop(item.name, None)
+                if signature is not None:
+                    item = Declaration(item.name, VALUE, item.row, item.col,
+                                       item.end_row, signature, None)
+            yield kind, item
+
+
+def chunk_items(start, text):
+    """
+    the items of the one chunk `text` on row `start`, with its annotation
+    as (ANNOTATION, (name, signature)) if it is one
+    """
+    end = start + text.count("\n")
+    m = _module_header.match(text)
+    if m:
+        return [(MODULE, (m.group(1), _header_exposing(text)))]
+    m = _import.match(text)
+    if m:
+        return [(IMPORT, _parse_import(m, text, start))]
+    m = _type_alias.match(text)
+    if m:
+        return [(DECLARATION, Declaration(
+            m.group(1), ALIAS, start, 0, end, None, None))]
+    m = _union_type.match(text)
+    if m:
+        return [(DECLARATION, Declaration(
+            m.group(1), TYPE, start, 0, end, None, None))] + [
+            (DECLARATION, d)
+            for d in _constructors(text, m.group(1), start, end)]
+    m = _port.match(text)
+    if m:
+        return [(DECLARATION, Declaration(
+            m.group(1), PORT, start, 0, end, _signature(text), None))]
+    m = _annotation.match(text)
+    if m:
+        return [(ANNOTATION, (m.group(1), _signature(text)))]
+    m = _value.match(text)
+    if m and m.group(1) not in _not_values:
+        value = m.group(1)
+        items = [(DECLARATION, Declaration(
+            value, VALUE, start, 0, end, None, None))]
+        if _let.search(text):
+            items.extend((DECLARATION, d)
+                         for d in _let_bindings(text.split("\n"), start,
+                                                value))
+        return items
+    return []
+
+
+def parse_file(path):
+    """
+    the ParsedModule for the file at `path`, kept with the file cache until
+    the file changes
+    """
+    return cache.derive(path, "parsed", parse)
+
+
+_chunk_start = re.compile(r"^\S", re.M)
+
+
+def chunks(blanked):
+    """
+    (offset, text) of every top level chunk in blanked source, without the
+    blank lines after it
+    """
+    starts = [m.start() for m in _chunk_start.finditer(blanked)]
+    starts.append(len(blanked))
+    for start, stop in zip(starts, starts[1:]):
+        yield start, blanked[start:stop].rstrip()
+
+
+def _numbered(blanked):
+    """
+    (row, text) of every top level chunk in blanked source
+    """
+    row = 0
+    last = 0
+    for offset, text in chunks(blanked):
+        # newlines are counted in C, a stretch at a time
+        row += blanked.count("\n", last, offset)
+        last = offset
+        yield row, text
+
+
+def _lexed(source):
+    """
+    (row, blanked text) of every top level chunk in `source`, blanking only
+    as far as it's been read. a line starting in the first column begins a
+    chunk unless it's inside a comment or a string, and nothing lexer.scan
+    finds can span two chunks.
+    """
+    for _, row, text in lexed_chunks(source):
+        yield row, text
+
+
+def lexed_chunks(source, pos=0, row=0):
+    """
+    _lexed with the offset of every chunk too, as (offset, row, text).
+    `pos` has to be where a chunk starts, on row `row`, to start there
+    instead of at the top.
+    """
+    tokens = lexer.scan(source, pos)
+    token = next(tokens, None)
+    inside = []
+    start = start_row = None
+    last = pos
+    for m in _chunk_start.finditer(source, pos):
+        offset = m.start()
+        while token is not None and token[2] <= offset:
+            inside.append(token)
+            token = next(tokens, None)
+        if token is not None and token[1] <= offset:
+            continue
+        row += source.count("\n", last, offset)
+        last = offset
+        if start is not None:
+            with stats.phase("mask_comments"):
+                text = lexer.blank_span(source, inside, start, offset)
+            yield start, start_row, text.rstrip()
+        start = offset
+        start_row = row
+        inside = []
+    if start is not None:
+        if token is not None:
+            inside.append(token)
+            inside.extend(tokens)
+        with stats.phase("mask_comments"):
+            text = lexer.blank_span(source, inside, start, len(source))
+        yield start, start_row, text.rstrip()
+
+
+def _signature(text):
+    """
+    the annotation after the first ":", or None for a port without one
+    """
+    if ":" not in text:
+        return None
+    return " ".join(text.split(":", 1)[1].split())
+
+
+def _parenthesized(text, open_paren):
+    """
+    the text between the paren at `open_paren` and its partner
+    """
+    depth = 0
+    for i in range(open_paren, len(text)):
+        if text[i] == "(":
+            depth += 1
+        elif text[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return text[open_paren + 1:i]
+    return text[open_paren + 1:]
+
+
+def _header_exposing(text):
+    m = _exposing.search(text)
+    if m is None:
+        # elm 0.16: module Foo (bar, baz) where
+        m = _old_style_exposing.match(text)
+    if m is None:
+        return ALL
+    return parse_exposing(_parenthesized(text, m.end() - 1))
+
+
+def _parse_import(match, text, row):
+    alias = _import_alias.search(text)
+    m = _exposing.search(text)
+    exposing = []
+    if m is not None:
+        exposing = parse_exposing(_parenthesized(text, m.end() - 1))
+    return Import(match.group(1), alias.group(1) if alias else None,
+                  exposing, row)
+
+
+def _split_top_level(text, separator):
+    parts = []
+    depth = 0
+    current = []
+    for c in text:
+        if c in "([{":
+            depth += 1
+        elif c in ")]}":
+            depth -= 1
+        if c == separator and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(c)
+    parts.append("".join(current))
+    return parts
+
+
+def parse_exposing(text):
+    """
+    the inside of an exposing list, like "Html, text, Attribute(..)"
+    """
+    if text.strip() == ALL:
+        return ALL
+    items = []
+    for item in _split_top_level(text, ","):
+        item = "".join(item.split())
+        if not item:
+            continue
+        if item.startswith("("):
+            # an operator, like (=>)
+            items.append((item[1:-1], None))
+        elif "(" in item:
+            name, _, inner = item.partition("(")
+            inner = inner.rstrip(")")
+            if inner == ALL:
+                items.append((name, ALL))
+            else:
+                items.append((name, [c for c in inner.split(",") if c]))
+        else:
+            items.append((item, None))
+    return items
+
+
+def _constructors(text, type_name, start, end):
+    equals = text.find("=")
+    if equals == -1:
+        return []
+    found = []
+    offset = equals + 1
+    for alternative in _split_top_level(text[equals + 1:], "|"):
+        m = _constructor_name.match(alternative)
+        if m:
+            row, col = _position(text, offset + m.start(1))
+            found.append(Declaration(
+                m.group(1), CONSTRUCTOR, start + row, col, end, None,
+                type_name))
+        offset += len(alternative) + 1
+    return found
+
+
+def _position(text, offset):
+    row = text.count("\n", 0, offset)
+    return row, offset - (text.rfind("\n", 0, offset) + 1)
+
+
+def _let_bindings(lines, start, parent):
+    """
+    let bindings in the `lines` of a chunk that starts on row `start`
+    """
+    binding_columns = set()
+    for i, line in enumerate(lines):
+        for m in _let.finditer(line):
+            after = line[m.end():]
+            if after.strip():
+                binding_columns.add(m.end() + len(after) - len(after.lstrip()))
+                continue
+            for following in lines[i + 1:]:
+                if following.strip():
+                    binding_columns.add(
+                        len(following) - len(following.lstrip()))
+                    break
+    if not binding_columns:
+        return []
+    found = []
+    for i, line in enumerate(lines):
+        row = start + i
+        m = _binding.match(line)
+        if i > 0 and m and m.group(2) not in _keywords and \
+                len(m.group(1)) in binding_columns:
+            found.append(Declaration(
+                m.group(2), LET, row, len(m.group(1)), row, None, parent))
+            continue
+        # a binding on the same line as its `let`
+        for let in _let.finditer(line):
+            inline = _binding.match(" " * let.end() + line[let.end():])
+            if inline:
+                found.append(Declaration(
+                    inline.group(2), LET, row, len(inline.group(1)), row,
+                    None, parent))
+    return found
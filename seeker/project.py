@@ -0,0 +1,113 @@
+"""
+everything about an elm project that doesn't change between lookups.
+
+a Project is worked out once from its elm.json (or elm-package.json for
+elm 0.18): where it lives, which source directories it and its
+dependencies have, and which file each module is in. projects are kept for
+the life of the process and only worked out again when that file changes,
+so every lookup in a server or batch run shares them.
+"""
+import os
+import logging
+
+import seeker
+from seeker import packages
+from seeker import stats
+from seeker import watch
+from seeker.modules import ModuleMap
+
+log = logging.getLogger(__name__)
+
+
+class Project(object):
+
+    def __init__(self, elm_package_path):
+        self.elm_package_path = elm_package_path
+        self.root = os.path.dirname(elm_package_path)
+        self.stamp = _stamp(elm_package_path)
+        self.source_dirs = seeker._searchable_sources(elm_package_path)
+        self._module_map = None
+        watch.watch_project(self)
+
+    @property
+    def module_map(self):
+        if self._module_map is None:
+            self._module_map = ModuleMap(self.source_dirs)
+        return self._module_map
+
+    def files_of(self, module_name):
+        """
+        files that define `module_name`, in source directory order. on a
+        miss the source directories are checked for new files before
+        giving up.
+        """
+        paths = self.module_map.paths(module_name)
+        if not paths and self.module_map.refresh():
+            paths = self.module_map.paths(module_name)
+        return paths
+
+    def is_stale(self):
+        return _stamp(self.elm_package_path) != self.stamp
+
+
+def _stamp(elm_package_path):
+    return packages.stamp(os.path.dirname(elm_package_path))
+
+
+# elm-package.json path -> Project
+_projects = {}
+# directory -> the elm-package.json that covers it
+_elm_packages = {}
+
+
+def get(elm_package_path):
+    """
+    the Project for an elm-package.json, shared for the life of the
+    process
+    """
+    project = _projects.get(elm_package_path)
+    if project is None or project.is_stale():
+        log.debug("loading project %s", elm_package_path)
+        with stats.phase("load_project"):
+            project = Project(elm_package_path)
+        _projects[elm_package_path] = project
+    return project
+
+
+def for_file(file_path):
+    """
+    the Project a file belongs to, or None if it's not in one
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    elm_package_path = _elm_packages.get(directory)
+    stats.count("stat_calls")
+    if elm_package_path is None or not os.path.exists(elm_package_path):
+        elm_package_path = seeker._elm_package_for(
+            os.path.abspath(file_path))
+        if elm_package_path is None:
+            return None
+        _elm_packages[directory] = elm_package_path
+    return get(elm_package_path)
+
+
+def changed(paths):
+    """
+    bring module maps up to date with files that were added, removed or
+    renamed, as told by seeker.watch
+    """
+    moved = [path for path in paths
+             if path.endswith(".elm") or not os.path.isfile(path)]
+    if not moved:
+        return
+    for p in _projects.values():
+        if p._module_map is not None:
+            p._module_map.update(moved)
+
+
+def forget():
+    """
+    drop every project, mostly for tests
+    """
+    _projects.clear()
+    _elm_packages.clear()
+    packages.forget()
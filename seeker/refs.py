@@ -0,0 +1,245 @@
+"""
+where every definition is used.
+
+find_location goes from a use to its definition, a ReferenceIndex goes the
+other way. every use of a name in the project's own source directories is
+resolved the way find_location would resolve it, through the file's
+ImportTable, so `U.whisper` and a name pulled in by an exposing list count
+and a name that only shows up in a comment or a string doesn't.
+
+reading a file gives, for every use, the modules its name could come from
+in the order they'd be tried. that only changes when the file does, so it's
+kept (and saved next to the symbol index). resolving those modules against
+the symbol index is dict lookups, so when definitions move around only
+that part is done again. installed packages are never edited, so uses
+inside them aren't collected.
+"""
+from __future__ import print_function
+import os
+import re
+import json
+import logging
+
+import seeker
+from seeker import cache
+from seeker import lexer
+from seeker import parser
+from seeker import scan
+from seeker import index as symbol_index
+from seeker.imports import ImportTable
+from seeker.modules import is_immutable, elm_files_in
+
+log = logging.getLogger(__name__)
+
+REFS_FORMAT = 2
+
+# an optionally qualified name that isn't a record field (`model.name`)
+_use = re.compile(r"(?<![\w.'])((?:[A-Z][\w']*\.)*)([A-Za-z_][\w']*)")
+_header = re.compile(r"(port |effect )?module\b|import\b")
+_reserved = set([
+    "module", "import", "exposing", "as", "port", "effect", "where", "type",
+    "alias", "infix", "infixl", "infixr", "let", "in", "if", "then", "else",
+    "case", "of",
+])
+
+
+def uses_in(path):
+    """
+    (name, row, col, local, modules) for every use of a name in the file at
+    `path`. `local` is True for unqualified names, which are looked for in
+    the file itself before `modules`.
+    """
+    source = cache.read(path, keep=False)
+    return uses_in_source(source, parser.parse(source))
+
+
+def uses_in_source(source, module):
+    """
+    uses_in for `source` that was parsed into ParsedModule `module` already
+    """
+    table = ImportTable(module.imports)
+    # the first time a declared name shows up on its row is the
+    # declaration, not a use. a type and its constructor of the same name
+    # on one row are two of them.
+    heads = {}
+    for d in module.declarations:
+        heads[(d.row, d.name)] = heads.get((d.row, d.name), 0) + 1
+    found = []
+    blanked = lexer.blank(source)
+    index = lexer.LineIndex(blanked)
+    for offset, text in parser.chunks(blanked):
+        if _header.match(text):
+            continue
+        for m in _use.finditer(blanked, offset, offset + len(text)):
+            qualifier, name = m.group(1), m.group(2)
+            row, col = index.position(m.start(2))
+            if not qualifier and heads.get((row, name)):
+                heads[(row, name)] -= 1
+                continue
+            if name in _reserved or col == 0:
+                continue
+            if qualifier:
+                alias = qualifier[:-1]
+                found.append((name, row, col, False,
+                              [table.module_for(alias) or alias]))
+            elif module.let_bindings(name, row):
+                found.append((name, row, col, True, []))
+            else:
+                found.append((name, row, col, True, table.candidates(name)))
+    return found
+
+
+class ReferenceIndex(object):
+
+    def __init__(self, symbols):
+        # the SymbolIndex uses get resolved against
+        self.symbols = symbols
+        # path -> (stamp, uses) for every file in a project source dir
+        self._uses = {}
+        # (path, row, col) of a definition -> [(path, row, col)] of its
+        # uses, worked out again whenever any file changed
+        self._references = None
+        # what symbols.generation was when they were worked out
+        self._generation = None
+        self.dirty = False
+
+    def refresh(self, jobs=1):
+        """
+        read files that changed since last time again, using the stamps the
+        symbol index already took. call after refreshing the symbol index.
+        """
+        wanted = {}
+        for source_dir in self.symbols.source_dirs:
+            if is_immutable(source_dir):
+                continue
+            for path in elm_files_in(source_dir):
+                stamp = self.symbols.stamp(path)
+                if stamp is not None:
+                    wanted.setdefault(path, stamp)
+        changed = [path for path, stamp in wanted.items()
+                   if self._uses.get(path, (None,))[0] != stamp]
+        gone = [path for path in self._uses if path not in wanted]
+        for path in gone:
+            del self._uses[path]
+        found = scan.map_files(uses_in, changed, jobs)
+        for path, uses in zip(changed, found):
+            log.debug("collected uses in %s", path)
+            self._uses[path] = (wanted[path], uses)
+        if changed or gone:
+            self._references = None
+            self.dirty = True
+
+    def _resolve(self):
+        references = {}
+        for path, (_, uses) in self._uses.items():
+            for name, row, col, local, modules in uses:
+                found = self.symbols.defined_in(path, name) if local else []
+                for m in modules:
+                    if found:
+                        break
+                    if self.symbols.exposes(m, name):
+                        found = self.symbols.lookup(m, name)
+                for d in found:
+                    references.setdefault((d.path, d.row, d.col), []).append(
+                        (path, row, col))
+        for uses in references.values():
+            uses.sort()
+        return references
+
+    def references(self, path, row, col):
+        """
+        every use of the definition at `path`, `row`, `col`, as
+        [path, row, col] in file order
+        """
+        if (self._references is None or
+                self._generation != self.symbols.generation):
+            self._references = self._resolve()
+            self._generation = self.symbols.generation
+        return [list(use) for use in
+                self._references.get((path, row, col), [])]
+
+    def __len__(self):
+        return sum(len(uses) for _, uses in self._uses.values())
+
+    def dump(self):
+        return {
+            "format": REFS_FORMAT,
+            "files": [[path, list(stamp), uses] for path, (stamp, uses)
+                      in sorted(self._uses.items())],
+        }
+
+    @classmethod
+    def restore(cls, symbols, dumped):
+        refs = cls(symbols)
+        if dumped.get("format") != REFS_FORMAT:
+            return refs
+        for path, stamp, uses in dumped["files"]:
+            refs._uses[path] = (tuple(stamp), [tuple(u) for u in uses])
+        return refs
+
+    def save(self, cache_path):
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.dump(), f, separators=(",", ":"))
+        os.rename(tmp_path, cache_path)
+        self.dirty = False
+
+
+def cache_path_for(project_root):
+    """
+    right next to the symbol index
+    """
+    index_path = symbol_index.cache_path_for(project_root)
+    return index_path[:-len(".json")] + "-refs.json"
+
+
+def load(p, symbols, jobs=None):
+    """
+    the reference index of Project `p`, resolved against its SymbolIndex
+    `symbols`, same as seeker.index.load
+    """
+    cache_path = cache_path_for(p.root)
+    refs = None
+    try:
+        with open(cache_path) as f:
+            refs = ReferenceIndex.restore(symbols, json.load(f))
+    except (IOError, OSError, ValueError, KeyError, TypeError) as e:
+        log.debug("not using cached references %s: %s", cache_path, e)
+    if refs is None:
+        refs = ReferenceIndex(symbols)
+    refs.refresh(jobs)
+    if refs.dirty:
+        try:
+            if not os.path.isdir(os.path.dirname(cache_path)):
+                os.makedirs(os.path.dirname(cache_path))
+            refs.save(cache_path)
+        except (IOError, OSError) as e:
+            log.debug("could not save references to %s: %s", cache_path, e)
+    return refs
+
+
+def find_references(cwd, file, row, col, identifier, index, refs):
+    """
+    every use of whatever `identifier` at `row`, `col` in `file` refers to,
+    which can be a use or the definition itself
+    """
+    path, def_row, def_col = seeker.find_location(
+        cwd, file, row, col, identifier, index=index)
+    return refs.references(path, def_row, def_col)
+
+
+def main(argv=None):
+    from seeker import project
+    args = seeker.arg_parser(batch=False).parse_args(argv)
+    level = logging.DEBUG if args.debug else logging.ERROR
+    logging.basicConfig(level=level)
+    cache.enable()
+    path = seeker._resolve(args.cwd, args.file)
+    p = project.for_file(path)
+    if p is None:
+        raise SystemExit("{} is not in an elm project".format(args.file))
+    index = symbol_index.load(p)
+    refs = load(p, index)
+    for location in find_references(args.cwd, path, args.row, args.col,
+                                    args.identifier, index, refs):
+        print(seeker.format_match(location))
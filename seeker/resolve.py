@@ -0,0 +1,173 @@
+"""
+where every name used in a file is defined, all at once.
+
+semantic highlighting and "show every link out of this file" need every
+name in a file resolved. asking find_location once per name reads the
+file's imports, works out the modules to try and goes through their files
+all over again for each one. `seeker resolve-file CURRENT_DIR FILE` reads
+the file and its imports once (refs.uses_in_source), collects the names
+it wants from each module, and then reads every module file once: one
+walk over its declarations picks out all the names wanted from it with a
+set lookup each, however many there are.
+
+uses that don't resolve (Basics, record fields the parser can't tell from
+values, modules that aren't installed) are left out.
+"""
+from __future__ import print_function
+import os
+import sys
+import json
+import logging
+
+import seeker
+from seeker import cache
+from seeker import parser
+from seeker import refs
+from seeker import stats
+
+log = logging.getLogger(__name__)
+
+
+def resolve_file(path, index=None):
+    """
+    (row, col, name, [path, row, col]) for every use of a name in the file
+    at `path` and where it's defined, in file order. pass a SymbolIndex as
+    `index` to look modules up in it instead of reading their files.
+    """
+    path = os.path.abspath(path)
+    with stats.phase("resolve_file"):
+        source = cache.read(path)
+        module = parser.parse_file(path)
+        uses = refs.uses_in_source(source, module)
+        # module -> names wanted from it
+        wanted = {}
+        for name, _, _, _, modules in uses:
+            for m in modules:
+                wanted.setdefault(m, set()).add(name)
+        if index is not None:
+            found = _definitions_in_index(index, wanted)
+        else:
+            found = _definitions_in_files(wanted, path)
+        resolved = []
+        for name, row, col, local, modules in uses:
+            location = _defined_here(module, path, name, row) if local \
+                else None
+            for m in modules:
+                if location is not None:
+                    break
+                location = found.get((m, name))
+            if location is not None:
+                resolved.append((row, col, name, location))
+        return resolved
+
+
+def _defined_here(module, path, name, row):
+    """
+    [path, row, col] of `name` in the file's own ParsedModule `module`,
+    top level first, then let bindings visible from `row`
+    """
+    defs = module.top_level(name) or module.let_bindings(name, row)
+    if not defs:
+        return None
+    return [path, defs[0].row, defs[0].col]
+
+
+def _definitions_in_files(wanted, found_in_file):
+    """
+    (module, name) -> [path, row, col] for the names in `wanted` (module ->
+    names) that the module exposes. if more than one file provides a
+    module, the first one that declares a name has it, same as
+    find_location.
+    """
+    # module of each file, files in the order they're searched
+    paths = []
+    module_of = {}
+    for m in sorted(wanted):
+        for p in seeker._files_of(m, found_in_file):
+            if p not in module_of:
+                module_of[p] = m
+                paths.append(p)
+    found = {}
+    for p in cache.read_ahead(paths):
+        m = module_of[p]
+        names = wanted[m]
+        try:
+            module = parser.parse_file(p)
+        except (IOError, OSError) as e:
+            log.debug("could not read %s: %s", p, e)
+            continue
+        exports = module.exports()
+        for d in module.declarations:
+            if d.name in names and d.name in exports and \
+                    (m, d.name) not in found and \
+                    parser.is_top_level(d, d.name):
+                found[(m, d.name)] = [p, d.row, d.col]
+    return found
+
+
+def _definitions_in_index(index, wanted):
+    found = {}
+    for m, names in wanted.items():
+        for name in names:
+            if not index.exposes(m, name):
+                continue
+            definitions = index.lookup(m, name)
+            if definitions:
+                d = definitions[0]
+                found[(m, name)] = [d.path, d.row, d.col]
+    return found
+
+
+def as_dict(resolved):
+    row, col, name, (path, def_row, def_col) = resolved
+    return {
+        "name": name, "row": row, "col": col,
+        "file": path, "def_row": def_row, "def_col": def_col,
+    }
+
+
+def arg_parser():
+    import argparse
+    p = argparse.ArgumentParser(
+        prog="seeker resolve-file",
+        description="find where every name used in a file is defined"
+    )
+    p.add_argument("cwd", metavar="CURRENT_DIR", type=str,
+                   help="dir of elm project")
+    p.add_argument("file", metavar="FILE", type=str,
+                   help="path to the file to resolve")
+    p.add_argument("--format", dest="format", choices=["json", "tsv"],
+                   default="json",
+                   help="one json object per line (the default), or tab "
+                        "separated row, col, name, file, def_row, def_col")
+    p.add_argument("--no-index", dest="use_index",
+                   const=False, default=True, action="store_const",
+                   help="read module files instead of using the cached "
+                        "index")
+    p.add_argument("-d", "--debug", dest="debug",
+                   const=True, default=False, action="store_const",
+                   help="turn on debug logging")
+    return p
+
+
+def main(argv=None):
+    from seeker import project
+    from seeker import index as symbol_index
+    args = arg_parser().parse_args(argv)
+    level = logging.DEBUG if args.debug else logging.ERROR
+    logging.basicConfig(level=level)
+    cache.enable()
+    path = seeker._resolve(args.cwd, args.file)
+    index = None
+    if args.use_index:
+        p = project.for_file(path)
+        if p is not None:
+            index = symbol_index.load(p)
+    out = sys.stdout
+    for resolved in resolve_file(path, index=index):
+        d = as_dict(resolved)
+        if args.format == "tsv":
+            out.write("\t".join(str(d[k]) for k in (
+                "row", "col", "name", "file", "def_row", "def_col")) + "\n")
+        else:
+            out.write(json.dumps(d, sort_keys=True) + "\n")
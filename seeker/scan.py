@@ -0,0 +1,136 @@
+"""
+dump every top level declaration and import in a project.
+
+`seeker scan` lists what's defined and imported where, for the project and
+every package it depends on, for other tools to use. parsing one file
+doesn't depend on any other, so files are spread over a pool of processes
+and the results put back together in source directory order, so the
+output is the same no matter how many processes did the work.
+"""
+from __future__ import print_function
+import io
+import os
+import sys
+import json
+import logging
+
+try:
+    import concurrent.futures as futures
+except ImportError:  # python 2 without the futures backport
+    futures = None
+
+from seeker import parser
+from seeker import project
+from seeker.modules import elm_files_in, module_name_for
+
+log = logging.getLogger(__name__)
+
+IMPORT = "import"
+
+# below this many files a pool costs more to start than it saves
+MIN_FILES_FOR_POOL = 32
+
+
+def scan_file(path):
+    """
+    (row, col, kind, name) for every top level declaration and import in
+    the file at `path`. imports have the kind IMPORT and the imported module
+    as the name.
+    """
+    with io.open(path, encoding="utf-8") as f:
+        module = parser.parse(f.read())
+    records = [(i.row, 0, IMPORT, i.module) for i in module.imports]
+    records.extend((d.row, d.col, d.kind, d.name)
+                   for d in module.declarations if d.kind != parser.LET)
+    records.sort()
+    return records
+
+
+def default_jobs():
+    try:
+        import multiprocessing
+        return multiprocessing.cpu_count()
+    except (ImportError, NotImplementedError):
+        return 1
+
+
+def map_files(fn, paths, jobs=None):
+    """
+    fn(path) for every path, in order, spread over `jobs` processes (all
+    cores if None). runs in this process when there's no point in a pool.
+    """
+    paths = list(paths)
+    if jobs is None:
+        jobs = default_jobs()
+    if jobs <= 1 or futures is None or len(paths) < MIN_FILES_FOR_POOL:
+        return [fn(p) for p in paths]
+    chunksize = max(1, len(paths) // (jobs * 4))
+    with futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(fn, paths, chunksize=chunksize))
+
+
+def files_of(source_dirs):
+    """
+    (path, module) for every elm file, in source directory order. a file
+    that shows up under two source directories only counts the first time.
+    """
+    seen = set()
+    for source_dir in source_dirs:
+        for path in elm_files_in(source_dir):
+            if path not in seen:
+                seen.add(path)
+                yield path, module_name_for(path, source_dir)
+
+
+def scan(source_dirs, jobs=None):
+    """
+    generate (path, module, records) for every elm file in `source_dirs`,
+    see `scan_file` for the records
+    """
+    files = list(files_of(source_dirs))
+    results = map_files(scan_file, [path for path, _ in files], jobs)
+    for (path, module), records in zip(files, results):
+        yield path, module, records
+
+
+def arg_parser():
+    import argparse
+    p = argparse.ArgumentParser(
+        prog="seeker scan",
+        description="list every top level declaration and import in a "
+                    "project and its dependencies"
+    )
+    p.add_argument("cwd", metavar="CURRENT_DIR", type=str, nargs="?",
+                   default=".", help="dir of elm project")
+    p.add_argument("-j", "--jobs", dest="jobs", type=int, default=None,
+                   help="processes to parse with, all cores by default")
+    p.add_argument("--format", dest="format", choices=["json", "tsv"],
+                   default="json",
+                   help="one json object per line (the default), or tab "
+                        "separated file, row, col, kind, name, module")
+    p.add_argument("-d", "--debug", dest="debug",
+                   const=True, default=False, action="store_const",
+                   help="turn on debug logging")
+    return p
+
+
+def main(argv=None):
+    args = arg_parser().parse_args(argv)
+    level = logging.DEBUG if args.debug else logging.ERROR
+    logging.basicConfig(level=level)
+    p = project.for_file(
+        os.path.join(os.path.abspath(args.cwd), "elm-package.json"))
+    if p is None:
+        sys.exit("no elm.json or elm-package.json in or above {}".format(
+            args.cwd))
+    out = sys.stdout
+    for path, module, records in scan(p.source_dirs, args.jobs):
+        for row, col, kind, name in records:
+            if args.format == "tsv":
+                out.write("\t".join(
+                    [path, str(row), str(col), kind, name, module]) + "\n")
+            else:
+                out.write(json.dumps({
+                    "file": path, "module": module, "row": row, "col": col,
+                    "kind": kind, "name": name,
+                }, sort_keys=True) + "\n")
@@ -0,0 +1,416 @@
+"""
+long running seeker process that answers lookups over JSON-RPC.
+
+every jump from an editor used to start a whole new python, re-import
+everything and re-read every elm-package.json. `seeker serve` sticks
+around instead and keeps what it has read warm between requests.
+
+the wire format is JSON-RPC 2.0, one json object per line, either over
+stdin/stdout or a unix socket. `seeker client` is a shim that talks to a
+running server and prints the same "MATCH path row col" line the plain
+`seeker` command does, so editor plugins only need to swap the command.
+"""
+from __future__ import print_function
+import os
+import sys
+import json
+import socket
+import inspect
+import logging
+
+try:
+    import socketserver
+except ImportError:  # python 2
+    import SocketServer as socketserver
+
+import seeker
+from seeker import answers
+from seeker import cache
+from seeker import index as symbol_index
+from seeker import project
+from seeker import stats
+from seeker import watch
+from seeker import refs as reference_index
+from seeker import resolve
+from seeker import symbols as symbol_search
+
+log = logging.getLogger(__name__)
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+# server defined errors, so clients can raise the same exceptions the
+# library does
+CANNOT_FIND_IDENTIFIER = -32001
+SEARCH_ERROR = -32002
+
+_error_codes = {
+    seeker.CannotFindIdentifier: CANNOT_FIND_IDENTIFIER,
+    seeker.SearchError: SEARCH_ERROR,
+}
+
+
+class RemoteError(Exception):
+
+    def __init__(self, code, message):
+        super(RemoteError, self).__init__(message)
+        self.code = code
+
+
+class Server(object):
+    """
+    dispatches JSON-RPC requests to seeker. holds on to the file cache and
+    a symbol index per project for as long as it lives.
+    """
+
+    def __init__(self, use_index=True, watching=False):
+        self.cache = cache.enable()
+        self.answers = answers.enable()
+        self.use_index = use_index
+        if watching:
+            watch.start()
+        # project root -> SymbolIndex
+        self.indexes = {}
+        # project root -> ReferenceIndex
+        self.references = {}
+        self.running = True
+        # everything every request did, for the stats method
+        self.stats = stats.Stats()
+        self._methods = {
+            "find_location": self.find_location,
+            "find_references": self.find_references,
+            "resolve_file": self.resolve_file,
+            "symbols": self.symbols,
+            "ping": self.ping,
+            "stats": self.get_stats,
+            "shutdown": self.shutdown,
+        }
+
+    def find_location(self, cwd, file, row, col, identifier, source=None):
+        file = seeker._resolve(cwd, file)
+        index = self.index_for(file) if self.use_index else None
+        return seeker.find_location(cwd, file, row, col, identifier,
+                                    index=index, source=source)
+
+    def index_for(self, file):
+        """
+        the index of the project `file` is in, brought up to date with
+        whatever changed on disk since the last request
+        """
+        # with seeker.watch on, only what it saw change gets indexed again.
+        # polling can be a save behind, so then the index is checked too
+        changed = watch.sync()
+        if changed:
+            with stats.phase("update_index"):
+                for index in self.indexes.values():
+                    index.update(changed)
+        p = project.for_file(file)
+        if p is None:
+            return None
+        index = self.indexes.get(p.root)
+        if index is None or index.source_dirs != p.source_dirs:
+            index = symbol_index.load(p)
+            self.indexes[p.root] = index
+        elif changed is None or not watch.active().immediate:
+            with stats.phase("refresh_index"):
+                index.refresh()
+        return index
+
+    def find_references(self, cwd, file, row, col, identifier):
+        file = seeker._resolve(cwd, file)
+        index = self.index_for(file)
+        if index is None:
+            raise seeker.CannotFindIdentifier(
+                "{} is not in an elm project".format(file))
+        return reference_index.find_references(
+            cwd, file, row, col, identifier, index, self.refs_for(file))
+
+    def resolve_file(self, cwd, file):
+        path = seeker._resolve(cwd, file)
+        index = self.index_for(path) if self.use_index else None
+        return [resolve.as_dict(r)
+                for r in resolve.resolve_file(path, index=index)]
+
+    def symbols(self, cwd, query, limit=symbol_search.DEFAULT_LIMIT):
+        index = self.index_for(os.path.join(
+            os.path.abspath(cwd), "elm-package.json"))
+        if index is None:
+            raise seeker.CannotFindIdentifier(
+                "{} is not in an elm project".format(cwd))
+        return [symbol_search.as_dict(d)
+                for d in symbol_search.search(index, query, limit)]
+
+    def refs_for(self, file):
+        """
+        the reference index of the project `file` is in. call after
+        `index_for`, which brings the symbol index it sits on up to date.
+        """
+        p = project.for_file(file)
+        index = self.indexes[p.root]
+        refs = self.references.get(p.root)
+        if refs is None or refs.symbols is not index:
+            refs = reference_index.load(p, index)
+            self.references[p.root] = refs
+        else:
+            refs.refresh()
+        return refs
+
+    def ping(self):
+        return "pong"
+
+    def get_stats(self):
+        """
+        time per phase and counters summed over every request so far, and
+        how often the answer cache had the answer
+        """
+        summed = self.stats.as_dict()
+        summed["answers"] = self.answers.as_dict()
+        return summed
+
+    def shutdown(self):
+        self.running = False
+        self.save_indexes()
+        return None
+
+    def save_indexes(self):
+        """
+        write indexes that changed since they were loaded back to disk so
+        the next server or cli run starts from them
+        """
+        for root, index in self.indexes.items():
+            if not index.dirty:
+                continue
+            try:
+                index.save(symbol_index.cache_path_for(root))
+            except (IOError, OSError) as e:
+                log.debug("could not save index for %s: %s", root, e)
+        for root, refs in self.references.items():
+            if not refs.dirty:
+                continue
+            try:
+                refs.save(reference_index.cache_path_for(root))
+            except (IOError, OSError) as e:
+                log.debug("could not save references for %s: %s", root, e)
+
+    def handle(self, request):
+        """
+        run one decoded request, give back the response dict or None for
+        notifications
+        """
+        if not isinstance(request, dict) or "method" not in request:
+            return _error(None, INVALID_REQUEST, "invalid request")
+        request_id = request.get("id")
+        is_notification = "id" not in request
+        method = self._methods.get(request["method"])
+        if method is None:
+            return _error(request_id, METHOD_NOT_FOUND,
+                          "no method {}".format(request["method"]))
+        params = request.get("params", [])
+        if isinstance(params, dict):
+            args, kwargs = [], params
+        elif isinstance(params, list):
+            args, kwargs = params, {}
+        else:
+            return _error(request_id, INVALID_PARAMS,
+                          "params have to be a list or an object")
+        try:
+            # only the arguments not fitting the method is the caller's
+            # fault, a TypeError from inside it is seeker's
+            inspect.getcallargs(method, *args, **kwargs)
+        except TypeError as e:
+            return _error(request_id, INVALID_PARAMS, str(e))
+        try:
+            with stats.collect(self.stats):
+                result = method(*args, **kwargs)
+        except tuple(_error_codes) as e:
+            return _error(request_id, _error_codes[type(e)], str(e))
+        except Exception as e:
+            log.exception("failed handling %s", request["method"])
+            return _error(request_id, INTERNAL_ERROR, str(e))
+        if is_notification:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def handle_line(self, line):
+        """
+        same as `handle` but for a raw line off the wire, gives back the
+        encoded response line or None
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            response = _error(None, PARSE_ERROR, str(e))
+        else:
+            response = self.handle(request)
+        if response is None:
+            return None
+        return json.dumps(response) + "\n"
+
+    def serve_stream(self, rfile, wfile):
+        """
+        answer requests from a text stream until it closes or the server is
+        shut down
+        """
+        while self.running:
+            line = rfile.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            response = self.handle_line(line)
+            if response is not None:
+                wfile.write(response)
+                wfile.flush()
+
+
+def _error(request_id, code, message):
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {"code": code, "message": message},
+    }
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        server = self.server.seeker_server
+        while server.running:
+            line = self.rfile.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            response = server.handle_line(line.decode("utf-8"))
+            if response is not None:
+                self.wfile.write(response.encode("utf-8"))
+                self.wfile.flush()
+
+
+def default_socket_path():
+    if os.environ.get("SEEKER_SOCKET"):
+        return os.environ["SEEKER_SOCKET"]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "seeker.sock")
+    return "/tmp/seeker-{}.sock".format(os.getuid())
+
+
+def serve_stdio(server=None):
+    server = server or Server()
+    server.serve_stream(sys.stdin, sys.stdout)
+
+
+def serve_unix(socket_path, server=None):
+    """
+    handles one connection at a time, so nothing has to lock the caches
+    """
+    server = server or Server()
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    listener = socketserver.UnixStreamServer(socket_path, _Handler)
+    listener.seeker_server = server
+    log.debug("listening on %s", socket_path)
+    try:
+        while server.running:
+            listener.handle_request()
+    finally:
+        listener.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def call(socket_path, method, params=None, timeout=None):
+    """
+    send one request to a running server and return its result
+    """
+    request = {"jsonrpc": "2.0", "id": 1, "method": method,
+               "params": params if params is not None else []}
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.settimeout(timeout)
+    try:
+        conn.connect(socket_path)
+        conn.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        chunks = []
+        while True:
+            chunk = conn.recv(4096)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if chunk.endswith(b"\n"):
+                break
+    finally:
+        conn.close()
+    response = json.loads(b"".join(chunks).decode("utf-8"))
+    if "error" in response:
+        error = response["error"]
+        for exc_type, code in _error_codes.items():
+            if code == error["code"]:
+                raise exc_type(error["message"])
+        raise RemoteError(error["code"], error["message"])
+    return response.get("result")
+
+
+def serve_arg_parser():
+    import argparse
+    p = argparse.ArgumentParser(
+        prog="seeker serve",
+        description="answer seeker lookups over JSON-RPC"
+    )
+    p.add_argument("--socket", dest="socket", default=None,
+                   help="listen on this unix socket instead of stdio")
+    p.add_argument("--watch", dest="watching",
+                   const=True, default=False, action="store_const",
+                   help="watch projects for changes instead of checking "
+                        "every file on every request")
+    p.add_argument("-d", "--debug", dest="debug",
+                   const=True, default=False, action="store_const",
+                   help="turn on debug logging")
+    return p
+
+
+def client_arg_parser():
+    p = seeker.arg_parser(batch=False)
+    p.prog = "seeker client"
+    p.description = "ask a running `seeker serve` for a definition"
+    p.add_argument("--socket", dest="socket", default=None,
+                   help="unix socket the server listens on")
+    return p
+
+
+def serve_main(argv=None):
+    args = serve_arg_parser().parse_args(argv)
+    level = logging.DEBUG if args.debug else logging.ERROR
+    # logging goes to stderr, stdout is for responses
+    logging.basicConfig(level=level)
+    server = Server(watching=args.watching)
+    if args.socket:
+        serve_unix(args.socket, server)
+    else:
+        serve_stdio(server)
+
+
+def client_main(argv=None):
+    """
+    prints the same MATCH line as `seeker`. if no server is listening it
+    does the lookup itself so editors never end up with nothing.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    args = client_arg_parser().parse_args(argv)
+    level = logging.DEBUG if args.debug else logging.ERROR
+    logging.basicConfig(level=level)
+    socket_path = args.socket or default_socket_path()
+    params = [args.cwd, seeker._resolve(args.cwd, args.file), args.row,
+              args.col, args.identifier]
+    source = sys.stdin.read() if args.stdin else None
+    try:
+        location = call(socket_path, "find_location",
+                        params + [source] if args.stdin else params)
+    except socket.error as e:
+        log.debug("no server at %s (%s), looking it up here",
+                  socket_path, e)
+        location = seeker.find_location(*params, source=source)
+    print(seeker.format_match(location))
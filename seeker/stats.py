@@ -0,0 +1,101 @@
+"""
+where the time in a lookup goes.
+
+the slow parts of find_location are spread around: finding the
+elm-package.json, expanding dependency source directories, probing for
+module files, masking comments and parsing. each of them runs inside a
+`phase`, and file reads, stat calls and cache hits get `count`ed, so
+
+    with stats.collect() as s:
+        seeker.find_location(...)
+    print(s.report())
+
+shows what a lookup did. nothing gets timed or formatted unless somebody
+is collecting, so the calls stay in even when nobody is looking.
+"""
+from timeit import default_timer as timer
+from contextlib import contextmanager
+
+COUNTERS = ["files_opened", "bytes_read", "stat_calls", "cache_hits",
+            "cache_misses"]
+
+# every Stats being collected right now, collections can nest
+_collecting = []
+
+
+class Stats(object):
+
+    def __init__(self):
+        # phase -> [seconds, calls]
+        self.phases = {}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+    def add_time(self, name, seconds):
+        phase = self.phases.setdefault(name, [0.0, 0])
+        phase[0] += seconds
+        phase[1] += 1
+
+    def as_dict(self):
+        return {
+            "phases": dict(
+                (name, {"ms": seconds * 1000, "calls": calls})
+                for name, (seconds, calls) in self.phases.items()),
+            "counters": dict(self.counters),
+        }
+
+    def report(self):
+        """
+        a table of phases, slowest first, and the counters under it
+        """
+        lines = ["{:<24} {:>10} {:>7}".format("phase", "ms", "calls")]
+        for name, (seconds, calls) in sorted(
+                self.phases.items(), key=lambda p: -p[1][0]):
+            lines.append("{:<24} {:>10.3f} {:>7}".format(
+                name, seconds * 1000, calls))
+        lines.append(", ".join("{} {}".format(k.replace("_", " "), v)
+                               for k, v in sorted(self.counters.items())))
+        return "\n".join(lines)
+
+
+@contextmanager
+def collect(into=None):
+    """
+    count everything that happens in the block into a Stats (`into`, or a
+    new one) and give it out
+    """
+    collected = into if into is not None else Stats()
+    _collecting.append(collected)
+    try:
+        yield collected
+    finally:
+        _collecting.remove(collected)
+
+
+def count(name, n=1):
+    if _collecting:
+        for s in _collecting:
+            s.counters[name] = s.counters.get(name, 0) + n
+
+
+class phase(object):
+    """
+    times the block under `name`. phases can nest, each one gets the whole
+    time spent in it.
+    """
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        if _collecting:
+            self.start = timer()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.start is not None:
+            elapsed = timer() - self.start
+            for s in _collecting:
+                s.add_time(self.name, elapsed)
+        return False
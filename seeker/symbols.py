@@ -0,0 +1,179 @@
+"""
+find definitions by (part of) their name.
+
+`seeker symbols QUERY` is for "jump to symbol" pickers that ask again on
+every keystroke, across the project and everything in elm-stuff/packages.
+every name in the SymbolIndex goes in a SymbolTable, sorted without case,
+so names starting with the query are one bisect away. if there aren't
+enough of those, names that have the query's letters in order ("tup"
+for "toUpper") are found with one regex over all the names joined
+into one string, so the loop over 100k names happens in C.
+"""
+from __future__ import print_function
+import os
+import re
+import sys
+import json
+import heapq
+import bisect
+import logging
+import weakref
+
+from seeker import cache
+from seeker import project
+from seeker import index as symbol_index
+
+log = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 20
+
+
+class SymbolTable(object):
+
+    def __init__(self, names):
+        self.names = sorted(set(names), key=lambda n: (n.lower(), n))
+        self._folded = [n.lower() for n in self.names]
+        self._joined = "\n".join(self._folded)
+        # where each name starts in _joined
+        self._offsets = []
+        offset = 0
+        for name in self._folded:
+            self._offsets.append(offset)
+            offset += len(name) + 1
+
+    def __len__(self):
+        return len(self.names)
+
+    def prefixed(self, query):
+        """
+        indexes of names that start with `query`, ignoring case
+        """
+        query = query.lower()
+        start = bisect.bisect_left(self._folded, query)
+        end = bisect.bisect_left(self._folded, query + u"\uffff", start)
+        return range(start, end)
+
+    def fuzzy(self, query, among=None):
+        """
+        (first letter, span, length, index) for names that have every
+        letter of `query` in order, ignoring case. `among` is a range of
+        indexes to look at instead of all of them.
+        """
+        among = among if among is not None else range(len(self.names))
+        if not among:
+            return
+        # [^\nx]*x never backtracks past the end of a name, and starting
+        # with a plain letter lets the regex engine skip straight to it
+        letters = [re.escape(c) for c in query.lower()]
+        pattern = re.compile(letters[0] + "".join(
+            r"[^\n{0}]*{0}".format(c) for c in letters[1:]))
+        start = self._offsets[among[0]]
+        end = self._offsets[among[-1]] + len(self._folded[among[-1]])
+        last = None
+        for m in pattern.finditer(self._joined, start, end):
+            i = bisect.bisect_right(self._offsets, m.start(), among[0]) - 1
+            if i != last:
+                last = i
+                yield (m.start() - self._offsets[i], m.end() - m.start(),
+                       len(self.names[i]), i)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """
+        up to `limit` names matching `query`, best first: exact matches,
+        then the shortest names starting with it, then the names with its
+        letters closest together and nearest the start
+        """
+        if not query:
+            return []
+        best = heapq.nsmallest(limit, self.prefixed(query), key=lambda i: (
+            self.names[i] != query, len(self.names[i]), i))
+        # names that at least start with the first letter beat the rest,
+        # so the whole table only gets looked at if there's too few of them
+        for among in (self.prefixed(query[0]), None):
+            if len(best) >= limit:
+                break
+            taken = set(best)
+            rest = (f for f in self.fuzzy(query, among) if f[3] not in taken)
+            best.extend(f[3] for f in heapq.nsmallest(
+                limit - len(best), rest))
+        return [self.names[i] for i in best]
+
+
+# SymbolIndex -> (generation, SymbolTable), so a table only gets sorted
+# again once definitions changed
+_tables = weakref.WeakKeyDictionary()
+
+
+def table_for(index):
+    generation, table = _tables.get(index, (None, None))
+    if generation != index.generation:
+        names = index.names()
+        log.debug("sorting %s names", len(names))
+        table = SymbolTable(names)
+        _tables[index] = (index.generation, table)
+    return table
+
+
+def search(index, query, limit=DEFAULT_LIMIT):
+    """
+    up to `limit` Definitions in `index` whose names match `query`, best
+    first
+    """
+    found = []
+    for name in table_for(index).search(query, limit):
+        found.extend(index.definitions(name))
+        if len(found) >= limit:
+            break
+    return found[:limit]
+
+
+def as_dict(definition):
+    return {
+        "name": definition.name, "kind": definition.kind,
+        "module": definition.module, "file": definition.path,
+        "row": definition.row, "col": definition.col,
+    }
+
+
+def arg_parser():
+    import argparse
+    p = argparse.ArgumentParser(
+        prog="seeker symbols",
+        description="find definitions in a project and its dependencies by "
+                    "name, or by letters of their name in order"
+    )
+    p.add_argument("query", metavar="QUERY", type=str)
+    p.add_argument("cwd", metavar="CURRENT_DIR", type=str, nargs="?",
+                   default=".", help="dir of elm project")
+    p.add_argument("-n", "--limit", dest="limit", type=int,
+                   default=DEFAULT_LIMIT,
+                   help="how many to list, {} by default".format(
+                       DEFAULT_LIMIT))
+    p.add_argument("--format", dest="format", choices=["json", "tsv"],
+                   default="json",
+                   help="one json object per line (the default), or tab "
+                        "separated name, kind, module, file, row, col")
+    p.add_argument("-d", "--debug", dest="debug",
+                   const=True, default=False, action="store_const",
+                   help="turn on debug logging")
+    return p
+
+
+def main(argv=None):
+    args = arg_parser().parse_args(argv)
+    level = logging.DEBUG if args.debug else logging.ERROR
+    logging.basicConfig(level=level)
+    cache.enable()
+    p = project.for_file(
+        os.path.join(os.path.abspath(args.cwd), "elm-package.json"))
+    if p is None:
+        sys.exit("no elm.json or elm-package.json in or above {}".format(
+            args.cwd))
+    out = sys.stdout
+    for d in search(symbol_index.load(p), args.query, args.limit):
+        if args.format == "tsv":
+            out.write("\t".join(
+                [d.name, d.kind, d.module, d.path, str(d.row), str(d.col)]) +
+                "\n")
+        else:
+            out.write(json.dumps(as_dict(d), sort_keys=True) + "\n")
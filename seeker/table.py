@@ -0,0 +1,266 @@
+"""
+a compact table of definitions, for holding a whole project and all of
+elm-stuff/packages in memory at once. it's what a SymbolIndex keeps its
+definitions in.
+
+a Definition namedtuple per symbol costs well over a hundred bytes before
+its strings. a DefinitionTable keeps every definition as one row across
+a few `array` columns instead: the name, module and file are ids of
+strings interned once in the table, the kind is a byte, and the row and
+column are packed into one integer. that's 21 bytes a row, and 8 more
+once names get looked up. every distinct string is kept once on top of
+that, which is most of it when nearly every name is different: about
+100 bytes a definition altogether on benchmarks/synthetic.py projects,
+where namedtuples take about 400. `memory()` says what it actually
+takes.
+
+the rows of a file can be dropped again (when it changes, say). they're
+only marked dead, and the table is packed again once half of it is.
+
+rows only come back out as Definitions when somebody asks for them.
+"""
+import sys
+import array
+import bisect
+from collections import namedtuple
+
+from seeker import parser
+
+Definition = namedtuple("Definition", "name kind module path row col")
+
+KINDS = [parser.VALUE, parser.TYPE, parser.ALIAS, parser.CONSTRUCTOR,
+         parser.PORT, parser.LET]
+_kind_ids = dict((kind, i) for i, kind in enumerate(KINDS))
+# the kind of a row whose file was dropped
+_DEAD = 255
+
+# positions are row << COL_BITS | col, in 64 bits where array has them,
+# which leaves 32 bits for each
+try:
+    array.array("Q")
+    _POSITION_TYPE = "Q"
+except ValueError:  # python 2
+    _POSITION_TYPE = "L"
+COL_BITS = 32 if array.array(_POSITION_TYPE).itemsize >= 8 else 16
+_COL_MASK = (1 << COL_BITS) - 1
+
+# rows added since the name index was sorted are looked through one by one
+# until there are this many of them (or an eighth of the table)
+UNSORTED_ROWS = 1024
+
+
+class Strings(object):
+    """
+    every distinct string once, each with an integer id
+    """
+
+    def __init__(self):
+        self.strings = []
+        self._ids = {}
+
+    def id(self, s):
+        i = self._ids.get(s)
+        if i is None:
+            i = self._ids[s] = len(self.strings)
+            self.strings.append(s)
+        return i
+
+    def find(self, s):
+        """
+        the id of `s`, or None if it was never added
+        """
+        return self._ids.get(s)
+
+    def __getitem__(self, i):
+        return self.strings[i]
+
+    def __len__(self):
+        return len(self.strings)
+
+    def memory(self):
+        return (sys.getsizeof(self.strings) + sys.getsizeof(self._ids) +
+                sum(sys.getsizeof(s) for s in self.strings))
+
+
+class DefinitionTable(object):
+
+    def __init__(self, definitions=()):
+        self.strings = Strings()
+        self._names = array.array("I")
+        self._kinds = array.array("B")
+        self._modules = array.array("I")
+        self._paths = array.array("I")
+        self._positions = array.array(_POSITION_TYPE)
+        # path id -> [first row, row after the last, ...] of its rows
+        self._files = {}
+        # how many rows are dead
+        self._dead = 0
+        # row numbers sorted by name id, worked out on the first lookup,
+        # their name ids (to bisect), and the rows added since
+        self._by_name = None
+        self._sorted_names = None
+        self._unsorted = array.array("I")
+        for d in definitions:
+            self.add(d.name, d.kind, d.module, d.path, d.row, d.col)
+
+    def add(self, name, kind, module, path, row, col):
+        # a column wider than that (minified code, say) is kept as the
+        # widest one there is rather than losing the whole file
+        col = min(col, _COL_MASK)
+        intern = self.strings.id
+        i = len(self._names)
+        path_id = intern(path)
+        self._names.append(intern(name))
+        self._kinds.append(_kind_ids[kind])
+        self._modules.append(intern(module))
+        self._paths.append(path_id)
+        self._positions.append(row << COL_BITS | col)
+        ranges = self._files.setdefault(path_id, [])
+        if ranges and ranges[-1] == i:
+            ranges[-1] = i + 1
+        else:
+            ranges.extend([i, i + 1])
+        if self._by_name is not None:
+            self._unsorted.append(i)
+
+    def add_file(self, path, module, found):
+        """
+        add the (name, kind, row, col) of everything defined in the file
+        at `path`
+        """
+        for name, kind, row, col in found:
+            self.add(name, kind, module, path, row, col)
+
+    def remove_file(self, path):
+        """
+        drop every row of the file at `path`
+        """
+        path_id = self.strings.find(path)
+        ranges = self._files.pop(path_id, None) if path_id is not None \
+            else None
+        if not ranges:
+            return
+        kinds = self._kinds
+        for start, stop in zip(ranges[::2], ranges[1::2]):
+            for i in range(start, stop):
+                kinds[i] = _DEAD
+            self._dead += stop - start
+        if self._dead * 2 > len(self._names):
+            self._pack()
+
+    def _pack(self):
+        """
+        make the table again from the rows that aren't dead, which also
+        lets go of strings only they used
+        """
+        packed = DefinitionTable(iter(self))
+        self.__dict__.update(packed.__dict__)
+
+    def __len__(self):
+        return len(self._names) - self._dead
+
+    def __getitem__(self, i):
+        position = self._positions[i]
+        s = self.strings
+        return Definition(s[self._names[i]], KINDS[self._kinds[i]],
+                          s[self._modules[i]], s[self._paths[i]],
+                          position >> COL_BITS, position & _COL_MASK)
+
+    def __iter__(self):
+        kinds = self._kinds
+        for i in range(len(self._names)):
+            if kinds[i] != _DEAD:
+                yield self[i]
+
+    def _rows_named(self, name_id):
+        """
+        the rows named `name_id` that aren't dead, in the order they were
+        added
+        """
+        unsorted = self._unsorted
+        if self._by_name is None or len(unsorted) > max(
+                UNSORTED_ROWS, len(self._names) // 8):
+            names = self._names
+            self._by_name = array.array("I", sorted(
+                range(len(names)), key=names.__getitem__))
+            self._sorted_names = array.array(
+                "I", (names[i] for i in self._by_name))
+            del unsorted[:]
+        by_name, names, kinds = self._by_name, self._names, self._kinds
+        sorted_names = self._sorted_names
+        for j in range(bisect.bisect_left(sorted_names, name_id),
+                       bisect.bisect_right(sorted_names, name_id)):
+            if kinds[by_name[j]] != _DEAD:
+                yield by_name[j]
+        # added after everything sorted, so they come after it too
+        for i in unsorted:
+            if names[i] == name_id and kinds[i] != _DEAD:
+                yield i
+
+    def definitions(self, name):
+        """
+        every definition of `name`, in the order they were added
+        """
+        name_id = self.strings.find(name)
+        if name_id is None:
+            return []
+        return [self[i] for i in self._rows_named(name_id)]
+
+    def lookup(self, module, name):
+        """
+        definitions of `name` in `module`
+        """
+        module_id = self.strings.find(module)
+        name_id = self.strings.find(name)
+        if module_id is None or name_id is None:
+            return []
+        return [self[i] for i in self._rows_named(name_id)
+                if self._modules[i] == module_id]
+
+    def in_file(self, path, name=None):
+        """
+        definitions in the file at `path`, or only the ones of `name`
+        """
+        path_id = self.strings.find(path)
+        if path_id is None or path_id not in self._files:
+            return []
+        if name is not None:
+            name_id = self.strings.find(name)
+            if name_id is None:
+                return []
+            return [self[i] for i in self._rows_named(name_id)
+                    if self._paths[i] == path_id]
+        ranges = self._files[path_id]
+        return [self[i] for start, stop in zip(ranges[::2], ranges[1::2])
+                for i in range(start, stop)]
+
+    def names(self):
+        """
+        every name with a row that isn't dead
+        """
+        s, kinds = self.strings, self._kinds
+        return set(s[n] for i, n in enumerate(self._names)
+                   if kinds[i] != _DEAD)
+
+    def memory(self):
+        """
+        bytes taken by the columns and by the interned strings, and the
+        two together per definition
+        """
+        columns = sum(
+            sys.getsizeof(column) for column in (
+                self._names, self._kinds, self._modules, self._paths,
+                self._positions, self._by_name, self._sorted_names,
+                self._unsorted)
+            if column is not None)
+        columns += sys.getsizeof(self._files) + sum(
+            sys.getsizeof(ranges) for ranges in self._files.values())
+        strings = self.strings.memory()
+        return {
+            "definitions": len(self),
+            "strings": len(self.strings),
+            "column_bytes": columns,
+            "string_bytes": strings,
+            "bytes_per_definition":
+                float(columns + strings) / max(len(self), 1),
+        }
@@ -0,0 +1,356 @@
+"""
+keep the in-process caches right by watching the file system.
+
+with the file cache on (see seeker.cache) every read still costs a stat to
+check the file didn't change. an editor that imports seeker and calls
+find_location on every jump can do better: `watch.start()` turns the cache
+on and watches every project seeker loads (its source directories, its
+elm-package.json and elm-stuff/packages for `elm-package install`), so
+cached files get trusted without a stat and only what changed gets read,
+parsed and mapped again.
+
+on linux the kernel tells us what changed through inotify. anywhere else,
+or if inotify can't be used, directories get polled instead, at most once
+every `interval` seconds. a save can take that long to turn up there, so
+with polling files that can change still get a stat before they're used,
+and only installed packages are trusted without one.
+"""
+import os
+import sys
+import stat
+import time
+import errno
+import struct
+import logging
+
+from seeker import cache
+from seeker.modules import is_immutable, is_skipped
+
+log = logging.getLogger(__name__)
+
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM |
+               IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF |
+               IN_MOVE_SELF)
+_event = struct.Struct("iIII")
+
+
+def _decode(name):
+    if isinstance(name, bytes) and sys.version_info[0] > 2:
+        return os.fsdecode(name)
+    return name
+
+
+class Watcher(object):
+    """
+    what both kinds of watcher have in common: the directories being
+    watched, each with how many levels further down to keep watching
+    """
+
+    # does a save show up in changes() straight away, or only later
+    immediate = True
+
+    def __init__(self):
+        # directory -> how deep below it to watch, None for all the way
+        self._dirs = {}
+
+    def watch_tree(self, directory, depth=None):
+        """
+        watch `directory` and, `depth` levels down (all of them if None),
+        the directories in it, leaving out elm-stuff and hidden ones. gives
+        back the files already in new directories, since whatever happened
+        to them wasn't seen.
+        """
+        found = []
+        for root, dirs, files in os.walk(directory):
+            level = root[len(directory):].count(os.sep)
+            remaining = None if depth is None else depth - level
+            if root not in self._dirs:
+                self._add(root, remaining)
+                self._dirs[root] = remaining
+            elif _deeper(remaining, self._dirs[root]):
+                self._dirs[root] = remaining
+            found.extend(os.path.join(root, f) for f in files)
+            if remaining is not None and remaining <= 0:
+                del dirs[:]
+            else:
+                dirs[:] = [d for d in dirs if not is_skipped(d)]
+        return found
+
+    def covers(self, path):
+        """
+        would a change to the file at `path` be seen
+        """
+        return os.path.dirname(path) in self._dirs or is_immutable(path)
+
+    def trusts(self, path):
+        """
+        can what's cached for the file at `path` be used without a stat,
+        because any change to it shows up by the next sync. a save
+        that only turns up later doesn't count, a jump right after saving
+        has to see it.
+        """
+        if self.immediate:
+            return self.covers(path)
+        return is_immutable(path)
+
+    def _add(self, directory, depth):
+        pass
+
+    def _dropped(self, directory):
+        under = directory + os.sep
+        for d in list(self._dirs):
+            if d == directory or d.startswith(under):
+                del self._dirs[d]
+
+    def _created_dir(self, path):
+        if is_skipped(os.path.basename(path)):
+            return []
+        parent_depth = self._dirs.get(os.path.dirname(path))
+        if parent_depth is None and os.path.dirname(path) in self._dirs:
+            return self.watch_tree(path)
+        if parent_depth:
+            return self.watch_tree(path, parent_depth - 1)
+        return []
+
+    def close(self):
+        self._dirs.clear()
+
+
+def _deeper(depth, than):
+    return than is not None and (depth is None or depth > than)
+
+
+class InotifyWatcher(Watcher):
+
+    def __init__(self):
+        super(InotifyWatcher, self).__init__()
+        import ctypes
+        import ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6",
+                                 use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, os.strerror(e))
+        # watch descriptor -> directory
+        self._wds = {}
+
+    def _add(self, directory, depth):
+        wd = self._libc.inotify_add_watch(
+            self._fd, directory.encode(sys.getfilesystemencoding()),
+            _WATCH_MASK)
+        if wd < 0:
+            log.debug("could not watch %s", directory)
+            return
+        self._wds[wd] = directory
+
+    def changes(self):
+        """
+        every file and directory that changed since the last call
+        """
+        changed = set()
+        for wd, mask, name in self._events():
+            if mask & IN_Q_OVERFLOW:
+                # events got lost, so anything could have changed
+                log.debug("inotify queue overflowed")
+                changed.update(self._wds.values())
+                continue
+            directory = self._wds.get(wd)
+            if directory is None:
+                continue
+            if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                if mask & IN_IGNORED:
+                    del self._wds[wd]
+                self._dropped(directory)
+                changed.add(directory)
+                continue
+            path = os.path.join(directory, name) if name else directory
+            changed.add(path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                changed.update(self._created_dir(path))
+        return changed
+
+    def _events(self):
+        while True:
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return
+                raise
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _, length = _event.unpack_from(buf, offset)
+                offset += _event.size
+                name = buf[offset:offset + length].rstrip(b"\0")
+                offset += length
+                yield wd, mask, _decode(name)
+
+    def close(self):
+        super(InotifyWatcher, self).close()
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher(Watcher):
+    """
+    for when there's no inotify: lists every watched directory and stats
+    what's in it, at most once every `interval` seconds
+    """
+
+    immediate = False
+
+    def __init__(self, interval=1.0):
+        super(PollingWatcher, self).__init__()
+        self.interval = interval
+        self._last_poll = time.time()
+        # directory -> {name: (mtime, size)}
+        self._listings = {}
+
+    def _add(self, directory, depth):
+        self._listings[directory] = _listing(directory)
+
+    def changes(self):
+        now = time.time()
+        if now - self._last_poll < self.interval:
+            return set()
+        self._last_poll = now
+        changed = set()
+        for directory in list(self._dirs):
+            if directory not in self._dirs:
+                # went with a parent earlier in the loop
+                continue
+            before = self._listings.get(directory, {})
+            if not os.path.isdir(directory):
+                self._dropped(directory)
+                changed.add(directory)
+                continue
+            after = self._listings[directory] = _listing(directory)
+            for name in set(before) | set(after):
+                if (name in before and name in after and
+                        before[name] == after[name]):
+                    continue
+                path = os.path.join(directory, name)
+                changed.add(path)
+                if name not in before and os.path.isdir(path):
+                    changed.update(self._created_dir(path))
+        return changed
+
+    def _dropped(self, directory):
+        super(PollingWatcher, self)._dropped(directory)
+        for d in list(self._listings):
+            if d not in self._dirs:
+                del self._listings[d]
+
+
+def _listing(directory):
+    listing = {}
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return listing
+    for name in names:
+        try:
+            st = os.stat(os.path.join(directory, name))
+        except OSError:
+            continue
+        if stat.S_ISDIR(st.st_mode):
+            # what happens in a directory shows up in its own listing
+            listing[name] = None
+        else:
+            listing[name] = (st.st_mtime, st.st_size)
+    return listing
+
+
+_active = None
+
+
+def start(polling=False, interval=1.0):
+    """
+    turn on the file cache and keep it right by watching every project that
+    gets loaded from now on. uses inotify unless it's not there or
+    `polling` is True. returns the watcher.
+    """
+    global _active
+    if _active is not None:
+        return _active
+    watcher = None
+    if not polling:
+        try:
+            watcher = InotifyWatcher()
+        except (OSError, AttributeError) as e:
+            log.debug("no inotify, polling instead: %s", e)
+    if watcher is None:
+        watcher = PollingWatcher(interval)
+    _active = watcher
+    cache.enable().watcher = watcher
+    from seeker import project
+    project.forget()
+    return watcher
+
+
+def stop():
+    global _active
+    if _active is None:
+        return
+    _active.close()
+    _active = None
+    if cache.active() is not None:
+        cache.active().watcher = None
+
+
+def active():
+    return _active
+
+
+def watch_project(p):
+    """
+    watch what Project `p` is made of: its own source directories, its
+    elm-package.json and exact dependencies, and elm-stuff/packages down to
+    the version directories, which never change once they're there
+    """
+    if _active is None:
+        return
+    _active.watch_tree(p.root, 0)
+    elm_stuff = os.path.join(p.root, "elm-stuff")
+    if os.path.isdir(elm_stuff):
+        _active.watch_tree(elm_stuff, 0)
+    packages = os.path.join(elm_stuff, "packages")
+    if os.path.isdir(packages):
+        _active.watch_tree(packages, 2)
+    for source_dir in p.source_dirs:
+        if not is_immutable(source_dir) and os.path.isdir(source_dir):
+            _active.watch_tree(source_dir)
+
+
+def sync():
+    """
+    drop whatever changed since the last call from the caches, gives back
+    the paths that changed, or None if nothing is being watched
+    """
+    if _active is None:
+        return None
+    changed = _active.changes()
+    if changed:
+        log.debug("changed: %s", sorted(changed))
+        for path in changed:
+            cache.forget(path)
+        from seeker import project
+        project.changed(changed)
+    return changed
@@ -35,6 +35,7 @@ dist = setup(
     entry_points={
         'console_scripts': [
             'seeker = seeker:main',
+            'seeker-client = seeker.server:client_main',
         ],
     },
 )
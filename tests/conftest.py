@@ -0,0 +1,174 @@
+import json
+
+import pytest
+
+from seeker import answers
+from seeker import buffers
+from seeker import cache
+from seeker import project
+from seeker import watch
+
+
+main_elm = """module Main exposing (..)
+
+import Html exposing (..)
+import String
+import Util exposing (shout)
+import Util as U
+
+
+view : String -> Html
+view name =
+    div [] [ text (shout name), text (U.whisper name) ]
+
+
+helper : String -> String
+helper s = String.join " " [ s, s ]
+"""
+
+util_elm = """module Util exposing (shout, whisper)
+
+import String
+
+
+shout : String -> String
+shout s =
+    String.toUpper s
+
+
+whisper : String -> String
+whisper s =
+    String.toLower s
+"""
+
+string_elm = """module String exposing (..)
+
+
+join : String -> List String -> String
+join sep chunks =
+    Native.String.join sep chunks
+
+
+toUpper : String -> String
+toUpper =
+    Native.String.toUpper
+
+
+toLower : String -> String
+toLower =
+    Native.String.toLower
+"""
+
+html_elm = """module Html exposing (..)
+
+
+type alias Html = Node
+
+
+div : List Attribute -> List Html -> Html
+div =
+    node "div"
+
+
+text : String -> Html
+text =
+    VirtualDom.text
+"""
+
+
+@pytest.fixture(autouse=True)
+def own_cache_home(tmpdir_factory, monkeypatch):
+    """
+    keep the indexes shared between projects out of the real ~/.cache
+    """
+    cache_home = tmpdir_factory.mktemp("cache-home")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    return cache_home
+
+
+@pytest.fixture(autouse=True)
+def no_cache_between_tests():
+    yield
+    watch.stop()
+    cache.disable()
+    answers.disable()
+    project.forget()
+    buffers.forget()
+
+
+def write_package(root, source_dirs, files, dependencies=None):
+    root.join("elm-package.json").write(json.dumps({
+        "version": "1.0.0",
+        "source-directories": source_dirs,
+        "dependencies": dependencies or {},
+    }), ensure=True)
+    for name, content in files.items():
+        root.join(name).write(content, ensure=True)
+
+
+@pytest.fixture
+def elm_project(tmpdir):
+    """
+    a small project on disk with two packages in elm-stuff
+    """
+    write_package(
+        tmpdir,
+        ["src"],
+        {"src/Main.elm": main_elm, "src/Util.elm": util_elm},
+        dependencies={
+            "elm-lang/core": "4.0.0 <= v < 5.0.0",
+            "elm-lang/html": "1.0.0 <= v < 2.0.0",
+        }
+    )
+    packages = tmpdir.join("elm-stuff", "packages")
+    write_package(
+        packages.join("elm-lang", "core", "4.0.5"),
+        ["src"],
+        {"src/String.elm": string_elm}
+    )
+    write_package(
+        packages.join("elm-lang", "html", "1.1.0"),
+        ["src"],
+        {"src/Html.elm": html_elm},
+        dependencies={"elm-lang/core": "4.0.0 <= v < 5.0.0"}
+    )
+    return tmpdir
+
+
+@pytest.fixture
+def elm19_project(tmpdir, monkeypatch):
+    """
+    the same project for elm 0.19: an elm.json, and its packages in the
+    machine wide cache under $ELM_HOME
+    """
+    elm_home = tmpdir.join("elm-home")
+    monkeypatch.setenv("ELM_HOME", str(elm_home))
+    root = tmpdir.join("app")
+    root.join("elm.json").write(json.dumps({
+        "type": "application",
+        "source-directories": ["src"],
+        "elm-version": "0.19.1",
+        "dependencies": {
+            "direct": {"elm/core": "1.0.5", "elm/html": "1.0.0"},
+            "indirect": {"elm/virtual-dom": "1.0.2"},
+        },
+        "test-dependencies": {"direct": {}, "indirect": {}},
+    }), ensure=True)
+    root.join("src", "Main.elm").write(main_elm, ensure=True)
+    root.join("src", "Util.elm").write(util_elm, ensure=True)
+    packages = elm_home.join("0.19.1", "packages")
+    for name, version, files in [
+            ("elm/core", "1.0.5", {"src/String.elm": string_elm}),
+            ("elm/html", "1.0.0", {"src/Html.elm": html_elm})]:
+        package = packages.join(*name.split("/")).join(version)
+        package.join("elm.json").write(json.dumps({
+            "type": "package",
+            "name": name,
+            "version": version,
+            "exposed-modules": [],
+            "elm-version": "0.19.0 <= v < 0.20.0",
+            "dependencies": {},
+        }), ensure=True)
+        for path, content in files.items():
+            package.join(path).write(content, ensure=True)
+    return root
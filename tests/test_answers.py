@@ -0,0 +1,126 @@
+import os
+import time
+
+import seeker
+from seeker import answers
+from seeker import cache
+from seeker import parser
+from seeker import server
+
+
+def html_path(elm_project):
+    return str(elm_project.join("elm-stuff", "packages", "elm-lang", "html",
+                                "1.1.0", "src", "Html.elm"))
+
+
+def touch(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+    later = time.time() + 10
+    os.utime(path, (later, later))
+
+
+def test_the_same_search_is_answered_once(elm_project, monkeypatch):
+    main = str(elm_project.join("src", "Main.elm"))
+    memo = answers.enable()
+    searched = []
+    real = seeker._search_unseen
+    monkeypatch.setattr(seeker, "_search_unseen", lambda *args: (
+        searched.append(args[1]) or real(*args)))
+    for _ in range(3):
+        assert seeker.find_location(str(elm_project), main, 10, 4, "div") \
+            == [html_path(elm_project), 7, 0]
+    assert searched == ["div"]
+    assert memo.hits == 2
+    assert memo.as_dict()["hit_rate"] > 0
+
+
+def test_answers_go_when_a_file_they_looked_at_changes(elm_project):
+    main = str(elm_project.join("src", "Main.elm"))
+    util = str(elm_project.join("src", "Util.elm"))
+    memo = answers.enable()
+    assert seeker.find_location(str(elm_project), main, 10, 19, "shout") \
+        == [util, 6, 0]
+    touch(util, open(util).read().replace(
+        "\n\nshout : String", "\n\n\n\nshout : String"))
+    assert seeker.find_location(str(elm_project), main, 10, 19, "shout") \
+        == [util, 8, 0]
+    assert memo.invalidated == 1
+
+
+def test_a_save_during_the_search_is_not_missed(elm_project, monkeypatch):
+    main = str(elm_project.join("src", "Main.elm"))
+    util = str(elm_project.join("src", "Util.elm"))
+    cache.enable()
+    answers.enable()
+    real = seeker._search_unseen
+
+    def saved_meanwhile(*args):
+        found = real(*args)
+        touch(util, open(util).read().replace(
+            "\n\nshout : String", "\n\n\n\nshout : String"))
+        return found
+    monkeypatch.setattr(seeker, "_search_unseen", saved_meanwhile)
+    assert seeker.find_location(str(elm_project), main, 10, 19, "shout") \
+        == [util, 6, 0]
+    monkeypatch.setattr(seeker, "_search_unseen", real)
+    assert seeker.find_location(str(elm_project), main, 10, 19, "shout") \
+        == [util, 8, 0]
+
+
+def test_files_after_the_answer_do_not_matter(elm_project):
+    main = elm_project.join("src", "Main.elm")
+    main.write(main.read().replace(
+        "import String\n", "import String\nimport Other exposing (..)\n"))
+    other = str(elm_project.join("src", "Other.elm"))
+    touch(other, "module Other exposing (..)\n\nx = 1\n")
+    memo = answers.enable()
+    seeker.find_location(str(elm_project), str(main), 11, 4, "div")
+    touch(other, "module Other exposing (..)\n\ny = 1\n")
+    seeker.find_location(str(elm_project), str(main), 11, 4, "div")
+    assert memo.hits == 1
+
+
+def test_least_recently_used_go_first(tmpdir):
+    paths = []
+    for name in "abc":
+        tmpdir.join(name).write(name)
+        paths.append(str(tmpdir.join(name)))
+    memo = answers.AnswerCache(size=2)
+    memo.put("a", 1, paths[:1])
+    memo.put("b", 2, paths[1:2])
+    assert memo.get("a") == 1
+    memo.put("c", 3, paths[2:])
+    assert memo.get("b") is None
+    assert memo.get("a") == 1
+    assert memo.get("c") == 3
+    assert len(memo) == 2
+
+
+def test_unsaved_buffers_are_not_remembered(elm_project):
+    main = elm_project.join("src", "Main.elm")
+    memo = answers.enable()
+    edited = main.read().replace("view : String", "\n\nview : String")
+    seeker.find_location(str(elm_project), str(main), 12, 19, "shout",
+                         source=edited)
+    assert len(memo) == 1
+    cache.enable()
+    # a search through the buffer itself isn't kept
+    seeker._search_files([str(main)], "view")
+    cache.overlay(str(main), edited)
+    try:
+        assert seeker._search_files([str(main)], "view")[1] == 11
+    finally:
+        cache.remove_overlay(str(main))
+    assert parser.parse_file(str(main)).top_level("view")[0].row == 9
+
+
+def test_server_reports_the_hit_rate(elm_project):
+    s = server.Server(use_index=False)
+    params = [str(elm_project), str(elm_project.join("src", "Main.elm")), 10,
+              4, "div"]
+    for i in range(4):
+        s.handle({"jsonrpc": "2.0", "id": i, "method": "find_location",
+                  "params": params})
+    response = s.handle({"jsonrpc": "2.0", "id": 9, "method": "stats"})
+    assert response["result"]["answers"]["hit_rate"] == 0.75
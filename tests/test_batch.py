@@ -0,0 +1,81 @@
+import io
+import json
+
+import pytest
+
+import seeker
+from seeker import batch
+from seeker import parser
+
+
+def test_results_come_back_in_order(elm_project):
+    main = str(elm_project.join("src", "Main.elm"))
+    util = str(elm_project.join("src", "Util.elm"))
+    queries = [
+        [str(elm_project), main, 10, 19, "shout"],
+        {"id": "b", "cwd": str(elm_project), "file": "src/Main.elm",
+         "row": 10, "col": 40, "identifier": "whisper"},
+        [str(elm_project), main, 10, 25, "name"],
+        {"file": main},
+    ]
+    results = list(batch.resolve(queries, use_index=False))
+    assert results[0] == {"result": [util, 6, 0]}
+    assert results[1] == {"id": "b", "result": [util, 11, 0]}
+    assert results[2]["error"]["type"] == "CannotFindIdentifier"
+    assert results[3]["error"]["type"] == "ValueError"
+
+
+def test_every_query_gets_a_result(elm_project):
+    util = str(elm_project.join("src", "Util.elm"))
+    queries = [
+        [str(elm_project), "src/Main.elm", 4, 99, "shout"],
+        [str(elm_project), "src/Main.elm", "10", 19, "shout"],
+        [str(elm_project), "src/Main.elm", 10, 19, "shout"],
+    ]
+    results = list(batch.resolve(queries, use_index=False))
+    assert [list(r) for r in results] == [["error"], ["error"], ["result"]]
+    assert results[2]["result"] == [util, 6, 0]
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_relative_cwd(elm_project, monkeypatch, use_index):
+    monkeypatch.chdir(elm_project.dirpath())
+    query = {"cwd": elm_project.basename, "file": "src/Main.elm", "row": 10,
+             "col": 19, "identifier": "shout"}
+    results = list(batch.resolve([query], use_index=use_index))
+    assert results == [{"result": [str(elm_project.join("src", "Util.elm")),
+                                   6, 0]}]
+
+
+def test_files_are_parsed_once_per_batch(elm_project, monkeypatch):
+    main = str(elm_project.join("src", "Main.elm"))
+    parsed = []
+    real = parser.parse
+    monkeypatch.setattr(parser, "parse",
+                        lambda source: parsed.append(source) or real(source))
+    query = [str(elm_project), main, 10, 19, "shout"]
+    list(batch.resolve([query] * 20, use_index=False))
+    assert len(parsed) == len(set(parsed))
+
+
+def test_cli_batch(elm_project, monkeypatch, capsys):
+    main = str(elm_project.join("src", "Main.elm"))
+    lines = [
+        json.dumps([str(elm_project), main, 10, 19, "shout"]),
+        "",
+        "this is not json",
+        json.dumps({"file": "src/Main.elm", "row": 14, "col": 18,
+                    "identifier": "join"}),
+    ]
+    monkeypatch.setattr("sys.stdin", io.StringIO(u"\n".join(lines) + u"\n"))
+    seeker.main(["--batch", str(elm_project)])
+    results = [json.loads(l) for l in capsys.readouterr().out.splitlines()]
+    assert len(results) == 3
+    assert results[0]["result"][1:] == [6, 0]
+    assert "error" in results[1]
+    assert results[2]["result"][0].endswith("String.elm")
+
+
+def test_cli_still_needs_arguments_without_batch(capsys):
+    with pytest.raises(SystemExit):
+        seeker.main(["."])
@@ -0,0 +1,173 @@
+import io
+import random
+
+import pytest
+
+import seeker
+from seeker import batch
+from seeker import buffers
+from seeker import cache
+from seeker import lexer
+from seeker import parser
+
+source = """module A exposing (..)
+
+import String
+
+
+{-| docs
+-}
+f : Int -> Int
+f x =
+    let
+        y = x + 1
+    in
+        y
+
+
+g = "a string -- not a comment"
+
+
+h =
+    {- a comment
+    h2 = 1 -}
+    2
+"""
+
+
+def lexed(text):
+    return list(parser.lexed_chunks(text))
+
+
+@pytest.mark.parametrize("old,new", [
+    ("f x =", "f x y ="),
+    ("        y = x + 1\n", ""),
+    ("g = ", "\n\ngg = 1\n\ng = "),
+    ("h =\n", "h =\n    1 {-\n"),
+    ("{-| docs", "{-| docs\nx = 1"),
+    ("2\n", "2\n\n\nlast = 3\n"),
+    ("module A", "-- top\nmodule A"),
+])
+def test_edits_lex_like_the_whole_thing(old, new):
+    buf = buffers.Buffer(source)
+    edited = source.replace(old, new, 1)
+    buf.update(edited)
+    assert buf.chunks == lexed(edited)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_edits_lex_like_the_whole_thing(seed):
+    rng = random.Random(seed)
+    pieces = ["\n", "x", " ", "{-", "-}", "\"", "--", "-", "\n-",
+              "\n    ", "a = 1\n"]
+    text = source
+    buf = buffers.Buffer(text)
+    for _ in range(300):
+        start = rng.randint(0, len(text))
+        end = min(len(text), start + rng.randint(0, 6))
+        text = text[:start] + rng.choice(pieces) + text[end:]
+        buf.update(text)
+        assert buf.chunks == lexed(text)
+
+
+def test_a_chunk_that_turns_into_a_comment():
+    text = "type Msg\n    = A\n-\n    | C\n\nf = 1\n"
+    buf = buffers.Buffer(text)
+    buf.parsed()
+    edited = text.replace("\n-\n", "\n--\n")
+    buf.update(edited)
+    assert buf.chunks == lexed(edited)
+    assert [d.name for d in buf.parsed().declarations] == \
+        ["Msg", "A", "C", "f"]
+
+
+def test_only_the_edited_chunk_is_lexed_again(monkeypatch):
+    big = source + "".join(
+        "\n\nv{0} : Int\nv{0} =\n    {0}\n".format(i) for i in range(100))
+    buf = buffers.Buffer(big)
+    spans = []
+    real = lexer.blank_span
+    monkeypatch.setattr(lexer, "blank_span", lambda *args: (
+        spans.append(args[2]) or real(*args)))
+    buf.update(big.replace("v50 =\n    50", "v50 =\n    50 + 1"))
+    # the one before it and the one after it are lexed again too
+    assert len(spans) <= 3
+
+
+def test_common_prefix_and_suffix():
+    assert buffers._common_prefix("abcdef", "abcxef") == 3
+    assert buffers._common_suffix("abcdef", "abcxef", 3) == 2
+    assert buffers._common_prefix("ab", "abc") == 2
+    assert buffers._common_suffix("aaa", "aaaa", 3) == 0
+
+
+def test_find_location_in_an_unsaved_buffer(elm_project):
+    main = elm_project.join("src", "Main.elm")
+    edited = main.read() + "\n\nshoutTwice s =\n    shout (shout s)\n"
+    assert seeker.find_location(
+        str(elm_project), str(main), 18, 4, "shout", source=edited) == \
+        [str(elm_project.join("src", "Util.elm")), 6, 0]
+    edited = edited.replace("view : String", "\n\nview : String")
+    assert seeker.find_location(
+        str(elm_project), str(main), 16, 0, "helper", source=edited) == \
+        [str(main), 16, 0]
+    # the file on disk is what gets read again after
+    assert not cache.overlaid(str(main))
+    assert cache.read(str(main)) == main.read()
+
+
+def test_find_a_constructor_after_a_line_turns_into_a_comment(elm_project):
+    main = elm_project.join("src", "Main.elm")
+    text = main.read() + "\n\ntype Msg\n    = A\n-\n    | C\n\nf = C\n"
+    seeker.find_location(str(elm_project), str(main), 14, 0, "helper",
+                         source=text)
+    edited = text.replace("\n-\n", "\n--\n")
+    assert seeker.find_location(
+        str(elm_project), str(main), 22, 4, "C", source=edited) == \
+        [str(main), 20, 6]
+
+
+def test_the_index_does_not_answer_for_the_buffer(elm_project):
+    from seeker import index as symbol_index
+    main = elm_project.join("src", "Main.elm")
+    idx = symbol_index.SymbolIndex.for_file(str(main))
+    edited = main.read().replace("view : String", "\n\nview : String")
+    assert seeker.find_location(
+        str(elm_project), str(main), 11, 0, "view", index=idx,
+        source=edited) == [str(main), 11, 0]
+
+
+def test_stdin(elm_project, monkeypatch, capsys):
+    main = elm_project.join("src", "Main.elm")
+    edited = main.read().replace("view : String", "\n\nview : String")
+    monkeypatch.setattr("sys.stdin", io.StringIO(edited))
+    seeker.main([str(elm_project), "src/Main.elm", "11", "0", "view",
+                 "--stdin", "--no-index"])
+    assert capsys.readouterr()[0].split()[2:] == ["11", "0"]
+
+
+def test_batch_source(elm_project):
+    main = elm_project.join("src", "Main.elm")
+    edited = main.read().replace("view : String", "\n\nview : String")
+    results = list(batch.resolve([{
+        "cwd": str(elm_project), "file": "src/Main.elm", "row": 11,
+        "col": 0, "identifier": "view", "source": edited,
+    }], use_index=False))
+    assert results[0]["result"][1:] == [11, 0]
+
+
+@pytest.mark.parametrize("old,new", [
+    ("f x =", "f x y ="),
+    ("        y = x + 1\n", ""),
+    ("f : Int -> Int\n", "f : Int -> Int\n\n\nk = 1\n"),
+    ("f : Int -> Int\n", "f : String -> Int\n"),
+    ("import String\n", "\nimport String as S\n"),
+])
+def test_edits_parse_like_the_whole_thing(old, new):
+    buf = buffers.Buffer(source)
+    buf.parsed()
+    edited = source.replace(old, new, 1)
+    buf.update(edited)
+    parsed, whole = buf.parsed(), parser.parse(edited)
+    assert parsed.declarations == whole.declarations
+    assert parsed.imports == whole.imports
@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+import seeker
+from seeker import cache
+
+
+def elm_files(tmpdir, n):
+    paths = []
+    for i in range(n):
+        f = tmpdir.join("M{}.elm".format(i))
+        f.write("module M{} exposing (..)\n".format(i))
+        paths.append(str(f))
+    return paths
+
+
+def test_read_ahead_keeps_the_order(tmpdir):
+    paths = elm_files(tmpdir, 20)
+    file_cache = cache.enable()
+    assert list(cache.read_ahead(paths)) == paths
+    assert all(p in file_cache for p in paths)
+
+
+@pytest.mark.skipif(cache.futures is None or
+                    not hasattr(threading, "Barrier"),
+                    reason="needs concurrent.futures and threading.Barrier")
+def test_read_ahead_reads_at_the_same_time(tmpdir, monkeypatch):
+    paths = elm_files(tmpdir, 4)
+    cache.enable()
+    # every read waits for another one to start, so reading one at a time
+    # would break the barrier
+    barrier = threading.Barrier(2, timeout=5)
+    real = cache._read_file
+
+    def slow_read(path):
+        barrier.wait()
+        return real(path)
+    monkeypatch.setattr(cache, "_read_file", slow_read)
+    assert list(cache.read_ahead(paths)) == paths
+
+
+def test_read_ahead_without_the_cache(tmpdir):
+    paths = elm_files(tmpdir, 3)
+    assert list(cache.read_ahead(paths)) == paths
+
+
+def test_missing_files_go_through(tmpdir):
+    paths = elm_files(tmpdir, 2)
+    missing = str(tmpdir.join("Gone.elm"))
+    cache.enable()
+    assert list(cache.read_ahead([missing] + paths)) == [missing] + paths
+
+
+def test_wildcard_lookup_reads_ahead(elm_project):
+    main = elm_project.join("src", "Main.elm")
+    main.write(main.read().replace(
+        "import String\n", "import String\nimport Util exposing (..)\n"))
+    cache.enable()
+    # Html and Util are both wildcards and only Html has div
+    assert seeker.find_location(str(elm_project), str(main), 11, 4,
+                                "div") == [
+        str(elm_project.join("elm-stuff", "packages", "elm-lang", "html",
+                             "1.1.0", "src", "Html.elm")), 7, 0]
@@ -0,0 +1,76 @@
+import os
+import time
+
+import seeker
+from seeker import cache
+from seeker.imports import ImportTable
+
+
+source = """module Main exposing (..)
+
+import Html exposing (..)
+import Html.Attributes exposing (..)
+import Json.Decode as Json exposing (Decoder, field)
+import Maybe exposing (Maybe(..))
+import Result exposing (Result(Ok))
+import String
+import Util exposing (shout) as U
+
+
+main = 1
+"""
+
+
+def test_aliases():
+    table = ImportTable.from_source(source)
+    assert table.module_for("Json") == "Json.Decode"
+    assert table.module_for("Json.Decode") == "Json.Decode"
+    assert table.module_for("String") == "String"
+    assert table.module_for("U") == "Util"
+    assert table.module_for("Nope") is None
+
+
+def test_exposed_names():
+    table = ImportTable.from_source(source)
+    assert table.exposing("field") == ["Json.Decode"]
+    assert table.exposing("Ok") == ["Result"]
+    assert table.exposing("shout") == ["Util"]
+    assert table.exposing("div") == []
+
+
+def test_candidates_order():
+    table = ImportTable.from_source(source)
+    assert table.candidates("shout") == ["Util"]
+    assert table.candidates("div") == ["Html", "Html.Attributes"]
+    # Just could be one of the Maybe(..) constructors
+    assert table.candidates("Just") == ["Maybe", "Html", "Html.Attributes"]
+
+
+def test_qualified_use_of_a_module_that_was_not_imported():
+    src = "import Html\n\nx = List.map f []\n"
+    assert seeker._qualified_namespace(src, 2, 9, "map") == ["List"]
+
+
+def test_qualified_use_of_a_wildcard_import():
+    src = "import String exposing (..)\n\nx = String.join\n"
+    assert seeker._qualified_namespace(src, 2, 11, "join") == ["String"]
+
+
+def test_table_is_kept_until_the_file_changes(tmpdir):
+    cache.enable()
+    f = tmpdir.join("Main.elm")
+    f.write(source)
+    table = ImportTable.for_file(str(f))
+    assert ImportTable.for_file(str(f)) is table
+    f.write(source + "import Extra\n")
+    later = time.time() + 10
+    os.utime(str(f), (later, later))
+    changed = ImportTable.for_file(str(f))
+    assert changed is not table
+    assert changed.module_for("Extra") == "Extra"
+
+
+def test_line():
+    assert seeker._line("a\nbb\nccc", 0) == "a"
+    assert seeker._line("a\nbb\nccc", 2) == "ccc"
+    assert seeker._line("a\nbb\n", 2) == ""
@@ -0,0 +1,295 @@
+import os
+import time
+
+import pytest
+
+import seeker
+from seeker import index
+from seeker import parser
+from seeker import project
+
+
+donkeys = """module Donkeys exposing (..)
+
+{-| not a definition:
+    fake = 1
+-}
+
+type Donkey
+    = Mule
+    | Horse Int
+    | Goat
+
+
+type alias Stable = { donkeys : List Donkey }
+
+
+type Shape = Circle Float | Square Float
+
+
+count : Stable -> Int
+count stable = List.length stable.donkeys
+
+
+port outbox : String -> Cmd msg
+"""
+
+
+def test_declarations():
+    found = index.declarations(donkeys)
+    assert found == [
+        ("Donkey", "type", 6, 0),
+        ("Mule", "constructor", 7, 6),
+        ("Horse", "constructor", 8, 6),
+        ("Goat", "constructor", 9, 6),
+        ("Stable", "alias", 12, 0),
+        ("Shape", "type", 15, 0),
+        ("Circle", "constructor", 15, 13),
+        ("Square", "constructor", 15, 28),
+        ("count", "value", 19, 0),
+        ("outbox", "port", 22, 0),
+    ]
+
+
+@pytest.mark.parametrize(
+    "path,source_dir,module", [
+        ("/p/src/Main.elm", "/p/src", "Main"),
+        ("/p/src/Html/Events.elm", "/p/src", "Html.Events"),
+        ("/p/src/Html/Events.elm", "/p/src/", "Html.Events"),
+    ])
+def test_module_name_for(path, source_dir, module):
+    assert index.module_name_for(path, source_dir) == module
+
+
+def test_index_covers_dependencies(elm_project):
+    idx = index.SymbolIndex.for_file(str(elm_project.join("src", "Main.elm")))
+    assert sorted(idx.modules) == ["Html", "Main", "String", "Util"]
+    [join] = idx.lookup("String", "join")
+    assert (join.kind, join.row, join.col) == ("value", 4, 0)
+    assert idx.lookup("String", "nope") == []
+    assert [d.module for d in idx.definitions("div")] == ["Html"]
+
+
+def test_find_location_with_index(elm_project):
+    main = str(elm_project.join("src", "Main.elm"))
+    idx = index.SymbolIndex.for_file(main)
+    util = str(elm_project.join("src", "Util.elm"))
+    # explicitly exposed
+    assert seeker.find_location(
+        ".", main, 10, 19, "shout", index=idx) == [util, 6, 0]
+    # qualified through an alias
+    assert seeker.find_location(
+        ".", main, 10, 40, "whisper", index=idx) == [util, 11, 0]
+    # wildcard import
+    assert seeker.find_location(
+        ".", main, 10, 4, "div", index=idx)[1:] == [7, 0]
+    # defined right there
+    assert seeker.find_location(
+        ".", main, 9, 0, "view", index=idx) == [main, 9, 0]
+
+
+def test_types_with_a_constructor_of_the_same_name(elm_project):
+    elm_project.join("src", "Id.elm").write(
+        "module Id exposing (Id(..))\n\n\ntype Id = Id String\n")
+    main = elm_project.join("src", "Main.elm")
+    main.write(
+        "module Main exposing (..)\n\n"
+        "import Id exposing (Id(..))\n"
+        "import Id as I\n\n\n"
+        "a : I.Id\na = Id \"a\"\n")
+    idx = index.SymbolIndex.for_file(str(main))
+    id_elm = str(elm_project.join("src", "Id.elm"))
+    for row, col in [(6, 6), (7, 4)]:
+        for i in (None, idx):
+            assert seeker.find_location(
+                ".", str(main), row, col, "Id", index=i) == [id_elm, 3, 0]
+
+
+def test_index_agrees_with_scanning(elm_project):
+    main = str(elm_project.join("src", "Main.elm"))
+    idx = index.SymbolIndex.for_file(main)
+    for row, col, name in [(10, 19, "shout"), (10, 40, "whisper"),
+                           (14, 18, "join"), (10, 11, "text")]:
+        assert seeker.find_location(".", main, row, col, name, index=idx) \
+            == seeker.find_location(".", main, row, col, name)
+
+
+def test_wildcards_skip_modules_that_hide_the_name(elm_project):
+    main = elm_project.join("src", "Main.elm")
+    main.write(main.read().replace(
+        "import Html exposing (..)\n",
+        "import Hidden exposing (..)\nimport Html exposing (..)\n"))
+    elm_project.join("src", "Hidden.elm").write(
+        "module Hidden exposing (other)\n\n\nother = 1\n\n\ndiv = 2\n")
+    idx = index.SymbolIndex.for_file(str(main))
+    assert idx.exposes("Hidden", "other")
+    assert not idx.exposes("Hidden", "div")
+    assert idx.exposes("Html", "div")
+    html = str(elm_project.join("elm-stuff", "packages", "elm-lang", "html",
+                                "1.1.0", "src", "Html.elm"))
+    assert seeker.find_location(".", str(main), 11, 4, "div") == \
+        [html, 7, 0]
+    assert seeker.find_location(".", str(main), 11, 4, "div",
+                                index=idx) == [html, 7, 0]
+
+
+def test_exports_survive_a_dump(elm_project):
+    elm_project.join("src", "Hidden.elm").write(
+        "module Hidden exposing (other)\n\n\nother = 1\n\n\ndiv = 2\n")
+    main = str(elm_project.join("src", "Main.elm"))
+    idx = index.SymbolIndex.for_file(main)
+    restored = index.SymbolIndex.restore(idx.source_dirs, idx.dump())
+    for i in (idx, restored):
+        assert i.exports_of(str(elm_project.join("src", "Hidden.elm"))) == \
+            ["other"]
+        assert i.exports_of(str(elm_project.join("src", "Util.elm"))) == \
+            ["shout", "whisper"]
+        assert i.exposes("Util", "shout")
+        assert not i.exposes("Util", "nope")
+        assert not i.exposes("Hidden", "div")
+
+
+def test_refresh_picks_up_changes(elm_project):
+    main = str(elm_project.join("src", "Main.elm"))
+    idx = index.SymbolIndex.for_file(main)
+    util = elm_project.join("src", "Util.elm")
+    util.write(util.read().replace("shout s =", "\n\nshout s ="))
+    # make sure the mtime moves even on coarse filesystems
+    later = time.time() + 10
+    os.utime(str(util), (later, later))
+    elm_project.join("src", "Extra.elm").write(
+        "module Extra exposing (..)\n\nextra = 1\n")
+    elm_project.join("src", "Main.elm").remove()
+    idx.refresh()
+    assert idx.lookup("Util", "shout")[0].row == 8
+    assert idx.lookup("Extra", "extra")[0].row == 2
+    assert "Main" not in idx.modules
+    assert idx.definitions("view") == []
+
+
+def count_parses(monkeypatch):
+    parsed = []
+    real = parser.parse
+
+    def counting(source):
+        parsed.append(source)
+        return real(source)
+    monkeypatch.setattr(parser, "parse", counting)
+    return parsed
+
+
+def test_load_writes_cache_into_elm_stuff(elm_project):
+    elm_package = str(elm_project.join("elm-package.json"))
+    idx = index.load(project.get(elm_package))
+    cache_file = elm_project.join("elm-stuff", "seeker-index.json")
+    assert cache_file.exists()
+    assert not idx.dirty
+    restored = index.load(project.get(elm_package))
+    assert sorted(restored.modules) == sorted(idx.modules)
+    assert restored.lookup("Util", "shout") == idx.lookup("Util", "shout")
+
+
+def test_second_load_only_parses_changed_files(elm_project, monkeypatch):
+    elm_package = str(elm_project.join("elm-package.json"))
+    index.load(project.get(elm_package))
+    parsed = count_parses(monkeypatch)
+    index.load(project.get(elm_package))
+    assert parsed == []
+    util = elm_project.join("src", "Util.elm")
+    util.write(util.read() + "\n\nmore = 1\n")
+    later = time.time() + 10
+    os.utime(str(util), (later, later))
+    idx = index.load(project.get(elm_package))
+    assert len(parsed) == 1
+    assert idx.lookup("Util", "more")[0].row == 15
+
+
+def test_installed_packages_are_never_walked_again(elm_project, monkeypatch):
+    elm_package = str(elm_project.join("elm-package.json"))
+    index.load(project.get(elm_package))
+    walked = []
+    real = index.elm_files_in
+
+    def recording(source_dir):
+        walked.append(source_dir)
+        return real(source_dir)
+    monkeypatch.setattr(index, "elm_files_in", recording)
+    idx = index.load(project.get(elm_package))
+    assert walked == [str(elm_project) + "/src"]
+    assert idx.lookup("String", "join")
+
+
+@pytest.mark.parametrize(
+    "source_dir,immutable", [
+        ("/p/elm-stuff/packages/elm-lang/core/4.0.5/src", True),
+        ("/p/elm-stuff/packages/elm-lang/core/4.0.5/", True),
+        ("/p/src", False),
+        ("/p/elm-stuff/packages/elm-lang", False),
+    ])
+def test_is_immutable(source_dir, immutable):
+    assert index.is_immutable(source_dir) is immutable
+
+
+def test_cache_path_without_elm_stuff(tmpdir, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmpdir.join("cache")))
+    path = index.cache_path_for(str(tmpdir.join("app")))
+    assert path.startswith(str(tmpdir.join("cache", "seeker")))
+
+
+def test_old_cache_formats_are_ignored(elm_project):
+    elm_package = str(elm_project.join("elm-package.json"))
+    elm_project.join("elm-stuff", "seeker-index.json").write(
+        '{"format": 0, "files": [["bogus"]], "frozen": []}')
+    idx = index.load(project.get(elm_package))
+    assert idx.lookup("Util", "shout")
+
+
+def test_cli_uses_the_index(elm_project, capsys):
+    main = str(elm_project.join("src", "Main.elm"))
+    seeker.main([str(elm_project), main, "10", "19", "shout"])
+    assert elm_project.join("elm-stuff", "seeker-index.json").exists()
+    out = capsys.readouterr().out
+    assert out == "MATCH {} 6 0\n".format(elm_project.join("src", "Util.elm"))
+
+
+def second_app(elm19_project):
+    other = elm19_project.join("..", "other-app")
+    other.join("elm.json").write(elm19_project.join("elm.json").read(),
+                                 ensure=True)
+    other.join("src", "Other.elm").write(
+        "module Other exposing (..)\n\nx = 1\n", ensure=True)
+    return other
+
+
+def test_package_versions_are_indexed_once_per_machine(elm19_project,
+                                                       monkeypatch):
+    first = index.load(project.get(str(elm19_project.join("elm.json"))))
+    core = project.get(str(elm19_project.join("elm.json"))).source_dirs[1]
+    assert os.path.exists(index.package_cache_path(core))
+    scanned = []
+    real = index.scan_file
+    monkeypatch.setattr(index, "scan_file",
+                        lambda path: scanned.append(path) or real(path))
+    other = second_app(elm19_project)
+    second = index.load(project.get(str(other.join("elm.json"))), jobs=1)
+    assert scanned == [str(other.join("src", "Other.elm"))]
+    assert second.lookup("String", "join") == first.lookup("String", "join")
+    # and the project's own index still works without stats for them
+    again = index.load(project.get(str(other.join("elm.json"))), jobs=1)
+    assert again.lookup("String", "join")
+    assert scanned == [str(other.join("src", "Other.elm"))]
+
+
+def test_shared_cache_is_named_by_contents(elm_project, tmpdir):
+    core = str(elm_project.join(
+        "elm-stuff", "packages", "elm-lang", "core", "4.0.5", "src"))
+    copy = tmpdir.join("copy", "elm-stuff", "packages", "elm-lang", "core",
+                       "4.0.5")
+    elm_project.join("elm-stuff", "packages", "elm-lang", "core",
+                     "4.0.5").copy(copy)
+    assert index.package_cache_path(core) == \
+        index.package_cache_path(str(copy.join("src")))
+    assert index.package_cache_path(str(elm_project.join("src"))) is None
+    copy.join("elm-package.json").write('{"version": "4.0.6"}')
+    assert index.package_cache_path(core) != \
+        index.package_cache_path(str(copy.join("src")))
@@ -0,0 +1,62 @@
+import pytest
+
+from seeker import lexer
+
+
+@pytest.mark.parametrize(
+    "src,masked", [
+        ("a {- b -} c", "a {-----} c"),
+        ("{--} x", "{--} x"),
+        ("{- a\n {- b -}\n c -} d", "{---\n-{------\n----} d"),
+        ("x {- never closed\ny", "x {--------------\n-"),
+        # not comments
+        ('x = "{-" ++ y', 'x = "{-" ++ y'),
+        ("x = '{' -- {- nope\ny = 1", "x = '{' -- {- nope\ny = 1"),
+        ('x = """\n{-\n""" {- y -}', 'x = """\n{-\n""" {-----}'),
+        ("stray -} close", "stray -} close"),
+    ])
+def test_mask_comments(src, masked):
+    assert lexer.mask_comments(src) == masked
+
+
+def test_mask_keeps_rows_and_columns():
+    src = "a = 1\n{- x\n\n  {- y -}\n-}\nb = 2\n" * 50
+    masked = lexer.mask_comments(src)
+    assert len(masked) == len(src)
+    assert [i for i, c in enumerate(masked) if c == "\n"] == \
+        [i for i, c in enumerate(src) if c == "\n"]
+
+
+def test_scan():
+    src = 'f x = "a\\"b" -- note\n{- c -} \'x\' model\' """q"""'
+    assert [(kind, src[start:end]) for kind, start, end in lexer.scan(src)] \
+        == [
+            (lexer.STRING, '"a\\"b"'),
+            (lexer.LINE_COMMENT, "-- note"),
+            (lexer.BLOCK_COMMENT, "{- c -}"),
+            (lexer.CHAR, "'x'"),
+            (lexer.STRING, '"""q"""'),
+        ]
+
+
+def test_unterminated_string_stops_at_end_of_line():
+    src = 'x = "oops\n{- c -}'
+    assert [k for k, s, e in lexer.scan(src)] == \
+        [lexer.STRING, lexer.BLOCK_COMMENT]
+
+
+def test_line_index():
+    text = "ab\n\ncde\nf"
+    index = lexer.LineIndex(text)
+    assert len(index) == 4
+    assert index.position(0) == (0, 0)
+    assert index.position(2) == (0, 2)
+    assert index.position(3) == (1, 0)
+    assert index.position(6) == (2, 2)
+    assert index.offset(2, 1) == 5
+    assert [index.line(row) for row in range(4)] == text.split("\n")
+
+
+def test_blank_keeps_newlines_in_block_comments():
+    src = 'a = "x" -- y\n{- b\n c -} d'
+    assert lexer.blank(src) == "a =" + " " * 9 + "\n    \n      d"
@@ -0,0 +1,72 @@
+import os
+
+import seeker
+from seeker import modules
+
+
+def test_paths_follow_source_dir_order(tmpdir):
+    tmpdir.join("a", "Shared.elm").write("", ensure=True)
+    tmpdir.join("b", "Shared.elm").write("", ensure=True)
+    tmpdir.join("b", "Html", "Events.elm").write("", ensure=True)
+    m = modules.ModuleMap([str(tmpdir.join("a")), str(tmpdir.join("b"))])
+    assert m.paths("Shared") == [str(tmpdir.join("a", "Shared.elm")),
+                                 str(tmpdir.join("b", "Shared.elm"))]
+    assert m.paths("Html.Events") == [
+        str(tmpdir.join("b", "Html", "Events.elm"))]
+    assert m.paths("Nope") == []
+    assert m.modules()["Shared"] == str(tmpdir.join("a", "Shared.elm"))
+
+
+def test_elm_stuff_and_hidden_dirs_are_skipped(elm_project):
+    elm_project.join(".git", "Hook.elm").write("", ensure=True)
+    elm_project.join("src", ".#Main.elm").ensure(dir=True)
+    root = str(elm_project)
+    m = modules.ModuleMap([root])
+    assert sorted(m.modules()) == ["src.Main", "src.Util"]
+    assert list(modules.elm_files_in(root)) == [
+        str(elm_project.join("src", "Main.elm")),
+        str(elm_project.join("src", "Util.elm"))]
+
+
+def bump(directory):
+    st = os.stat(str(directory))
+    os.utime(str(directory), (st.st_atime, st.st_mtime + 10))
+
+
+def test_refresh_only_walks_changed_dirs(tmpdir):
+    src = tmpdir.join("src")
+    src.join("Main.elm").write("", ensure=True)
+    m = modules.ModuleMap([str(src)])
+    assert m.refresh() is False
+    src.join("Html", "New.elm").write("", ensure=True)
+    bump(src)
+    assert m.refresh() is True
+    assert m.paths("Html.New") == [str(src.join("Html", "New.elm"))]
+    src.join("Main.elm").remove()
+    bump(src)
+    m.refresh()
+    assert m.paths("Main") == []
+
+
+def test_installed_packages_are_not_statted(tmpdir, monkeypatch):
+    package = tmpdir.join("elm-stuff", "packages", "elm-lang", "core",
+                          "4.0.5", "src")
+    package.join("List.elm").write("", ensure=True)
+    m = modules.ModuleMap([str(package)])
+    stats = []
+    monkeypatch.setattr(modules, "_mtime", stats.append)
+    m.refresh()
+    assert stats == []
+
+
+def test_files_of_does_not_probe_every_source_dir(elm_project, monkeypatch):
+    main = str(elm_project.join("src", "Main.elm"))
+    seeker._files_of("String", main)
+    probes = []
+    exists = os.path.exists
+    monkeypatch.setattr(os.path, "exists",
+                        lambda p: probes.append(p) or exists(p))
+    assert seeker._files_of("String", main) == [str(elm_project.join(
+        "elm-stuff", "packages", "elm-lang", "core", "4.0.5", "src",
+        "String.elm"))]
+    assert not [p for p in probes if p.endswith(".elm")]
@@ -0,0 +1,155 @@
+import os
+import json
+
+import pytest
+
+import seeker
+from seeker import packages
+from seeker import project
+from seeker.modules import is_immutable, package_version_dir
+
+
+def bump(path):
+    st = os.stat(str(path))
+    os.utime(str(path), (st.st_atime, st.st_mtime + 10))
+
+
+@pytest.fixture
+def two_cores(elm_project):
+    """
+    elm_project with an older elm-lang/core installed next to 4.0.5
+    """
+    old = elm_project.join("elm-stuff", "packages", "elm-lang", "core",
+                           "4.0.0")
+    old.join("elm-package.json").write(json.dumps({
+        "version": "4.0.0",
+        "source-directories": ["old-src"],
+        "dependencies": {},
+    }), ensure=True)
+    old.join("old-src", "String.elm").write(
+        "module String exposing (..)\n", ensure=True)
+    return elm_project
+
+
+def core_dir(root, version):
+    return str(root.join("elm-stuff", "packages", "elm-lang", "core",
+                         version))
+
+
+@pytest.mark.parametrize("version, constraint, expected", [
+    ("4.0.5", "4.0.0 <= v < 5.0.0", True),
+    ("5.0.0", "4.0.0 <= v < 5.0.0", False),
+    ("5.0.0", "4.0.0 <= v <= 5.0.0", True),
+    ("4.0.0", "4.0.0 < v < 5.0.0", False),
+    ("4.10.0", "4.2.0 <= v < 5.0.0", True),
+    ("nope", "4.0.0 <= v < 5.0.0", False),
+    ("4.0.0", "whatever", False),
+])
+def test_fits(version, constraint, expected):
+    assert packages.fits(version, constraint) == expected
+
+
+def test_newest_fitting_version_without_exact_dependencies(two_cores):
+    layout = packages.layout_for(str(two_cores))
+    assert layout.package_dirs["elm-lang/core"] == core_dir(two_cores,
+                                                            "4.0.5")
+
+
+def test_exact_dependencies_pick_the_version(two_cores):
+    two_cores.join("elm-stuff", "exact-dependencies.json").write(
+        json.dumps({"elm-lang/core": "4.0.0", "elm-lang/html": "1.1.0"}))
+    layout = packages.layout_for(str(two_cores))
+    assert layout.package_dirs["elm-lang/core"] == core_dir(two_cores,
+                                                            "4.0.0")
+    assert core_dir(two_cores, "4.0.0") + "/old-src" in layout.source_dirs()
+    assert core_dir(two_cores, "4.0.5") + "/src" not in \
+        layout.source_dirs()
+
+
+def test_layout_is_kept_until_exact_dependencies_change(two_cores,
+                                                        monkeypatch):
+    root = str(two_cores)
+    layout = packages.layout_for(root)
+    listed = []
+    real = os.listdir
+    monkeypatch.setattr(os, "listdir",
+                        lambda p: listed.append(p) or real(p))
+    assert packages.layout_for(root) is layout
+    assert seeker._searchable_sources(
+        str(two_cores.join("elm-package.json"))) == layout.source_dirs()
+    assert listed == []
+    exact = two_cores.join("elm-stuff", "exact-dependencies.json")
+    exact.write(json.dumps({"elm-lang/core": "4.0.0"}))
+    bump(exact)
+    changed = packages.layout_for(root)
+    assert changed is not layout
+    assert changed.package_dirs["elm-lang/core"] == core_dir(two_cores,
+                                                             "4.0.0")
+
+
+def test_missing_packages_are_skipped(elm_project):
+    elm_project.join("elm-stuff", "packages", "elm-lang", "html").remove()
+    assert seeker.dependency_roots(str(elm_project)) == [
+        core_dir(elm_project, "4.0.5")]
+
+
+def test_file_is_relative_to_current_dir(elm_project, capsys):
+    seeker.main([str(elm_project), "src/Main.elm", "10", "19", "shout",
+                 "--no-index"])
+    assert capsys.readouterr().out.strip() == "MATCH {} 6 0".format(
+        elm_project.join("src", "Util.elm"))
+
+
+def test_elm_json_project(elm19_project, monkeypatch):
+    main = str(elm19_project.join("src", "Main.elm"))
+    elm_home = os.environ["ELM_HOME"]
+    p = project.for_file(main)
+    assert p.elm_package_path == str(elm19_project.join("elm.json"))
+    assert p.source_dirs == [
+        str(elm19_project.join("src")),
+        os.path.join(elm_home, "0.19.1", "packages", "elm", "core", "1.0.5",
+                     "src"),
+        os.path.join(elm_home, "0.19.1", "packages", "elm", "html",
+                     "1.0.0", "src"),
+    ]
+    assert all(is_immutable(d) for d in p.source_dirs[1:])
+    assert seeker.find_location(str(elm19_project), main, 14, 18,
+                                "join") == [
+        os.path.join(p.source_dirs[1], "String.elm"), 4, 0]
+
+
+def test_elm_json_package_ranges(elm19_project):
+    root = elm19_project.join("..", "pkg")
+    root.join("elm.json").write(json.dumps({
+        "type": "package",
+        "name": "me/pkg",
+        "version": "1.0.0",
+        "exposed-modules": [],
+        "elm-version": "0.19.0 <= v < 0.20.0",
+        "dependencies": {"elm/core": "1.0.0 <= v < 2.0.0"},
+        "test-dependencies": {"elm/html": "1.0.0 <= v < 2.0.0"},
+    }), ensure=True)
+    layout = packages.layout_for(str(root))
+    assert [d.split(os.sep)[-3:] for d in layout.source_dirs()] == [
+        [os.path.basename(str(elm19_project.dirpath())), "pkg", "src"],
+        ["core", "1.0.5", "src"], ["html", "1.0.0", "src"]]
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("/p/elm-stuff/packages/elm-lang/core/4.0.5/src",
+     "/p/elm-stuff/packages/elm-lang/core/4.0.5"),
+    ("/home/me/.elm/0.19.1/packages/elm/core/1.0.5/src/Basics.elm",
+     "/home/me/.elm/0.19.1/packages/elm/core/1.0.5"),
+    ("/home/me/.elm/0.19.0/package/elm/core/1.0.0",
+     "/home/me/.elm/0.19.0/package/elm/core/1.0.0"),
+    ("/opt/elm/0.19.1/packages/elm/core/1.0.5/src", None),
+    ("/p/src/packages/a/b/c", None),
+])
+def test_package_version_dir(path, expected):
+    assert package_version_dir(path) == expected
+
+
+def test_package_version_dir_under_elm_home(monkeypatch):
+    monkeypatch.setenv("ELM_HOME", "/opt/elm")
+    assert package_version_dir("/opt/elm/0.19.1/packages/elm/core/1.0.5/src") \
+        == "/opt/elm/0.19.1/packages/elm/core/1.0.5"
@@ -0,0 +1,223 @@
+import pytest
+
+import seeker
+from seeker import parser
+
+
+donkeys = """module Donkeys exposing (Donkey(..), Stable, count, Shape(Circle))
+
+import Html exposing (Html, div,
+    text)
+import Json.Decode as Json
+import Dict exposing (..)
+
+{-| not a definition:
+    fake = 1
+-}
+
+type Donkey
+    = Mule
+    | Horse Int
+    | Goat
+
+
+type alias Stable = { donkeys : List Donkey }
+
+
+type Shape = Circle Float | Square Float
+
+
+type Wrapper = Wrapper Int
+
+count : Stable
+    -> Int
+count stable =
+    let
+        total = List.length stable.donkeys
+        twice n =
+            n * 2
+    in
+        twice total
+
+inline = let x = "let y = 2" in x
+
+port outbox : String -> Cmd msg
+"""
+
+
+def test_header():
+    module = parser.parse(donkeys)
+    assert module.name == "Donkeys"
+    assert module.exposing == [
+        ("Donkey", parser.ALL),
+        ("Stable", None),
+        ("count", None),
+        ("Shape", ["Circle"]),
+    ]
+
+
+@pytest.mark.parametrize(
+    "header,name,exposing", [
+        ("module Main exposing (..)", "Main", parser.ALL),
+        ("port module Main exposing (main)", "Main", [("main", None)]),
+        ("module RandomGifList (..) where", "RandomGifList", parser.ALL),
+        ("module Old (a, b) where", "Old", [("a", None), ("b", None)]),
+        ("effect module Task where { command = MyCmd } exposing (Task)",
+         "Task", [("Task", None)]),
+        ("main = 1", None, parser.ALL),
+    ])
+def test_header_styles(header, name, exposing):
+    module = parser.parse(header + "\n")
+    assert (module.name, module.exposing) == (name, exposing)
+
+
+def test_imports():
+    imports = parser.parse(donkeys).imports
+    assert imports == [
+        parser.Import("Html", None,
+                      [("Html", None), ("div", None), ("text", None)], 2),
+        parser.Import("Json.Decode", "Json", [], 4),
+        parser.Import("Dict", None, parser.ALL, 5),
+    ]
+
+
+def test_old_style_aliased_exposing_import():
+    [i] = parser.parse(
+        "import RenameAndExpose exposing (whatever, blah) as Whoa\n").imports
+    assert i.alias == "Whoa"
+    assert i.exposing == [("whatever", None), ("blah", None)]
+
+
+def test_declarations():
+    found = [(d.name, d.kind, d.row, d.col, d.parent)
+             for d in parser.parse(donkeys).declarations]
+    assert found == [
+        ("Donkey", parser.TYPE, 11, 0, None),
+        ("Mule", parser.CONSTRUCTOR, 12, 6, "Donkey"),
+        ("Horse", parser.CONSTRUCTOR, 13, 6, "Donkey"),
+        ("Goat", parser.CONSTRUCTOR, 14, 6, "Donkey"),
+        ("Stable", parser.ALIAS, 17, 0, None),
+        ("Shape", parser.TYPE, 20, 0, None),
+        ("Circle", parser.CONSTRUCTOR, 20, 13, "Shape"),
+        ("Square", parser.CONSTRUCTOR, 20, 28, "Shape"),
+        ("Wrapper", parser.TYPE, 23, 0, None),
+        ("Wrapper", parser.CONSTRUCTOR, 23, 15, "Wrapper"),
+        ("count", parser.VALUE, 27, 0, None),
+        ("total", parser.LET, 29, 8, "count"),
+        ("twice", parser.LET, 30, 8, "count"),
+        ("inline", parser.VALUE, 35, 0, None),
+        ("x", parser.LET, 35, 13, "inline"),
+        ("outbox", parser.PORT, 37, 0, None),
+    ]
+
+
+def test_signatures():
+    by_name = dict((d.name, d) for d in parser.parse(donkeys).declarations)
+    assert by_name["count"].signature == "Stable -> Int"
+    assert by_name["count"].end_row == 33
+    assert by_name["outbox"].signature == "String -> Cmd msg"
+    assert by_name["inline"].signature is None
+
+
+@pytest.mark.parametrize("source", [
+    'port requests =\n    Signal.constant ""\n',
+    "port foo\n",
+])
+def test_ports_without_an_annotation(source):
+    source = "port module Ports exposing (..)\n\n" + source
+    [port] = parser.parse(source).declarations
+    assert (port.kind, port.row, port.signature) == (parser.PORT, 2, None)
+    assert seeker.find_location_in_source(source, 0, 0, port.name) == (2, 0)
+
+
+@pytest.mark.parametrize(
+    "identifier,row,expected", [
+        ("Goat", 0, (14, 6)),
+        ("Wrapper", 0, (23, 0)),
+        ("outbox", 0, (37, 0)),
+        ("total", 33, (29, 8)),
+        ("x", 35, (35, 13)),
+    ])
+def test_find_location_in_source_finds_more_kinds(identifier, row, expected):
+    assert seeker.find_location_in_source(donkeys, row, 0, identifier) \
+        == expected
+
+
+def test_let_bindings_are_only_visible_inside():
+    with pytest.raises(seeker.CannotFindIdentifier):
+        seeker.find_location_in_source(donkeys, 37, 0, "total")
+
+
+def test_indented_lookalikes_are_not_duplicates():
+    source = """
+model =
+    { corpusIndex = Dict.empty
+    , other = 1
+    }
+
+update msg model =
+    let
+        model = 2
+    in
+        model
+
+corpusIndex = 3
+"""
+    assert seeker.find_location_in_source(source, 1, 0, "corpusIndex") \
+        == (12, 0)
+
+
+def test_chunks():
+    blanked = "module A exposing (..)\n\n\nf x =\n    x\n\n  \ng = 1\n"
+    assert list(parser.chunks(blanked)) == [
+        (0, "module A exposing (..)"),
+        (25, "f x =\n    x"),
+        (41, "g = 1"),
+    ]
+
+
+def test_lexed_chunks_match_blanked_ones():
+    source = ('module A exposing (..)\n{- f = 1\nnot = 2 -}\nf x = """a\n'
+              'b = 3"""\n-- c = 4\nc = 5\n\n')
+    assert list(parser._lexed(source)) == \
+        list(parser._numbered(parser.lexer.blank(source)))
+    assert [d.name for d in parser.iter_declarations(source)] == ["f", "c"]
+
+
+def test_declaration_stream_only_reads_what_it_needs():
+    source = "a = 1\nb = 2\nc = 3\n"
+    stream = parser.DeclarationStream(source)
+    for d in stream:
+        if d.name == "b":
+            break
+    assert [d.name for d in stream.parsed] == ["a", "b"]
+    assert [d.name for d in stream] == ["a", "b", "c"]
+    assert len(stream.parsed) == 3
+
+
+def test_exports():
+    source = ("module A exposing (Shape(..), Color, f, (=>))\n\n"
+              "type Shape = Circle | Square\n\n"
+              "type Color = Red\n\n"
+              "f = 1\n\ng = 2\n")
+    assert parser.parse(source).exports() == frozenset(
+        ["Shape", "Circle", "Square", "Color", "f", "=>"])
+    everything = parser.parse(source.replace(
+        "(Shape(..), Color, f, (=>))", "(..)"))
+    assert everything.exports() == frozenset(
+        ["Shape", "Circle", "Square", "Color", "Red", "f", "g"])
+
+
+def test_exports_of_a_file_only_parse_a_plain_header(tmpdir, monkeypatch):
+    a = tmpdir.join("A.elm")
+    a.write("module A exposing (f)\n\nf = 1\n\ng = 2\n")
+    b = tmpdir.join("B.elm")
+    b.write("module B exposing (..)\n\nf = 1\n\ng = 2\n")
+    parsed = []
+    real = parser._parse
+    monkeypatch.setattr(parser, "_parse",
+                        lambda source: parsed.append(source) or real(source))
+    assert parser.exports_of(str(a)) == frozenset(["f"])
+    assert parsed == []
+    assert parser.exports_of(str(b)) == frozenset(["f", "g"])
+    assert len(parsed) == 1
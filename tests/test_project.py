@@ -0,0 +1,57 @@
+import os
+import json
+
+import seeker
+from seeker import project
+
+
+def bump(path):
+    st = os.stat(str(path))
+    os.utime(str(path), (st.st_atime, st.st_mtime + 10))
+
+
+def test_project_for_file(elm_project):
+    p = project.for_file(str(elm_project.join("src", "Main.elm")))
+    assert p.root == str(elm_project)
+    assert p.source_dirs[0] == str(elm_project) + "/src"
+    assert len(p.source_dirs) == 3
+    assert project.for_file(str(elm_project.join("src", "Util.elm"))) is p
+
+
+def test_project_is_worked_out_once(elm_project, monkeypatch):
+    main = str(elm_project.join("src", "Main.elm"))
+    project.for_file(main)
+    calls = []
+    monkeypatch.setattr(seeker, "_searchable_sources",
+                        lambda *a: calls.append(a))
+    monkeypatch.setattr(seeker, "_elm_package_for",
+                        lambda *a: calls.append(a))
+    for _ in range(3):
+        assert seeker._files_of("Util", main)
+    assert calls == []
+
+
+def test_changed_elm_package_json_reloads(elm_project):
+    main = str(elm_project.join("src", "Main.elm"))
+    p = project.for_file(main)
+    elm_package = elm_project.join("elm-package.json")
+    info = json.loads(elm_package.read())
+    info["source-directories"].append("lib")
+    elm_package.write(json.dumps(info))
+    bump(elm_package)
+    reloaded = project.for_file(main)
+    assert reloaded is not p
+    assert str(elm_project) + "/lib" in reloaded.source_dirs
+
+
+def test_files_of_notices_new_files(elm_project):
+    main = str(elm_project.join("src", "Main.elm"))
+    assert seeker._files_of("Later", main) == []
+    elm_project.join("src", "Later.elm").write("")
+    bump(elm_project.join("src"))
+    assert seeker._files_of("Later", main) == [
+        str(elm_project.join("src", "Later.elm"))]
+
+
+def test_file_outside_any_project(tmpdir):
+    assert project.for_file(str(tmpdir.join("Lonely.elm"))) is None
@@ -0,0 +1,131 @@
+import pytest
+
+import seeker
+from seeker import index as symbol_index
+from seeker import project
+from seeker import refs
+from seeker import server
+
+
+def path_of(elm_project, name):
+    return str(elm_project.join("src", name))
+
+
+def refs_for(elm_project):
+    p = project.for_file(path_of(elm_project, "Main.elm"))
+    symbols = symbol_index.load(p)
+    return symbols, refs.load(p, symbols)
+
+
+def test_uses_in(elm_project):
+    uses = refs.uses_in(path_of(elm_project, "Main.elm"))
+    assert ("shout", 10, 19, True, ["Util"]) in uses
+    assert ("whisper", 10, 40, False, ["Util"]) in uses
+    assert ("join", 14, 18, False, ["String"]) in uses
+    # declarations, the header and imports aren't uses
+    assert not [u for u in uses if u[0] in ("view", "helper") or u[1] < 8]
+
+
+def test_comments_and_strings_are_not_uses(tmpdir):
+    tmpdir.join("A.elm").write(
+        "module A exposing (..)\n\n"
+        "f x =\n"
+        "    {- f x -} \"f\" ++ g x -- f\n")
+    uses = refs.uses_in(str(tmpdir.join("A.elm")))
+    assert [u[:3] for u in uses] == [("x", 2, 2), ("g", 3, 21), ("x", 3, 23)]
+
+
+def test_references_from_the_definition_and_a_use(elm_project):
+    symbols, references = refs_for(elm_project)
+    main = path_of(elm_project, "Main.elm")
+    util = path_of(elm_project, "Util.elm")
+    expected = [[main, 10, 19]]
+    assert references.references(util, 6, 0) == expected
+    assert refs.find_references(
+        str(elm_project), util, 6, 0, "shout", symbols, references) == expected
+    assert refs.find_references(
+        str(elm_project), main, 10, 19, "shout", symbols,
+        references) == expected
+
+
+def test_a_type_with_a_constructor_of_the_same_name(elm_project):
+    elm_project.join("src", "Id.elm").write(
+        "module Id exposing (Id(..))\n\n\ntype Id = Id String\n")
+    main = path_of(elm_project, "Main.elm")
+    elm_project.join("src", "Main.elm").write(
+        "module Main exposing (..)\n\n"
+        "import Id as I\n\n\n"
+        "a = I.Id \"a\"\n")
+    symbols, references = refs_for(elm_project)
+    assert refs.find_references(
+        str(elm_project), main, 5, 6, "Id", symbols, references) == \
+        [[main, 5, 6]]
+
+
+def test_aliases_and_dependencies(elm_project):
+    symbols, references = refs_for(elm_project)
+    main = path_of(elm_project, "Main.elm")
+    util = path_of(elm_project, "Util.elm")
+    string = str(elm_project.join(
+        "elm-stuff", "packages", "elm-lang", "core", "4.0.5", "src",
+        "String.elm"))
+    assert references.references(util, 11, 0) == [[main, 10, 40]]
+    assert references.references(string, 4, 0) == [[main, 14, 18]]
+    assert references.references(string, 9, 0) == [[util, 7, 11]]
+
+
+def test_new_uses_get_picked_up(elm_project):
+    symbols, references = refs_for(elm_project)
+    util = path_of(elm_project, "Util.elm")
+    elm_project.join("src", "Loud.elm").write(
+        "module Loud exposing (..)\n\nimport Util\n\n"
+        "loud = Util.shout \"hi\"\n")
+    symbols.refresh()
+    references.refresh()
+    assert references.references(util, 6, 0) == [
+        [path_of(elm_project, "Loud.elm"), 4, 12],
+        [path_of(elm_project, "Main.elm"), 10, 19],
+    ]
+
+
+def test_saved_uses_are_not_read_again(elm_project, monkeypatch):
+    refs_for(elm_project)
+    project.forget()
+
+    def fail(path):
+        raise AssertionError("read {} again".format(path))
+    monkeypatch.setattr(refs, "uses_in", fail)
+    _, references = refs_for(elm_project)
+    assert references.references(path_of(elm_project, "Util.elm"), 6, 0)
+
+
+def test_find_references_over_rpc(elm_project):
+    s = server.Server()
+    response = s.handle({
+        "jsonrpc": "2.0", "id": 1, "method": "find_references",
+        "params": [str(elm_project), path_of(elm_project, "Main.elm"), 10,
+                   40, "whisper"],
+    })
+    assert response["result"] == [[path_of(elm_project, "Main.elm"), 10, 40]]
+
+
+def test_cli(elm_project, capsys):
+    seeker.main(["refs", str(elm_project), path_of(elm_project, "Util.elm"),
+                 "6", "0", "shout"])
+    assert capsys.readouterr().out == "MATCH {} 10 19\n".format(
+        path_of(elm_project, "Main.elm"))
+
+
+def test_cli_file_relative_to_current_dir(elm_project, monkeypatch,
+                                          capsys):
+    monkeypatch.chdir(elm_project.dirpath())
+    seeker.main(["refs", str(elm_project), "src/Util.elm", "6", "0",
+                 "shout"])
+    assert capsys.readouterr().out == "MATCH {} 10 19\n".format(
+        path_of(elm_project, "Main.elm"))
+
+
+def test_not_in_a_project(tmpdir):
+    tmpdir.join("A.elm").write("module A exposing (..)\n\na = 1\n")
+    with pytest.raises(SystemExit):
+        refs.main([str(tmpdir), str(tmpdir.join("A.elm")), "2", "0", "a"])
@@ -0,0 +1,93 @@
+import json
+
+import seeker
+from seeker import cache
+from seeker import index as symbol_index
+from seeker import project
+from seeker import resolve
+from seeker import server
+
+
+def path_of(elm_project, name):
+    return str(elm_project.join("src", name))
+
+
+def test_resolve_file(elm_project):
+    main = path_of(elm_project, "Main.elm")
+    util = path_of(elm_project, "Util.elm")
+    string = str(elm_project.join(
+        "elm-stuff", "packages", "elm-lang", "core", "4.0.5", "src",
+        "String.elm"))
+    resolved = resolve.resolve_file(main)
+    assert (10, 19, "shout", [util, 6, 0]) in resolved
+    assert (10, 40, "whisper", [util, 11, 0]) in resolved
+    assert (14, 18, "join", [string, 4, 0]) in resolved
+    assert resolved == sorted(resolved)
+
+
+def test_same_answers_as_find_location(elm_project):
+    main = path_of(elm_project, "Main.elm")
+    for row, col, name, location in resolve.resolve_file(main):
+        assert seeker.find_location(
+            str(elm_project), main, row, col, name) == location
+
+
+def test_every_file_is_read_once(elm_project, monkeypatch):
+    main = path_of(elm_project, "Main.elm")
+    cache.enable()
+    opened = []
+    read = cache._read_file
+    monkeypatch.setattr(cache, "_read_file",
+                        lambda path: opened.append(path) or read(path))
+    resolve.resolve_file(main)
+    elm_files = sorted(p for p in opened if p.endswith(".elm"))
+    assert elm_files == sorted(set(elm_files))
+    assert len(elm_files) == 4
+
+
+def test_with_an_index(elm_project):
+    main = path_of(elm_project, "Main.elm")
+    index = symbol_index.load(project.for_file(main))
+    assert resolve.resolve_file(main, index=index) == \
+        resolve.resolve_file(main)
+
+
+def test_let_bindings_and_locals(tmpdir):
+    tmpdir.join("elm-package.json").write(json.dumps({
+        "source-directories": ["."], "dependencies": {}}))
+    tmpdir.join("A.elm").write(
+        "module A exposing (..)\n\n\n"
+        "f x =\n"
+        "    let\n"
+        "        y = g x\n"
+        "    in\n"
+        "        y\n\n\n"
+        "g x =\n"
+        "    x\n")
+    path = str(tmpdir.join("A.elm"))
+    assert resolve.resolve_file(path) == [
+        (5, 12, "g", [path, 10, 0]),
+        (7, 8, "y", [path, 5, 8]),
+    ]
+
+
+def test_over_rpc(elm_project):
+    s = server.Server()
+    response = s.handle({"jsonrpc": "2.0", "id": 1, "method": "resolve_file",
+                         "params": [str(elm_project), "src/Main.elm"]})
+    assert {
+        "name": "shout", "row": 10, "col": 19,
+        "file": path_of(elm_project, "Util.elm"), "def_row": 6, "def_col": 0,
+    } in response["result"]
+
+
+def test_cli(elm_project, capsys):
+    seeker.main(["resolve-file", str(elm_project), "src/Main.elm"])
+    found = [json.loads(l) for l in capsys.readouterr()[0].splitlines()]
+    assert ("join", "String.elm") in [
+        (f["name"], f["file"].split("/")[-1]) for f in found]
+    seeker.main(["resolve-file", str(elm_project), "src/Main.elm",
+                 "--format", "tsv", "--no-index"])
+    lines = capsys.readouterr()[0].splitlines()
+    assert "10\t19\tshout\t{}\t6\t0".format(
+        path_of(elm_project, "Util.elm")) in lines
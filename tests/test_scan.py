@@ -0,0 +1,55 @@
+import json
+
+import seeker
+from seeker import index
+from seeker import project
+from seeker import scan
+
+
+def test_scan_file(elm_project):
+    records = scan.scan_file(str(elm_project.join("src", "Main.elm")))
+    assert records == [
+        (2, 0, scan.IMPORT, "Html"),
+        (3, 0, scan.IMPORT, "String"),
+        (4, 0, scan.IMPORT, "Util"),
+        (5, 0, scan.IMPORT, "Util"),
+        (9, 0, "value", "view"),
+        (14, 0, "value", "helper"),
+    ]
+
+
+def test_scan_covers_dependencies_in_source_dir_order(elm_project):
+    p = project.for_file(str(elm_project.join("src", "Main.elm")))
+    modules = [module for _, module, _ in scan.scan(p.source_dirs, jobs=1)]
+    assert modules == ["Main", "Util", "String", "Html"]
+
+
+def test_pool_gives_the_same_answer(elm_project, monkeypatch):
+    for i in range(10):
+        elm_project.join("src", "Gen", "M{}.elm".format(i)).write(
+            "module Gen.M{0} exposing (..)\n\nv{0} = {0}\n".format(i),
+            ensure=True)
+    p = project.for_file(str(elm_project.join("src", "Main.elm")))
+    serial = list(scan.scan(p.source_dirs, jobs=1))
+    monkeypatch.setattr(scan, "MIN_FILES_FOR_POOL", 1)
+    assert list(scan.scan(p.source_dirs, jobs=3)) == serial
+
+
+def test_index_refresh_over_a_pool(elm_project, monkeypatch):
+    monkeypatch.setattr(scan, "MIN_FILES_FOR_POOL", 1)
+    p = project.for_file(str(elm_project.join("src", "Main.elm")))
+    idx = index.SymbolIndex(p.source_dirs)
+    idx.refresh(jobs=2)
+    assert idx.lookup("String", "join")[0].row == 4
+
+
+def test_cli(elm_project, capsys):
+    seeker.main(["scan", str(elm_project), "--jobs", "1"])
+    records = [json.loads(l) for l in capsys.readouterr().out.splitlines()]
+    assert {"file": str(elm_project.join("src", "Util.elm")),
+            "module": "Util", "row": 6, "col": 0, "kind": "value",
+            "name": "shout"} in records
+    seeker.main(["scan", str(elm_project), "--format", "tsv", "-j", "1"])
+    lines = capsys.readouterr().out.splitlines()
+    assert "\t".join([str(elm_project.join("src", "Main.elm")), "2", "0",
+                      "import", "Html", "Main"]) in lines
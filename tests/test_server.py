@@ -0,0 +1,153 @@
+import io
+import json
+import socket
+import threading
+
+import pytest
+
+import seeker
+from seeker import server
+
+
+def request(method, params=None, id=1):
+    return {"jsonrpc": "2.0", "id": id, "method": method,
+            "params": params if params is not None else []}
+
+
+def test_find_location_over_rpc(elm_project):
+    main = str(elm_project.join("src", "Main.elm"))
+    s = server.Server()
+    response = s.handle(request("find_location", {
+        "cwd": str(elm_project), "file": main,
+        "row": 10, "col": 19, "identifier": "shout",
+    }))
+    assert response["result"] == [
+        str(elm_project.join("src", "Util.elm")), 6, 0
+    ]
+
+
+def test_find_location_positional_params(elm_project):
+    main = str(elm_project.join("src", "Main.elm"))
+    s = server.Server()
+    response = s.handle(request(
+        "find_location", [str(elm_project), main, 14, 18, "join"]
+    ))
+    string_elm = elm_project.join(
+        "elm-stuff", "packages", "elm-lang", "core", "4.0.5", "src",
+        "String.elm")
+    assert response["result"] == [str(string_elm), 4, 0]
+
+
+def test_file_reads_stay_warm_between_requests(elm_project):
+    main = str(elm_project.join("src", "Main.elm"))
+    s = server.Server()
+    params = [str(elm_project), main, 10, 19, "shout"]
+    s.handle(request("find_location", params))
+    misses = s.cache.misses
+    s.handle(request("find_location", params))
+    assert s.cache.misses == misses
+    assert s.cache.hits > 0
+
+
+def test_lookup_errors_have_their_own_codes(elm_project):
+    main = str(elm_project.join("src", "Main.elm"))
+    response = server.Server().handle(request(
+        "find_location", [str(elm_project), main, 10, 25, "name"]
+    ))
+    assert response["error"]["code"] == server.CANNOT_FIND_IDENTIFIER
+
+
+@pytest.mark.parametrize(
+    "line,code", [
+        ("not json", server.PARSE_ERROR),
+        ('{"jsonrpc": "2.0", "id": 3, "method": "nope"}',
+         server.METHOD_NOT_FOUND),
+        ('{"jsonrpc": "2.0", "id": 3, "method": "ping", "params": [1]}',
+         server.INVALID_PARAMS),
+        ('{"jsonrpc": "2.0", "id": 3, "method": "ping", "params": "x"}',
+         server.INVALID_PARAMS),
+        ('{"jsonrpc": "2.0", "id": 3, "method": "symbols", '
+         '"params": {"nope": 1}}', server.INVALID_PARAMS),
+        ('[1, 2]', server.INVALID_REQUEST),
+    ])
+def test_bad_requests(line, code):
+    response = json.loads(server.Server().handle_line(line))
+    assert response["error"]["code"] == code
+
+
+def test_type_errors_inside_a_method_are_not_invalid_params(monkeypatch):
+    s = server.Server()
+
+    def broken():
+        raise TypeError("a bug")
+    monkeypatch.setitem(s._methods, "ping", broken)
+    response = s.handle({"jsonrpc": "2.0", "id": 1, "method": "ping"})
+    assert response["error"]["code"] == server.INTERNAL_ERROR
+
+
+def test_notifications_get_no_response():
+    assert server.Server().handle_line(
+        '{"jsonrpc": "2.0", "method": "ping"}') is None
+
+
+def test_serve_stream_until_shutdown():
+    lines = [json.dumps(request("ping", id=1)),
+             json.dumps(request("shutdown", id=2)),
+             json.dumps(request("ping", id=3))]
+    rfile = io.StringIO(u"\n".join(lines) + u"\n")
+    wfile = io.StringIO()
+    server.Server().serve_stream(rfile, wfile)
+    responses = [json.loads(l) for l in wfile.getvalue().splitlines()]
+    assert [r["id"] for r in responses] == [1, 2]
+    assert responses[0]["result"] == "pong"
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"),
+                    reason="no unix sockets here")
+def test_client_talks_to_unix_socket(elm_project, tmpdir, capsys):
+    socket_path = str(tmpdir.join("seeker.sock"))
+    s = server.Server()
+    t = threading.Thread(target=server.serve_unix, args=(socket_path, s))
+    t.start()
+    try:
+        for _ in range(100):
+            if tmpdir.join("seeker.sock").exists():
+                break
+            threading.Event().wait(0.01)
+        assert server.call(socket_path, "ping", timeout=5) == "pong"
+        main = str(elm_project.join("src", "Main.elm"))
+        seeker.main(["client", "--socket", socket_path,
+                     str(elm_project), main, "10", "19", "shout"])
+    finally:
+        server.call(socket_path, "shutdown", timeout=5)
+        t.join(5)
+    out = capsys.readouterr().out
+    assert out == "MATCH {} 6 0\n".format(elm_project.join("src", "Util.elm"))
+
+
+def test_client_falls_back_without_server(elm_project, tmpdir, capsys):
+    main = str(elm_project.join("src", "Main.elm"))
+    seeker.main(["client", "--socket", str(tmpdir.join("nobody.sock")),
+                 str(elm_project), main, "10", "19", "shout"])
+    out = capsys.readouterr().out
+    assert out == "MATCH {} 6 0\n".format(elm_project.join("src", "Util.elm"))
+
+
+def test_client_stdin_without_server(elm_project, tmpdir, monkeypatch,
+                                     capsys):
+    main = elm_project.join("src", "Main.elm")
+    edited = main.read().replace("view : String", "\n\nview : String")
+    monkeypatch.setattr("sys.stdin", io.StringIO(edited))
+    seeker.main(["client", "--socket", str(tmpdir.join("nobody.sock")),
+                 str(elm_project), str(main), "11", "0", "view", "--stdin"])
+    out = capsys.readouterr().out
+    assert out == "MATCH {} 11 0\n".format(main)
+
+
+def test_client_file_relative_to_current_dir(elm_project, tmpdir,
+                                             monkeypatch, capsys):
+    monkeypatch.chdir(elm_project.dirpath())
+    seeker.main(["client", "--socket", str(tmpdir.join("nobody.sock")),
+                 str(elm_project), "src/Main.elm", "10", "19", "shout"])
+    out = capsys.readouterr().out
+    assert out == "MATCH {} 6 0\n".format(elm_project.join("src", "Util.elm"))
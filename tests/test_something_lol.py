@@ -1,4 +1,5 @@
 import seeker
+from seeker import parser
 import pytest
 import mock
 import json
@@ -54,13 +55,7 @@ b input = huh Index
     assert location == (1, 0)
 
 
-@pytest.mark.skipif("todo == True")
 def test_type_with_new_line():
-    """
-    current bug, not sure how to get around it given it searches things
-    linewise...
-    maybe i need to write a mini-parser to filter things expressionwise?
-    """
     type_def = """
 type Boolean
     = Literal Bool
@@ -594,3 +589,55 @@ doubleGoater =
 def test_find_type():
     location = seeker.find_location_in_source(with_type, 7, 13, "Donkey")
     assert location == (1, 0)
+
+
+def test_search_stops_after_lookahead():
+    def declarations():
+        yield parser.Declaration("a", parser.VALUE, 0, 0, 0, None, None)
+        for row in range(1, 4):
+            yield parser.Declaration("b", parser.VALUE, row, 0, row, None,
+                                     None)
+        raise AssertionError("read too far")
+    assert seeker._search_declarations(declarations(), "a", lookahead=3) \
+        == (0, 0)
+    with pytest.raises(seeker.SearchError):
+        seeker._search_declarations(declarations(), "b", lookahead=3)
+
+
+def test_candidate_files_are_only_parsed_as_far_as_needed(elm_project,
+                                                         monkeypatch):
+    monkeypatch.setattr(seeker, "AMBIGUITY_LOOKAHEAD", 0)
+    main = str(elm_project.join("src", "Main.elm"))
+    util = str(elm_project.join("src", "Util.elm"))
+    seeker.cache.enable()
+    try:
+        assert seeker.find_location(str(elm_project), main, 10, 19,
+                                    "shout") == [util, 6, 0]
+        assert seeker.cache.derived(util, "parsed") is None
+        stream = seeker.cache.derived(util, "declarations")
+        assert [d.name for d in stream.parsed] == ["shout"]
+        # the next search picks up where that one stopped
+        assert seeker.find_location(str(elm_project), main, 10, 40,
+                                    "whisper") == [util, 11, 0]
+        assert [d.name for d in stream.parsed] == ["shout", "whisper"]
+    finally:
+        seeker.cache.disable()
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_let_bindings_shadow_explicit_imports(elm_project, use_index):
+    from seeker import index as symbol_index
+    main = elm_project.join("src", "Main.elm")
+    main.write(main.read() + """
+
+loud : String -> String
+loud x =
+    let
+        shout y = y
+    in
+        shout x
+""")
+    idx = symbol_index.SymbolIndex.for_file(str(main)) if use_index \
+        else None
+    assert seeker.find_location(str(elm_project), str(main), 22, 8, "shout",
+                                index=idx) == [str(main), 20, 8]
@@ -0,0 +1,86 @@
+import seeker
+from seeker import cache
+from seeker import server
+from seeker import stats
+
+
+def lookup(elm_project):
+    return seeker.find_location(
+        str(elm_project), str(elm_project.join("src", "Main.elm")), 10, 19,
+        "shout")
+
+
+def test_collect_a_lookup(elm_project):
+    with stats.collect() as s:
+        lookup(elm_project)
+    assert s.phases["find_location"][1] == 1
+    for name in ("find_elm_package", "searchable_sources", "parse",
+                 "mask_comments", "map_modules"):
+        assert name in s.phases
+    assert s.counters["files_opened"] > 0
+    assert s.counters["bytes_read"] > 0
+    assert s.counters["stat_calls"] > 0
+
+
+def test_cache_hits_and_misses(elm_project):
+    cache.enable()
+    with stats.collect() as first:
+        lookup(elm_project)
+    with stats.collect() as second:
+        lookup(elm_project)
+    assert first.counters["cache_misses"] > 0
+    assert second.counters["cache_misses"] == 0
+    assert second.counters["cache_hits"] > 0
+    assert second.counters["files_opened"] == 0
+
+
+def test_nothing_is_kept_without_collecting(elm_project):
+    p = stats.phase("find_location")
+    with p:
+        lookup(elm_project)
+    assert p.start is None
+    with stats.collect() as s:
+        pass
+    assert s.phases == {}
+
+
+def test_collections_nest(elm_project):
+    with stats.collect() as outer:
+        with stats.collect() as inner:
+            lookup(elm_project)
+        lookup(elm_project)
+    assert inner.phases["find_location"][1] == 1
+    assert outer.phases["find_location"][1] == 2
+
+
+def test_report():
+    s = stats.Stats()
+    s.add_time("parse", 0.002)
+    s.add_time("parse", 0.001)
+    s.add_time("find_location", 0.01)
+    lines = s.report().splitlines()
+    assert lines[1].split() == ["find_location", "10.000", "1"]
+    assert lines[2].split() == ["parse", "3.000", "2"]
+    assert "stat calls 0" in lines[3]
+    assert s.as_dict()["phases"]["parse"]["calls"] == 2
+
+
+def test_cli_timings(elm_project, capsys):
+    seeker.main([str(elm_project), str(elm_project.join("src", "Main.elm")),
+                 "10", "19", "shout", "--timings"])
+    out, err = capsys.readouterr()
+    assert out.startswith("MATCH ")
+    assert "find_location" in err
+    assert "files opened" in err
+
+
+def test_server_keeps_totals(elm_project):
+    s = server.Server()
+    params = [str(elm_project), str(elm_project.join("src", "Main.elm")), 10,
+              19, "shout"]
+    for i in range(2):
+        s.handle({"jsonrpc": "2.0", "id": i, "method": "find_location",
+                  "params": params})
+    response = s.handle({"jsonrpc": "2.0", "id": 3, "method": "stats"})
+    assert response["result"]["phases"]["find_location"]["calls"] == 2
+    assert response["result"]["counters"]["cache_hits"] > 0
@@ -0,0 +1,79 @@
+import json
+
+import seeker
+from seeker import index as symbol_index
+from seeker import project
+from seeker import server
+from seeker import symbols
+
+
+names = ["toUpper", "toLower", "toString", "to", "Tuple", "update",
+         "viewUser", "view", "userView", "String", "stoop"]
+
+
+def test_prefix_matches_come_first_shortest_first():
+    table = symbols.SymbolTable(names)
+    assert table.search("to", limit=3) == ["to", "toLower", "toUpper"]
+
+
+def test_exact_case_wins():
+    table = symbols.SymbolTable(["string", "String", "strings"])
+    assert table.search("String") == ["String", "string", "strings"]
+
+
+def test_fuzzy():
+    table = symbols.SymbolTable(names)
+    assert table.search("tup") == ["Tuple", "toUpper"]
+    assert table.search("vusr") == ["viewUser"]
+    assert table.search("usrv") == ["userView"]
+    assert table.search("zzz") == []
+    assert table.search("") == []
+
+
+def test_fuzzy_ranking():
+    table = symbols.SymbolTable(["xxaxb", "axxxb", "ab", "xab"])
+    # the first letter as early as possible, then the letters as close
+    # together as possible
+    assert table.search("ab", limit=10) == ["ab", "axxxb", "xab", "xxaxb"]
+
+
+def test_limit():
+    table = symbols.SymbolTable(names)
+    assert len(table.search("o", limit=2)) == 2
+
+
+def test_search_index(elm_project):
+    p = project.for_file(str(elm_project.join("src", "Main.elm")))
+    found = symbols.search(symbol_index.load(p), "toup")
+    assert [(d.name, d.module, d.row) for d in found] == [
+        ("toUpper", "String", 9)]
+
+
+def test_table_is_sorted_again_after_changes(elm_project):
+    p = project.for_file(str(elm_project.join("src", "Main.elm")))
+    index = symbol_index.load(p)
+    assert symbols.table_for(index) is symbols.table_for(index)
+    elm_project.join("src", "Extra.elm").write(
+        "module Extra exposing (..)\n\nyell = 1\n")
+    index.refresh()
+    assert [d.name for d in symbols.search(index, "yell")] == ["yell"]
+
+
+def test_over_rpc(elm_project):
+    s = server.Server()
+    response = s.handle({"jsonrpc": "2.0", "id": 1, "method": "symbols",
+                         "params": [str(elm_project), "whisp"]})
+    assert response["result"] == [{
+        "name": "whisper", "kind": "value", "module": "Util",
+        "file": str(elm_project.join("src", "Util.elm")), "row": 11,
+        "col": 0,
+    }]
+
+
+def test_cli(elm_project, capsys):
+    seeker.main(["symbols", "div", str(elm_project)])
+    found = [json.loads(l) for l in capsys.readouterr().out.splitlines()]
+    assert [(f["name"], f["module"]) for f in found] == [("div", "Html")]
+    seeker.main(["symbols", "shout", str(elm_project), "--format", "tsv"])
+    assert capsys.readouterr().out.split("\t")[:3] == [
+        "shout", "value", "Util"]
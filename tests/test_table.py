@@ -0,0 +1,114 @@
+from seeker import index as symbol_index
+from seeker import parser
+from seeker import table as table_module
+from seeker.table import Definition, DefinitionTable
+
+
+def test_rows_come_back_as_definitions():
+    table = DefinitionTable()
+    table.add("view", parser.VALUE, "Main", "/src/Main.elm", 70000, 0)
+    table.add("Msg", parser.TYPE, "Main", "/src/Main.elm", 3, 0)
+    table.add("Click", parser.CONSTRUCTOR, "Main", "/src/Main.elm", 4, 6)
+    assert len(table) == 3
+    assert table[0] == Definition(
+        "view", parser.VALUE, "Main", "/src/Main.elm", 70000, 0)
+    assert table[2].col == 6
+    assert list(table)[1].name == "Msg"
+    # module and path are only kept once
+    assert len(table.strings) == 5
+
+
+def test_lookups():
+    table = DefinitionTable()
+    table.add("view", parser.VALUE, "Main", "/Main.elm", 1, 0)
+    table.add("view", parser.VALUE, "Page", "/Page.elm", 2, 0)
+    table.add("init", parser.VALUE, "Main", "/Main.elm", 5, 0)
+    assert [d.module for d in table.definitions("view")] == ["Main", "Page"]
+    assert table.lookup("Page", "view") == [
+        Definition("view", parser.VALUE, "Page", "/Page.elm", 2, 0)]
+    assert table.lookup("Page", "init") == []
+    assert table.definitions("nope") == []
+    table.add("view", parser.VALUE, "Other", "/Other.elm", 3, 0)
+    assert len(table.definitions("view")) == 3
+
+
+def test_wide_columns():
+    table = DefinitionTable()
+    table.add("x", parser.VALUE, "M", "/M.elm", 3, 70000)
+    table.add("y", parser.VALUE, "M", "/M.elm", 4, 1 << 40)
+    if table_module.COL_BITS >= 32:
+        assert table[0][4:] == (3, 70000)
+    assert table[1][4:] == (4, table_module._COL_MASK)
+
+
+def test_memory_per_definition():
+    table = DefinitionTable()
+    for module in range(100):
+        path = "/src/Module{}.elm".format(module)
+        for n in range(100):
+            table.add("value{}".format(n), parser.VALUE,
+                      "Module{}".format(module), path, n * 3, 0)
+    memory = table.memory()
+    assert memory["definitions"] == 10000
+    assert memory["strings"] == 300
+    assert memory["column_bytes"] < 25 * 10000
+    assert memory["bytes_per_definition"] < 40
+
+
+def test_files_can_be_dropped():
+    table = DefinitionTable()
+    table.add_file("/Main.elm", "Main", [("view", parser.VALUE, 1, 0),
+                                         ("init", parser.VALUE, 5, 0)])
+    table.add_file("/Page.elm", "Page", [("view", parser.VALUE, 2, 0)])
+    table.add_file("/Other.elm", "Other", [("x", parser.VALUE, 0, 0)])
+    assert [d.name for d in table.in_file("/Main.elm")] == ["view", "init"]
+    assert table.in_file("/Main.elm", "init")[0].row == 5
+    table.remove_file("/Main.elm")
+    assert len(table) == 2
+    assert [d.module for d in table.definitions("view")] == ["Page"]
+    assert table.in_file("/Main.elm") == []
+    assert table.names() == set(["view", "x"])
+    assert [d.name for d in table] == ["view", "x"]
+    table.add_file("/Main.elm", "Main", [("view", parser.VALUE, 3, 0)])
+    assert [d.row for d in table.definitions("view")] == [2, 3]
+
+
+def test_half_dead_tables_get_packed():
+    table = DefinitionTable()
+    for n in range(4):
+        table.add_file("/M{}.elm".format(n), "M{}".format(n),
+                       [("value{}".format(n), parser.VALUE, 0, 0)])
+    table.remove_file("/M0.elm")
+    table.remove_file("/M1.elm")
+    assert len(table._names) == 4
+    table.remove_file("/M2.elm")
+    # only M3's strings are left too
+    assert len(table._names) == 1
+    assert len(table.strings) == 3
+    assert table.lookup("M3", "value3")[0].path == "/M3.elm"
+
+
+def test_rows_added_after_a_lookup(monkeypatch):
+    monkeypatch.setattr(table_module, "UNSORTED_ROWS", 4)
+    table = DefinitionTable()
+    table.add("b", parser.VALUE, "M", "/M.elm", 0, 0)
+    table.add("a", parser.VALUE, "M", "/M.elm", 1, 0)
+    assert table.definitions("a")[0].row == 1
+    for row in range(2, 40):
+        table.add("ab"[row % 2], parser.VALUE, "M", "/M.elm", row, 0)
+        rows = [d.row for d in table.definitions("a")]
+        assert rows == [1] + list(range(2, row + 1, 2))
+
+
+def test_index_keeps_its_definitions_in_the_table(elm_project):
+    main = elm_project.join("src", "Main.elm")
+    index = symbol_index.SymbolIndex.for_file(str(main))
+    table = index.table()
+    assert len(table) == len(index)
+    assert table.lookup("Util", "shout") == index.lookup("Util", "shout")
+    main.write(main.read() + "\n\nlater = 1\n")
+    index.update([str(main)])
+    assert index.table() is table
+    assert len(table) == len(index)
+    assert table.lookup("Main", "later") == index.lookup("Main", "later")
+    assert len(table.lookup("Main", "view")) == 1
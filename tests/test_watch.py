@@ -0,0 +1,227 @@
+import os
+import json
+
+import pytest
+
+import seeker
+from seeker import cache
+from seeker import server
+from seeker import symbols
+from seeker import index as symbol_index
+from seeker import watch
+
+
+def inotify():
+    try:
+        w = watch.InotifyWatcher()
+    except (OSError, AttributeError):
+        pytest.skip("no inotify here")
+    return w
+
+
+@pytest.fixture(params=["inotify", "polling"])
+def watcher(request):
+    if request.param == "inotify":
+        w = inotify()
+    else:
+        w = watch.PollingWatcher(interval=0)
+    yield w
+    w.close()
+
+
+def test_sees_files_come_change_and_go(watcher, tmpdir):
+    root = str(tmpdir)
+    watcher.watch_tree(root)
+    tmpdir.join("A.elm").write("a = 1\n")
+    assert os.path.join(root, "A.elm") in watcher.changes()
+    tmpdir.join("A.elm").write("a = 12\n")
+    assert os.path.join(root, "A.elm") in watcher.changes()
+    tmpdir.join("A.elm").remove()
+    assert os.path.join(root, "A.elm") in watcher.changes()
+    assert watcher.changes() == set()
+
+
+def test_new_directories_get_watched(watcher, tmpdir):
+    watcher.watch_tree(str(tmpdir))
+    tmpdir.join("Html", "Events.elm").write("on = 1\n", ensure=True)
+    changed = watcher.changes()
+    assert str(tmpdir.join("Html")) in changed
+    assert str(tmpdir.join("Html", "Events.elm")) in changed
+    assert watcher.covers(str(tmpdir.join("Html", "Events.elm")))
+    tmpdir.join("Html", "Events.elm").write("on = 12\n")
+    assert str(tmpdir.join("Html", "Events.elm")) in watcher.changes()
+
+
+def test_elm_stuff_and_hidden_dirs_are_not_watched(watcher, tmpdir):
+    tmpdir.join("elm-stuff", "packages").ensure(dir=True)
+    watcher.watch_tree(str(tmpdir))
+    assert not watcher.covers(str(tmpdir.join("elm-stuff", "A.elm")))
+    tmpdir.join(".git", "HEAD").write("ref\n", ensure=True)
+    assert str(tmpdir.join(".git")) in watcher.changes()
+    assert not watcher.covers(str(tmpdir.join(".git", "HEAD")))
+    tmpdir.join(".git", "HEAD").write("ref 2\n")
+    assert watcher.changes() == set()
+
+
+def test_depth(watcher, tmpdir):
+    tmpdir.join("a", "b", "c").ensure(dir=True)
+    watcher.watch_tree(str(tmpdir), 1)
+    assert watcher.covers(str(tmpdir.join("a", "B.elm")))
+    assert not watcher.covers(str(tmpdir.join("a", "b", "C.elm")))
+    tmpdir.join("a", "b", "C.elm").write("c = 1\n")
+    tmpdir.join("a", "B.elm").write("b = 1\n")
+    assert watcher.changes() == set([str(tmpdir.join("a", "B.elm"))])
+
+
+def test_polling_waits_for_the_interval(tmpdir):
+    w = watch.PollingWatcher(interval=60)
+    w.watch_tree(str(tmpdir))
+    tmpdir.join("A.elm").write("a = 1\n")
+    assert w.changes() == set()
+
+
+def test_start_falls_back_to_polling():
+    assert isinstance(watch.start(polling=True), watch.PollingWatcher)
+    assert cache.active().watcher is watch.active()
+    watch.stop()
+    assert watch.active() is None
+    assert cache.active().watcher is None
+
+
+def swap_definitions(path):
+    """
+    rewrite Util.elm with whisper first, keeping its size and mtime so only
+    a watcher can tell
+    """
+    st = os.stat(path)
+    with open(path) as f:
+        head, shout, whisper = f.read().split("\n\n\n")
+    with open(path, "w") as f:
+        f.write("\n\n\n".join([head, whisper.rstrip("\n"), shout + "\n"]))
+    os.utime(path, (st.st_atime, st.st_mtime))
+    assert os.stat(path).st_size == st.st_size
+
+
+def test_find_location_never_stale(elm_project):
+    inotify().close()
+    watch.start()
+    cwd = str(elm_project)
+    main = str(elm_project.join("src", "Main.elm"))
+    util = str(elm_project.join("src", "Util.elm"))
+    assert seeker.find_location(cwd, main, 10, 19, "shout") == [util, 6, 0]
+    swap_definitions(util)
+    assert seeker.find_location(cwd, main, 10, 19, "shout") == [util, 11, 0]
+
+
+def test_polling_never_stale(elm_project):
+    watch.start(polling=True)
+    cwd = str(elm_project)
+    main = str(elm_project.join("src", "Main.elm"))
+    util = elm_project.join("src", "Util.elm")
+    assert seeker.find_location(cwd, main, 10, 19, "shout") == [
+        str(util), 6, 0]
+    util.write(util.read().replace("\n\nshout :", "\n\n\n\n\nshout :"))
+    assert seeker.find_location(cwd, main, 10, 19, "shout") == [
+        str(util), 9, 0]
+
+
+def test_polling_server_never_stale(elm_project):
+    watch.start(polling=True)
+    s = server.Server(watching=True)
+    cwd = str(elm_project)
+    main = str(elm_project.join("src", "Main.elm"))
+    util = elm_project.join("src", "Util.elm")
+    assert s.find_location(cwd, main, 10, 19, "shout") == [str(util), 6, 0]
+    util.write(util.read().replace("\n\nshout :", "\n\n\n\n\nshout :"))
+    assert s.find_location(cwd, main, 10, 19, "shout") == [str(util), 9, 0]
+
+
+def test_server_watches_a_dot_source_dir(elm_project):
+    inotify().close()
+    package_json = elm_project.join("elm-package.json")
+    info = json.loads(package_json.read())
+    info["source-directories"] = ["."]
+    package_json.write(json.dumps(info))
+    for name in ("Main.elm", "Util.elm"):
+        elm_project.join("src", name).move(elm_project.join(name))
+    s = server.Server(watching=True)
+    cwd = str(elm_project)
+    main = str(elm_project.join("Main.elm"))
+    util = elm_project.join("Util.elm")
+    assert s.find_location(cwd, main, 10, 19, "shout") == [str(util), 6, 0]
+    util.write(util.read().replace("\n\nshout :", "\n\n\n\n\nshout :"))
+    assert s.find_location(cwd, main, 10, 19, "shout") == [str(util), 9, 0]
+
+
+def test_polling_only_trusts_installed_packages(tmpdir):
+    w = watch.PollingWatcher()
+    w.watch_tree(str(tmpdir))
+    assert w.covers(str(tmpdir.join("A.elm")))
+    assert not w.trusts(str(tmpdir.join("A.elm")))
+    assert w.trusts(str(tmpdir.join("elm-stuff", "packages", "elm-lang",
+                                    "core", "4.0.5", "src", "List.elm")))
+
+
+def test_cached_files_are_not_checked(elm_project, monkeypatch):
+    inotify().close()
+    watch.start()
+    cwd = str(elm_project)
+    main = str(elm_project.join("src", "Main.elm"))
+    seeker.find_location(cwd, main, 10, 19, "shout")
+    stats = []
+    real_stat = os.stat
+
+    def counting_stat(path, *args, **kwargs):
+        stats.append(path)
+        return real_stat(path, *args, **kwargs)
+    monkeypatch.setattr(cache.os, "stat", counting_stat)
+    seeker.find_location(cwd, main, 10, 19, "shout")
+    assert main not in stats
+    assert str(elm_project.join("src", "Util.elm")) not in stats
+
+
+def test_new_modules_are_found(elm_project):
+    inotify().close()
+    watch.start()
+    cwd = str(elm_project)
+    main = str(elm_project.join("src", "Main.elm"))
+    assert seeker.find_location(cwd, main, 14, 18, "join")[0].endswith(
+        os.path.join("core", "4.0.5", "src", "String.elm"))
+    # a String module in the project's own sources comes first
+    elm_project.join("src", "String.elm").write(
+        "module String exposing (..)\n\njoin = 1\n")
+    assert seeker.find_location(cwd, main, 14, 18, "join") == [
+        str(elm_project.join("src", "String.elm")), 2, 0]
+
+
+def test_server_only_indexes_what_changed(elm_project, monkeypatch):
+    inotify().close()
+    s = server.Server(watching=True)
+    main = str(elm_project.join("src", "Main.elm"))
+    index = s.index_for(main)
+
+    def no_walking():
+        raise AssertionError("walked every source directory")
+    monkeypatch.setattr(index, "refresh", no_walking)
+    elm_project.join("src", "Extra.elm").write(
+        "module Extra exposing (..)\n\nyell = 1\n")
+    assert s.index_for(main) is index
+    assert [d.name for d in symbols.search(index, "yell")] == ["yell"]
+    elm_project.join("src", "Extra.elm").remove()
+    s.index_for(main)
+    assert symbols.search(index, "yell") == []
+
+
+def test_index_update(elm_project):
+    from seeker import project
+    p = project.for_file(str(elm_project.join("src", "Main.elm")))
+    index = symbol_index.SymbolIndex.build(p.source_dirs)
+    util = str(elm_project.join("src", "Util.elm"))
+    elm_project.join("src", "Util.elm").write(
+        "module Util exposing (..)\n\nshout = 1\n")
+    index.update([util])
+    assert [d.row for d in index.lookup("Util", "shout")] == [2]
+    assert index.lookup("Util", "whisper") == []
+    elm_project.join("src", "Util.elm").remove()
+    index.update([util])
+    assert index.lookup("Util", "shout") == []